@@ -1,32 +1,129 @@
-from flask import Flask
-from flask_restful import Api
-from endpoints import (
-    AuthenticationResource,
-    ProductsResource,
-    CategoriesResource,
-    FavoritesResource
-)
-from notifications.event_manager import EventManager
-from notifications.subscribers.log_subscriber import LogSubscriber
-from notifications.subscribers.recommendation_subscriber import RecommendationSubscriber
-from notifications.subscribers.console_subscriber import ConsoleSubscriber
-
-# Aplicación Flask
-app = Flask(__name__)
-api = Api(app)
-
-# Configurar suscriptores
-event_manager = EventManager()
-event_manager.subscribe('ProductCreatedEvent', LogSubscriber())
-event_manager.subscribe('FavoriteAddedEvent', LogSubscriber())
-event_manager.subscribe('FavoriteAddedEvent', RecommendationSubscriber())
-event_manager.subscribe('ProductCreatedEvent', ConsoleSubscriber())
-
-# Registrar los endpoints
-api.add_resource(AuthenticationResource, '/auth')
-api.add_resource(ProductsResource, '/products', '/products/<int:product_id>')
-api.add_resource(CategoriesResource, '/categories', '/categories/<int:category_id>')
-api.add_resource(FavoritesResource, '/favorites')
-
-if __name__ == '__main__':
-    app.run(debug=True)
+"""
+Punto de entrada de la API Flask.
+
+La aplicación se construye con `create_app()`. El objeto `app` de este
+módulo se crea recién la primera vez que se pide (`from app import app`,
+PEP 562), así que importar el módulo es barato y Flask, los endpoints y
+los suscriptores se cargan solo al construir la app.
+"""
+
+import threading
+from config.settings import (
+    DATABASE_FILE, DATABASE_MAX_OPEN, DATABASE_MAX_MEMORY,
+    PROFILING_ENABLED, PROFILING_SAMPLE_RATE, PROFILING_INTERVAL,
+    COMPRESSION_ENABLED, COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE, COMPRESSION_CACHE,
+    SUBSCRIBER_PROCESSES, SUBSCRIBER_BATCH_SIZE, SUBSCRIBER_QUEUE_SIZE
+)
+
+# Suscriptores por tipo de evento ('modulo:Clase'); cada uno se importa y
+# construye recién con su primer evento (ver LazySubscriber). Los marcados
+# 'process' corren en un pool de procesos si SUBSCRIBER_PROCESSES > 0 (ver
+# notifications/process_pool.py); deben ser independientes del estado en
+# memoria de la app.
+SUBSCRIBERS = [
+    ('ProductCreatedEvent', 'notifications.subscribers.log_subscriber:LogSubscriber'),
+    ('FavoriteAddedEvent', 'notifications.subscribers.log_subscriber:LogSubscriber'),
+    ('FavoriteAddedEvent', 'notifications.subscribers.recommendation_subscriber:RecommendationSubscriber', 'process'),
+    ('ProductCreatedEvent', 'notifications.subscribers.console_subscriber:ConsoleSubscriber'),
+    ('ProductPriceChangedEvent', 'notifications.subscribers.log_subscriber:LogSubscriber'),
+    ('ProductDeletedEvent', 'notifications.subscribers.log_subscriber:LogSubscriber'),
+    ('FavoriteAddedEvent', 'notifications.subscribers.popularity_subscriber:PopularitySubscriber'),
+    ('FavoriteRemovedEvent', 'notifications.subscribers.popularity_subscriber:PopularitySubscriber'),
+    ('ProductDeletedEvent', 'notifications.subscribers.popularity_subscriber:PopularitySubscriber'),
+    ('ProductCreatedEvent', 'notifications.subscribers.price_history_subscriber:PriceHistorySubscriber'),
+    ('ProductPriceChangedEvent', 'notifications.subscribers.price_history_subscriber:PriceHistorySubscriber'),
+    ('DatabaseReloadedEvent', 'notifications.subscribers.reload_subscriber:ReloadSubscriber'),
+]
+
+_app_lock = threading.Lock()
+_subscribers_lock = threading.Lock()
+_subscribers_registered = False
+subscriber_pool = None  # SubscriberPool de los suscriptores 'process', si hay procesos
+
+
+def register_subscribers():
+    """Configura los suscriptores globales (una sola vez por proceso)."""
+    global _subscribers_registered, subscriber_pool
+    from notifications.event_manager import EventManager
+    from notifications.subscribers.lazy_subscriber import LazySubscriber
+
+    with _subscribers_lock:
+        if _subscribers_registered:
+            return
+        event_manager = EventManager()
+        for event_type, target, *options in SUBSCRIBERS:
+            if 'process' in options and SUBSCRIBER_PROCESSES:
+                from notifications.process_pool import SubscriberPool
+                from notifications.subscribers.process_subscriber import ProcessSubscriber
+                if subscriber_pool is None:
+                    # Los procesos arrancan con el primer evento
+                    subscriber_pool = SubscriberPool(SUBSCRIBER_PROCESSES, SUBSCRIBER_BATCH_SIZE,
+                                                     SUBSCRIBER_QUEUE_SIZE)
+                event_manager.subscribe(event_type, ProcessSubscriber(subscriber_pool, target))
+            else:
+                event_manager.subscribe(event_type, LazySubscriber(target))
+        _subscribers_registered = True
+
+
+def create_app():
+    """Crea la aplicación Flask con sus endpoints y extensiones."""
+    from flask import Flask
+    from flask_restful import Api
+    from endpoints import (
+        AuthenticationResource,
+        ProductsResource,
+        CategoriesResource,
+        FavoritesResource,
+        ChangesResource,
+        PopularProductsResource,
+        AuditResource,
+        PriceHistoryResource
+    )
+
+    app = Flask(__name__)
+    api = Api(app)
+
+    register_subscribers()
+
+    # Registrar los endpoints
+    api.add_resource(AuthenticationResource, '/auth')
+    api.add_resource(ProductsResource, '/products', '/products/<int:product_id>')
+    api.add_resource(PopularProductsResource, '/products/popular')
+    api.add_resource(PriceHistoryResource, '/products/<int:product_id>/price-history')
+    api.add_resource(CategoriesResource, '/categories', '/categories/<int:category_id>')
+    api.add_resource(FavoritesResource, '/favorites')
+    api.add_resource(ChangesResource, '/changes')
+    api.add_resource(AuditResource, '/audit')
+
+    # Con el registro de conexiones acotado, la base no se desaloja a mitad de una petición
+    if DATABASE_MAX_OPEN is not None or DATABASE_MAX_MEMORY is not None:
+        from utils.database_connection import init_request_sessions
+        init_request_sessions(app, DATABASE_FILE)
+
+    # Profiling opcional: sin hooks registrados cuando está deshabilitado
+    if PROFILING_ENABLED:
+        from endpoints import ProfileResource
+        from utils.profiler import SamplingProfiler, init_profiling
+        init_profiling(app, SamplingProfiler(PROFILING_SAMPLE_RATE, PROFILING_INTERVAL))
+        api.add_resource(ProfileResource, '/admin/profile')
+
+    # Compresión de respuestas negociada con Accept-Encoding
+    if COMPRESSION_ENABLED:
+        from utils.compression import ResponseCompressor, init_compression
+        init_compression(app, ResponseCompressor(COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE, COMPRESSION_CACHE))
+
+    return app
+
+
+def __getattr__(name):
+    """Crea `app` la primera vez que se pide."""
+    if name != 'app':
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    with _app_lock:
+        if 'app' not in globals():
+            globals()['app'] = create_app()
+    return globals()['app']
+
+
+if __name__ == '__main__':
+    create_app().run(debug=True)
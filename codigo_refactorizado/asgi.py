@@ -0,0 +1,508 @@
+"""
+Punto de entrada ASGI (opcional) de la API.
+
+Sirve los mismos recursos que app.py (auth, products, categories, favorites)
+con handlers asíncronos: las escrituras a disco se delegan a un executor a
+través de AsyncRepository y los eventos se emiten con AsyncEventManager.
+
+Se ejecuta con cualquier servidor ASGI, por ejemplo:
+    uvicorn asgi:app
+"""
+
+import asyncio
+import json
+import re
+from datetime import datetime
+from itertools import islice
+from urllib.parse import parse_qs
+
+from config.settings import (
+    AUTH_USERNAME, AUTH_PASSWORD, VALID_TOKEN, DATABASE_FILE, ERROR_MESSAGES,
+    POPULAR_DEFAULT_LIMIT, POPULAR_MAX_LIMIT, AUDIT_LOG_FILE, PRICE_HISTORY_FILE
+)
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import is_valid_token
+from utils.audit_log import audit_log
+from utils.price_history import price_history_store, RESOLUTIONS
+from utils.idempotency import idempotency_cache, fingerprint, invalid_key, claim_response
+from repositories.async_repository import AsyncRepository
+from repositories.base_repository import IntegrityError
+from repositories.product_repository import ProductRepository
+from repositories.category_repository import CategoryRepository
+from repositories.sharded_favorite_repository import favorite_repository
+from notifications.async_event_manager import AsyncEventManager
+from notifications.events.product_events import (
+    ProductCreatedEvent,
+    ProductPriceChangedEvent,
+    ProductDeletedEvent
+)
+from notifications.events.favorite_events import FavoriteAddedEvent, FavoriteRemovedEvent
+from notifications.subscribers.log_subscriber import LogSubscriber
+from notifications.subscribers.recommendation_subscriber import RecommendationSubscriber
+from notifications.subscribers.console_subscriber import ConsoleSubscriber
+from notifications.subscribers.popularity_subscriber import PopularitySubscriber, popular_products
+from notifications.subscribers.price_history_subscriber import PriceHistorySubscriber
+
+# Configurar suscriptores (los síncronos se ejecutan fuera del event loop)
+event_manager = AsyncEventManager()
+event_manager.subscribe('ProductCreatedEvent', LogSubscriber())
+event_manager.subscribe('FavoriteAddedEvent', LogSubscriber())
+event_manager.subscribe('FavoriteAddedEvent', RecommendationSubscriber())
+event_manager.subscribe('ProductCreatedEvent', ConsoleSubscriber())
+event_manager.subscribe('ProductPriceChangedEvent', LogSubscriber())
+event_manager.subscribe('ProductDeletedEvent', LogSubscriber())
+popularity_subscriber = PopularitySubscriber()
+for _event_type in ('FavoriteAddedEvent', 'FavoriteRemovedEvent', 'ProductDeletedEvent'):
+    event_manager.subscribe(_event_type, popularity_subscriber)
+price_history_subscriber = PriceHistorySubscriber()
+event_manager.subscribe('ProductCreatedEvent', price_history_subscriber)
+event_manager.subscribe('ProductPriceChangedEvent', price_history_subscriber)
+
+
+class Request:
+    """Petición HTTP mínima construida a partir del scope ASGI."""
+
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode()).items()}
+        self.query_string = scope.get('query_string', b'')
+        self.headers = {k.decode().lower(): v.decode() for k, v in scope.get('headers', [])}
+        self.body = body
+
+    @property
+    def json(self):
+        """Cuerpo JSON ({} si está vacío o no es JSON válido)."""
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return {}
+
+
+def _json_object(request):
+    """(cuerpo, None), o (None, respuesta 400) si el JSON no es un objeto."""
+    data = request.json
+    if not isinstance(data, dict):
+        return None, ({'message': 'Request body must be a JSON object'}, 400)
+    return data, None
+
+
+class StreamingBody:
+    """Cuerpo que se envía por partes; las líneas salen de un iterador síncrono."""
+
+    CHUNK_LINES = 1000
+
+    def __init__(self, lines, content_type):
+        self.lines = lines
+        self.content_type = content_type
+
+    def next_chunk(self):
+        """Siguiente parte (b'' al terminar); se llama desde el executor."""
+        return ''.join(line + '\n' for line in islice(self.lines, self.CHUNK_LINES)).encode()
+
+
+def _repository(factory):
+    """Adapta el repositorio que `factory` construye sobre la base principal."""
+    return AsyncRepository(factory(DatabaseConnection(DATABASE_FILE)))
+
+
+def _parse_args(request, spec, partial=False):
+    """
+    Equivalente reducido de reqparse: busca cada campo en el JSON y en el
+    query string, aplica el tipo y reporta los faltantes con su ayuda.
+    Con `partial` los campos ausentes se omiten (como store_missing=False).
+    """
+    data, error = _json_object(request)
+    if error:
+        return None, error
+    source = {**request.args, **data}
+    args, errors = {}, {}
+    for field, (field_type, help_text) in spec.items():
+        value = source.get(field)
+        if value is None and partial:
+            continue
+        try:
+            if value is None:
+                raise ValueError
+            args[field] = field_type(value)
+        except (TypeError, ValueError):
+            errors[field] = help_text
+    if errors:
+        return None, ({'message': errors}, 400)
+    return args, None
+
+
+def require_auth(handler):
+    """Versión asíncrona de utils.auth_decorator.require_auth."""
+    async def wrapper(request, **params):
+        token = request.headers.get('authorization')
+        if not token:
+            return {'message': ERROR_MESSAGES['token_not_found']}, 401
+        if not is_valid_token(token):
+            return {'message': ERROR_MESSAGES['invalid_token']}, 401
+        return await handler(request, **params)
+    return wrapper
+
+
+def idempotent(handler):
+    """
+    Versión asíncrona de utils.idempotency.idempotent: la espera a un
+    pedido duplicado en curso y la escritura del backend compartido se
+    hacen en el executor.
+    """
+    async def wrapper(request, **params):
+        key = request.headers.get('idempotency-key')
+        if key is None:
+            return await handler(request, **params)
+        error = invalid_key(key)
+        if error:
+            return error
+
+        loop = asyncio.get_running_loop()
+        cache = idempotency_cache()
+        claim = await loop.run_in_executor(
+            None, cache.begin, f'{request.method} {request.path}', key,
+            fingerprint(request.method, request.path, request.query_string, request.body)
+        )
+        if not claim.owned:
+            return claim_response(claim)
+        try:
+            payload, status = await handler(request, **params)
+        except BaseException:
+            cache.release(claim)
+            raise
+        await loop.run_in_executor(None, cache.complete, claim, payload, status)
+        return payload, status
+    return wrapper
+
+
+# ============ Handlers ============
+
+async def auth(request):
+    data, error = _json_object(request)
+    if error:
+        return error
+    if data.get('username') == AUTH_USERNAME and data.get('password') == AUTH_PASSWORD:
+        return {'token': VALID_TOKEN}, 200
+    return {'message': 'Unauthorized: invalid credentials'}, 401
+
+
+PRODUCT_ARGS = {
+    'name': (str, 'Name of the product'),
+    'category': (str, 'Category of the product'),
+    'price': (float, 'Price of the product'),
+}
+CATEGORY_ARGS = {'name': (str, 'Name of the category')}
+FAVORITE_ARGS = {
+    'user_id': (int, 'User ID'),
+    'product_id': (int, 'Product ID'),
+}
+
+
+@require_auth
+async def get_products(request, product_id=None):
+    repository = _repository(ProductRepository)
+    category_filter = request.args.get('category')
+    if category_filter:
+        return await repository.get_by_category(category_filter), 200
+    if product_id is not None:
+        product = await repository.get_by_id(int(product_id))
+        if product:
+            return product, 200
+        return {'message': 'Product not found'}, 404
+    return list(await repository.get_all()), 200
+
+
+@require_auth
+@idempotent
+async def create_product(request):
+    args, error = _parse_args(request, PRODUCT_ARGS)
+    if error:
+        return error
+    try:
+        new_product = await _repository(ProductRepository).create(**args)
+    except IntegrityError as error:
+        return {'message': str(error)}, 400
+    await event_manager.emit(ProductCreatedEvent(new_product))
+    return {'message': 'Product added', 'product': new_product}, 201
+
+
+async def _update_product(request, product_id, partial):
+    changes, error = _parse_args(request, PRODUCT_ARGS, partial)
+    if error:
+        return error
+    if not changes:
+        return {'message': 'No fields to update'}, 400
+    try:
+        result = await _repository(ProductRepository).update(int(product_id), changes)
+    except IntegrityError as error:
+        return {'message': str(error)}, 400
+    if result is None:
+        return {'message': 'Product not found'}, 404
+    previous, product = result
+    if previous['price'] != product['price']:
+        await event_manager.emit(ProductPriceChangedEvent(product['id'], previous['price'], product['price']))
+    return {'message': 'Product updated', 'product': product}, 200
+
+
+@require_auth
+async def replace_product(request, product_id):
+    return await _update_product(request, product_id, partial=False)
+
+
+@require_auth
+async def patch_product(request, product_id):
+    return await _update_product(request, product_id, partial=True)
+
+
+@require_auth
+async def delete_product(request, product_id):
+    product = await _repository(ProductRepository).remove(int(product_id))
+    if product is None:
+        return {'message': 'Product not found'}, 404
+    await event_manager.emit(ProductDeletedEvent(product['id'], product['name']))
+    return {'message': 'Product deleted', 'product': product}, 200
+
+
+@require_auth
+async def get_popular_products(request):
+    try:
+        limit = int(request.args.get('limit', POPULAR_DEFAULT_LIMIT))
+    except ValueError:
+        return {'message': {'limit': 'Number of products'}}, 400
+    limit = min(max(limit, 1), POPULAR_MAX_LIMIT)
+    products = ProductRepository(DatabaseConnection(DATABASE_FILE))
+    # El primer uso recuenta los favoritos (o lee el checkpoint): fuera del event loop
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        None, popular_products, products, request.args.get('category'), limit
+    )
+    return result, 200
+
+
+@require_auth
+async def get_audit(request):
+    bounds = {}
+    for name in ('since', 'until'):
+        value = request.args.get(name)
+        if value is not None:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                return {'message': {name: 'ISO 8601 date'}}, 400
+        bounds[name] = value
+    lines = audit_log(AUDIT_LOG_FILE).query(request.args.get('event_type'), **bounds)
+    if 'limit' in request.args:
+        try:
+            lines = islice(lines, max(int(request.args['limit']), 0))
+        except ValueError:
+            return {'message': {'limit': 'Maximum number of entries'}}, 400
+    return StreamingBody(lines, 'application/x-ndjson'), 200
+
+
+@require_auth
+async def get_price_history(request, product_id):
+    product_id = int(product_id)
+    bounds = {}
+    for name in ('from', 'to'):
+        try:
+            bounds[name] = datetime.fromisoformat(request.args[name]) if name in request.args else None
+        except ValueError:
+            return {'message': {name: 'ISO 8601 date'}}, 400
+    resolution = request.args.get('resolution', 'raw')
+    if resolution != 'raw' and resolution not in RESOLUTIONS:
+        return {'message': {'resolution': 'raw, hour or day'}}, 400
+    # Lee el archivo de historial: fuera del event loop
+    loop = asyncio.get_running_loop()
+    points = await loop.run_in_executor(
+        None, price_history_store(PRICE_HISTORY_FILE).history,
+        product_id, bounds['from'], bounds['to'], None if resolution == 'raw' else resolution
+    )
+    if points is None:
+        if await _repository(ProductRepository).get_by_id(product_id) is None:
+            return {'message': 'Product not found'}, 404
+        points = []
+    return {'product_id': product_id, 'resolution': resolution, 'points': points}, 200
+
+
+@require_auth
+async def get_categories(request, category_id=None):
+    repository = _repository(CategoryRepository)
+    if category_id is not None:
+        category = await repository.get_by_id(int(category_id))
+        if category:
+            return category, 200
+        return {'message': 'Category not found'}, 404
+    return list(await repository.get_all()), 200
+
+
+@require_auth
+async def create_category(request):
+    args, error = _parse_args(request, CATEGORY_ARGS)
+    if error:
+        return error
+    repository = _repository(CategoryRepository)
+    if await repository.exists(args['name']):
+        return {'message': 'Category already exists'}, 400
+    new_category = await repository.create(args['name'])
+    return {'message': 'Category added successfully', 'category': new_category}, 201
+
+
+@require_auth
+async def delete_category(request):
+    args, error = _parse_args(request, CATEGORY_ARGS)
+    if error:
+        return error
+    repository = _repository(CategoryRepository)
+    if not await repository.exists(args['name']):
+        return {'message': 'Category not found'}, 404
+    try:
+        removed_products = await repository.remove(args['name'])
+    except IntegrityError as error:
+        return {'message': str(error)}, 409
+    for product in removed_products:
+        await event_manager.emit(ProductDeletedEvent(product['id'], product['name']))
+    return {'message': 'Category removed successfully', 'removed_products': len(removed_products)}, 200
+
+
+@require_auth
+async def get_favorites(request):
+    repository = _repository(favorite_repository)
+    if 'user_id' in request.args:
+        try:
+            user_id = int(request.args['user_id'])
+        except ValueError:
+            return {'message': {'user_id': 'User ID'}}, 400
+        return await repository.get_by_user(user_id), 200
+    return list(await repository.get_all()), 200
+
+
+@require_auth
+@idempotent
+async def create_favorite(request):
+    args, error = _parse_args(request, FAVORITE_ARGS)
+    if error:
+        return error
+    try:
+        new_favorite, created = await _repository(favorite_repository).add_if_absent(**args)
+    except IntegrityError as error:
+        return {'message': str(error)}, 400
+    if not created:
+        return {'message': 'Product already in favorites', 'favorite': new_favorite}, 200
+    await event_manager.emit(FavoriteAddedEvent(new_favorite))
+    return {'message': 'Product added to favorites', 'favorite': new_favorite}, 201
+
+
+@require_auth
+async def delete_favorite(request):
+    args, error = _parse_args(request, FAVORITE_ARGS)
+    if error:
+        return error
+    removed = await _repository(favorite_repository).remove(args['user_id'], args['product_id'])
+    for favorite in removed:
+        await event_manager.emit(FavoriteRemovedEvent(favorite))
+    return {'message': 'Product removed from favorites'}, 200
+
+
+# ============ Enrutamiento ============
+
+ROUTES = [
+    ('POST', r'/auth', auth),
+    ('GET', r'/products', get_products),
+    ('GET', r'/products/(?P<product_id>\d+)', get_products),
+    ('GET', r'/products/popular', get_popular_products),
+    ('GET', r'/products/(?P<product_id>\d+)/price-history', get_price_history),
+    ('POST', r'/products', create_product),
+    ('PUT', r'/products/(?P<product_id>\d+)', replace_product),
+    ('PATCH', r'/products/(?P<product_id>\d+)', patch_product),
+    ('DELETE', r'/products/(?P<product_id>\d+)', delete_product),
+    ('GET', r'/categories', get_categories),
+    ('GET', r'/categories/(?P<category_id>\d+)', get_categories),
+    ('POST', r'/categories', create_category),
+    ('DELETE', r'/categories', delete_category),
+    ('GET', r'/favorites', get_favorites),
+    ('POST', r'/favorites', create_favorite),
+    ('DELETE', r'/favorites', delete_favorite),
+    ('GET', r'/audit', get_audit),
+]
+_COMPILED_ROUTES = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES]
+
+
+def _resolve(method, path):
+    """Retorna (handler, params) o un error 404/405."""
+    path_matched = False
+    for route_method, pattern, handler in _COMPILED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            path_matched = True
+            if route_method == method:
+                return handler, match.groupdict(), None
+    if path_matched:
+        return None, None, ({'message': 'The method is not allowed for the requested URL.'}, 405)
+    return None, None, ({'message': 'The requested URL was not found on the server.'}, 404)
+
+
+async def _read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def app(scope, receive, send):
+    """Aplicación ASGI."""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    request = Request(scope, await _read_body(receive))
+    handler, params, error = _resolve(request.method, request.path.rstrip('/') or '/')
+    headers = {}
+    if error:
+        payload, status = error
+    else:
+        payload, status, *extra = await handler(request, **params)
+        if extra:
+            headers = extra[0]
+
+    if isinstance(payload, StreamingBody):
+        await _send_stream(send, status, payload)
+        return
+
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            *((name.lower().encode(), value.encode()) for name, value in headers.items()),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_stream(send, status, payload):
+    """Envía un StreamingBody sin bloquear el loop (cada parte se lee en el executor)."""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', payload.content_type.encode())],
+    })
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, payload.next_chunk)
+        if not chunk:
+            break
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
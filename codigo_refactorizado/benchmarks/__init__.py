@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento de la API.
+
+Se ejecutan desde la carpeta codigo_refactorizado, por ejemplo:
+    python -m benchmarks.async_vs_wsgi --help
+"""
@@ -0,0 +1,68 @@
+"""
+Servidor HTTP/1.1 mínimo para aplicaciones ASGI, basado en asyncio.
+
+Solo existe para que los benchmarks no dependan de un servidor externo;
+en producción se usa uvicorn u otro servidor ASGI.
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+
+
+async def _handle_connection(app, reader, writer):
+    try:
+        request_line = await reader.readline()
+        if not request_line:
+            return
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = []
+        content_length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.append((name.strip().lower().encode(), value.strip().encode()))
+            if name.strip().lower() == 'content-length':
+                content_length = int(value.strip())
+        body = await reader.readexactly(content_length) if content_length else b''
+
+        url = urlsplit(target)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'path': url.path,
+            'query_string': url.query.encode(),
+            'headers': headers,
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                lines = [f"HTTP/1.1 {message['status']} OK"]
+                lines += [f'{k.decode()}: {v.decode()}' for k, v in message.get('headers', [])]
+                lines.append('Connection: close')
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            elif message['type'] == 'http.response.body':
+                writer.write(message.get('body', b''))
+
+        await app(scope, receive, send)
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def _serve(app, host, port):
+    server = await asyncio.start_server(
+        lambda r, w: _handle_connection(app, r, w), host, port, backlog=1024
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def serve(app, host='127.0.0.1', port=8000):
+    asyncio.run(_serve(app, host, port))
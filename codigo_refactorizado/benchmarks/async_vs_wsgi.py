@@ -0,0 +1,59 @@
+"""
+Prueba de carga: throughput con conexiones concurrentes de la app WSGI
+(Flask, servidor con un hilo por conexión) vs. la app ASGI (asgi.py).
+
+La mezcla de peticiones combina lecturas (GET /products) con escrituras
+(POST /favorites), que son las que bloquean en DatabaseConnection._save.
+
+    python -m benchmarks.async_vs_wsgi --concurrency 1 10 50 --duration 5
+"""
+
+import argparse
+import itertools
+import random
+import shutil
+
+from benchmarks.common import (
+    free_port, prepare_workdir, run_load, start_server, stop_server, write_report
+)
+
+
+def request_mix(write_ratio, seed=0):
+    rng = random.Random(seed)
+    counter = itertools.count()
+
+    def next_request():
+        if rng.random() < write_ratio:
+            n = next(counter)
+            return 'POST', '/favorites', {'user_id': n % 1000, 'product_id': n % 24 + 1}
+        return 'GET', '/products', None
+
+    return next_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+    parser.add_argument('--duration', type=float, default=5.0, help='Segundos por escenario')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'async_vs_wsgi', 'write_ratio': args.write_ratio, 'results': []}
+    for kind in ('wsgi', 'asgi'):
+        for concurrency in args.concurrency:
+            workdir = prepare_workdir()
+            port = free_port()
+            server = start_server(kind, workdir, port)
+            try:
+                result = run_load(port, request_mix(args.write_ratio), concurrency, args.duration)
+            finally:
+                stop_server(server)
+                shutil.rmtree(workdir, ignore_errors=True)
+            report['results'].append({'app': kind, 'concurrency': concurrency, **result})
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
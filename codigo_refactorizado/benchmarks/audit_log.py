@@ -0,0 +1,117 @@
+"""
+Consultas al log de auditoría rotado e indexado frente a recorrer un único
+archivo sin rotar (lo que implicaba el audit.log anterior).
+
+Se generan `megabytes` de entradas repartidas en `days` días, con
+distribución de tipos como la de la app (muchos favoritos, pocas bajas).
+Se rota cada `segment_mb` y el mismo contenido se escribe también en un
+archivo plano. Para cada consulta se mide:
+
+- indexed: AuditLog.query (descarta segmentos y bloques por el índice).
+- linear: leer el archivo plano entero y filtrar cada línea.
+
+    python -m benchmarks.audit_log --megabytes 2048 --days 30
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import write_report
+from utils.audit_log import AuditLog, _matching
+
+EVENT_TYPES = [('FavoriteAddedEvent', 70), ('ProductCreatedEvent', 15), ('ProductPriceChangedEvent', 10),
+               ('FavoriteRemovedEvent', 4), ('ProductDeletedEvent', 1)]
+
+
+def generate(log, plain_path, megabytes, days, segment_mb, seed):
+    """Escribe las entradas en orden de tiempo; rota el log cada `segment_mb`."""
+    rng = random.Random(seed)
+    types, weights = zip(*EVENT_TYPES)
+    start = datetime(2026, 1, 1)
+    total = megabytes * 2 ** 20
+    # Tamaño aproximado de una entrada, para repartir los días
+    step = timedelta(days=days) / (total / 190)
+    now, written, active = start, 0, 0
+    with open(plain_path, 'w') as plain:
+        while written < total:
+            lines = []
+            for _ in range(10000):
+                now += step
+                event_type = rng.choices(types, weights)[0]
+                lines.append(json.dumps({
+                    'logged_at': now.isoformat(), 'event_type': event_type, 'timestamp': now.isoformat(),
+                    'data': {'user_id': rng.randrange(100000), 'product_id': rng.randrange(1000000)},
+                }) + '\n')
+            chunk = ''.join(lines)
+            plain.write(chunk)
+            with open(log.path, 'a') as f:
+                f.write(chunk)
+            written += len(chunk)
+            active += len(chunk)
+            if active >= segment_mb * 2 ** 20:
+                log.rotate()
+                active = 0
+    log.rotate()
+    return start
+
+
+def linear(plain_path, event_type, since, until):
+    with open(plain_path) as f:
+        return sum(1 for _ in _matching(f, event_type, since, until))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=int, default=2048)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--segment-mb', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-audit-')
+    log = AuditLog(os.path.join(workdir, 'audit.log'), max_bytes=None)
+    plain_path = os.path.join(workdir, 'plain.log')
+    report = {'benchmark': 'audit_log', 'megabytes': args.megabytes, 'days': args.days,
+              'segment_mb': args.segment_mb, 'results': []}
+    try:
+        began = time.perf_counter()
+        start = generate(log, plain_path, args.megabytes, args.days, args.segment_mb, args.seed)
+        report['generate_s'] = round(time.perf_counter() - began, 1)
+        report['segments'] = len(log.segments())
+        report['compressed_mb'] = round(sum(os.path.getsize(p) for p in log.segments()) / 2 ** 20, 1)
+
+        middle = start + timedelta(days=args.days / 2)
+        queries = [
+            ('one_hour', None, middle, middle + timedelta(hours=1)),
+            ('one_day_deletions', 'ProductDeletedEvent', middle, middle + timedelta(days=1)),
+            ('all_deletions', 'ProductDeletedEvent', None, None),
+        ]
+        for name, event_type, since, until in queries:
+            since = since.isoformat() if since else None
+            until = until.isoformat() if until else None
+            began = time.perf_counter()
+            matches = sum(1 for _ in log.query(event_type, since, until))
+            indexed = time.perf_counter() - began
+            began = time.perf_counter()
+            assert linear(plain_path, event_type, since, until) == matches
+            scan = time.perf_counter() - began
+            report['results'].append({
+                'query': name, 'matches': matches,
+                'indexed_ms': round(indexed * 1000, 1), 'linear_ms': round(scan * 1000, 1),
+                'speedup': round(scan / indexed, 1) if indexed else None,
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Suite de benchmarks de la API REST.
+
+Para cada app (codigo_refactorizado y, opcionalmente, codigo_original)
+genera una base sintética y ejecuta cada escenario con dos drivers:
+
+- test_client: el test client de Flask en un subproceso (sin red).
+- http: el servidor WSGI real atacado por varios procesos generadores de
+  carga, cada uno con sus propias conexiones concurrentes.
+
+El resultado (p50/p95/p99, throughput y RSS) se emite en JSON para poder
+compararlo entre ejecuciones:
+
+    python -m benchmarks.bench_api --products 10000 --favorites 50000 \\
+        --targets refactorizado original --output bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import (
+    PROJECT_DIR, collect_load, free_port, process_rss_mb, start_server, stop_server,
+    summarize, write_report,
+)
+from benchmarks.scenarios import SCENARIOS, request_factory
+from benchmarks.synthetic_db import generate_database
+
+TARGETS = {
+    'refactorizado': PROJECT_DIR,
+    'original': os.path.join(os.path.dirname(PROJECT_DIR), 'codigo_original'),
+}
+
+
+def prepare_synthetic_workdir(sizes, seed):
+    """Directorio temporal con db.json (y favorites.json, que usa codigo_original)."""
+    workdir = tempfile.mkdtemp(prefix='bench-api-')
+    data = generate_database(
+        os.path.join(workdir, 'db.json'), products=sizes['products'], categories=sizes['categories'],
+        favorites=sizes['favorites'], users=sizes['users'], seed=seed,
+    )
+    with open(os.path.join(workdir, 'favorites.json'), 'w') as f:
+        json.dump({'favorites': data['favorites']}, f)
+    return workdir, [c['name'] for c in data['categories']]
+
+
+def run_test_client(project_dir, workdir, scenario, sizes, requests):
+    driver = os.path.join(PROJECT_DIR, 'benchmarks', 'flask_client_driver.py')
+    output = subprocess.run(
+        [sys.executable, driver, scenario, '--requests', str(requests), '--sizes', json.dumps(sizes)],
+        cwd=workdir, env=dict(os.environ, PYTHONPATH=project_dir),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def _load_process(args):
+    port, scenario, sizes, concurrency, duration, seed = args
+    latencies, errors, elapsed = collect_load(port, request_factory(scenario, sizes, seed), concurrency, duration)
+    return latencies, errors, elapsed
+
+
+def run_http(project_dir, workdir, scenario, sizes, processes, concurrency, duration):
+    port = free_port()
+    server = start_server('wsgi', workdir, port, project_dir=project_dir)
+    try:
+        jobs = [(port, scenario, sizes, concurrency, duration, seed) for seed in range(processes)]
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_load_process, jobs)
+        rss = process_rss_mb(server.pid)
+    finally:
+        stop_server(server)
+
+    latencies = [latency for result in results for latency in result[0]]
+    summary = summarize(latencies, max(result[2] for result in results))
+    summary['errors'] = sum(result[1] for result in results)
+    summary['rss_mb'] = rss
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--favorites', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--targets', nargs='+', choices=sorted(TARGETS), default=['refactorizado', 'original'])
+    parser.add_argument('--drivers', nargs='+', choices=['test_client', 'http'], default=['test_client', 'http'])
+    parser.add_argument('--requests', type=int, default=500, help='Peticiones por escenario (test_client)')
+    parser.add_argument('--processes', type=int, default=2, help='Procesos generadores de carga (http)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Conexiones por proceso (http)')
+    parser.add_argument('--duration', type=float, default=3.0, help='Segundos por escenario (http)')
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    sizes = {'products': args.products, 'categories': args.categories,
+             'favorites': args.favorites, 'users': args.users}
+    report = {'benchmark': 'bench_api', 'sizes': sizes, 'results': []}
+
+    for target in args.targets:
+        for scenario in args.scenarios:
+            for driver in args.drivers:
+                # Cada escenario parte de una base limpia: los POST no se acumulan
+                workdir, category_names = prepare_synthetic_workdir(sizes, args.seed)
+                scenario_sizes = dict(sizes, category_names=category_names)
+                try:
+                    if driver == 'test_client':
+                        result = run_test_client(TARGETS[target], workdir, scenario, scenario_sizes, args.requests)
+                    else:
+                        result = run_http(TARGETS[target], workdir, scenario, scenario_sizes,
+                                          args.processes, args.concurrency, args.duration)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                report['results'].append({'target': target, 'driver': driver, 'scenario': scenario, **result})
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
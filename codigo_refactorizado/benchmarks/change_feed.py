@@ -0,0 +1,112 @@
+"""
+Ancho de banda y CPU del servidor para clientes que sondean cambios.
+
+Compara tres estrategias de un cliente que quiere mantenerse al día con
+/products y /favorites mientras otros escriben:
+
+- full: GET completo de ambas colecciones en cada sondeo.
+- conditional: GET con If-None-Match (304 si la colección no cambió).
+- delta: GET /changes?since=<version>.
+
+    python -m benchmarks.change_feed --products 10000 --favorites 50000 --clients 20 --rounds 50
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import TOKEN, write_report
+from benchmarks.synthetic_db import generate_database
+from utils.database_connection import DatabaseConnection
+
+HEADERS = {'Authorization': TOKEN}
+
+
+def poll_full(client, state):
+    size = 0
+    for path in ('/products', '/favorites'):
+        size += len(client.get(path, headers=HEADERS).data)
+    return size
+
+
+def poll_conditional(client, state):
+    size = 0
+    for path in ('/products', '/favorites'):
+        headers = dict(HEADERS)
+        if path in state:
+            headers['If-None-Match'] = state[path]
+        response = client.get(path, headers=headers)
+        state[path] = response.headers.get('ETag')
+        size += len(response.data)
+    return size
+
+
+def poll_delta(client, state):
+    epoch = f"&epoch={state['epoch']}" if 'epoch' in state else ''
+    response = client.get(f"/changes?since={state.get('version', 0)}{epoch}&collection=products,favorites",
+                          headers=HEADERS)
+    body = response.get_json()
+    state['version'], state['epoch'] = body['version'], body['epoch']
+    return len(response.data)
+
+
+STRATEGIES = {'full': poll_full, 'conditional': poll_conditional, 'delta': poll_delta}
+
+
+def run(strategy, client, clients, rounds, writes_per_round):
+    poll = STRATEGIES[strategy]
+    states = [{} for _ in range(clients)]
+    for state in states:
+        poll(client, state)  # Sincronización inicial, fuera de la medición
+
+    total_bytes = 0
+    cpu = 0.0
+    for n in range(rounds):
+        for i in range(writes_per_round):
+            client.post('/favorites', json={'user_id': n, 'product_id': i + 1}, headers=HEADERS)
+        start = time.process_time()
+        for state in states:
+            total_bytes += poll(client, state)
+        cpu += time.process_time() - start
+
+    polls = clients * rounds
+    return {
+        'strategy': strategy,
+        'bytes_per_poll': round(total_bytes / polls, 1),
+        'cpu_ms_per_poll': round(cpu / polls * 1000, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--favorites', type=int, default=10000)
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--writes-per-round', type=int, default=1)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'change_feed', 'products': args.products, 'favorites': args.favorites,
+              'clients': args.clients, 'rounds': args.rounds, 'results': []}
+    cwd = os.getcwd()
+    for strategy in STRATEGIES:
+        workdir = tempfile.mkdtemp(prefix='bench-changes-')
+        try:
+            generate_database(os.path.join(workdir, 'db.json'), products=args.products, favorites=args.favorites)
+            os.chdir(workdir)
+            DatabaseConnection._instances.clear()
+            from app import app
+            report['results'].append(run(strategy, app.test_client(), args.clients, args.rounds,
+                                         args.writes_per_round))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Utilidades compartidas por los benchmarks: directorios de trabajo
+temporales, servidores en subprocesos, generador de carga HTTP y
+estadísticas de latencia.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN = 'abcd1234'
+
+
+# ============ Estadísticas ============
+
+def percentile(values, pct):
+    """Percentil por el método del rango más cercano (values ordenados)."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def summarize(latencies, elapsed):
+    """Resume latencias (segundos) en milisegundos y throughput (req/s)."""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+def write_report(report, output=None):
+    """Escribe el reporte en JSON (archivo o stdout)."""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+# ============ Entorno de ejecución ============
+
+def prepare_workdir(source_db=None):
+    """Crea un directorio temporal con una copia de db.json."""
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    shutil.copy(source_db or os.path.join(PROJECT_DIR, 'db.json'), os.path.join(workdir, 'db.json'))
+    return workdir
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, workdir, port, project_dir=PROJECT_DIR, timeout=15):
+    """
+    Lanza benchmarks/serve.py en un subproceso cuyo directorio de trabajo
+    es `workdir` (ahí vive db.json) y espera a que el puerto acepte
+    conexiones. Solo `project_dir` queda en el PYTHONPATH para que
+    codigo_original y codigo_refactorizado no se mezclen.
+    """
+    env = dict(os.environ, PYTHONPATH=project_dir)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_DIR, 'benchmarks', 'serve.py'), kind, '--port', str(port)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f'server {kind} did not start on port {port}')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ============ Generador de carga ============
+
+async def http_request(port, method, path, body=None, headers=None, host='127.0.0.1'):
+    """Petición HTTP/1.1 con `Connection: close`; retorna (status, body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = json.dumps(body).encode() if body is not None else b''
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}', 'Connection: close',
+             f'Content-Length: {len(payload)}', 'Content-Type: application/json']
+    lines += [f'{k}: {v}' for k, v in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1]) if head else 0
+    return status, content
+
+
+async def _worker(port, next_request, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        method, path, body = next_request()
+        start = time.perf_counter()
+        try:
+            status, _ = await http_request(port, method, path, body, {'Authorization': TOKEN})
+        except OSError:
+            status = 0
+        latencies.append(time.perf_counter() - start)
+        if status >= 400 or status == 0:
+            errors.append(status)
+
+
+async def _collect_load(port, next_request, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _worker(port, next_request, deadline, latencies, errors) for _ in range(concurrency)
+    ])
+    return latencies, len(errors), time.perf_counter() - start
+
+
+def collect_load(port, next_request, concurrency, duration):
+    """
+    Abre `concurrency` conexiones simultáneas durante `duration` segundos.
+    `next_request()` retorna la tupla (method, path, body) a enviar.
+
+    Retorna (latencias, errores, segundos transcurridos) sin resumir, para
+    poder combinar los resultados de varios procesos.
+    """
+    return asyncio.run(_collect_load(port, next_request, concurrency, duration))
+
+
+def run_load(port, next_request, concurrency, duration):
+    """Igual que collect_load pero retorna el resumen de latencias."""
+    latencies, errors, elapsed = collect_load(port, next_request, concurrency, duration)
+    result = summarize(latencies, elapsed)
+    result['errors'] = errors
+    return result
+
+
+def process_rss_mb(pid='self'):
+    """RSS actual de un proceso en MB (Linux); None si no está disponible."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+    return None
@@ -0,0 +1,72 @@
+"""
+Bytes transferidos y CPU por petición de GET /products con un catálogo
+grande, según la compresión.
+
+- identity / identity_cached: sin Accept-Encoding, serializando en cada
+  petición o una vez por versión.
+- gzip_on_the_fly: gzip en cada petición (sin caché por versión).
+- gzip_cached: cuerpo comprimido una vez por versión y reutilizado.
+
+    python -m benchmarks.compression --products 100000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import TOKEN, write_report
+from benchmarks.synthetic_db import build_data
+from utils.database_connection import DatabaseConnection
+
+STRATEGIES = (
+    ('identity', {}, False),
+    ('identity_cached', {}, True),
+    ('gzip_on_the_fly', {'Accept-Encoding': 'gzip'}, False),
+    ('gzip_cached', {'Accept-Encoding': 'gzip'}, True),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'compression', 'products': args.products, 'results': []}
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='bench-compression-')
+    try:
+        with open(os.path.join(workdir, 'db.json'), 'w') as f:
+            json.dump(build_data(products=args.products, favorites=0), f)
+        os.chdir(workdir)
+        DatabaseConnection._instances.clear()
+        from app import app
+        compressor = app.extensions['compression']
+        client = app.test_client()
+        for name, extra_headers, cache in STRATEGIES:
+            compressor.cache = cache
+            compressor._bodies.clear()
+            headers = {'Authorization': TOKEN, **extra_headers}
+            size = len(client.get('/products', headers=headers).data)  # Calentamiento
+            cpu, wall = time.process_time(), time.perf_counter()
+            for _ in range(args.repeat):
+                client.get('/products', headers=headers)
+            report['results'].append({
+                'strategy': name,
+                'bytes': size,
+                'cpu_ms_per_request': round((time.process_time() - cpu) / args.repeat * 1000, 3),
+                'ms_per_request': round((time.perf_counter() - wall) / args.repeat * 1000, 3),
+            })
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
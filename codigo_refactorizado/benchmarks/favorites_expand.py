@@ -0,0 +1,77 @@
+"""
+Favoritos de un usuario con sus productos: N+1 peticiones vs. expand.
+
+- n_plus_one: GET /favorites?user_id=X y luego GET /products/<id> por favorito.
+- expand: GET /favorites?user_id=X&expand=product (un solo join por lote).
+
+    python -m benchmarks.favorites_expand --products 100000 --user-favorites 1000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import TOKEN, write_report
+from benchmarks.synthetic_db import build_data
+from utils.database_connection import DatabaseConnection
+
+HEADERS = {'Authorization': TOKEN}
+
+
+def n_plus_one(client, user_id):
+    favorites = client.get(f'/favorites?user_id={user_id}', headers=HEADERS).get_json()
+    return [client.get(f"/products/{f['product_id']}", headers=HEADERS).get_json() for f in favorites]
+
+
+def expand(client, user_id):
+    return client.get(f'/favorites?user_id={user_id}&expand=product', headers=HEADERS).get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--user-favorites', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    data = build_data(products=args.products, favorites=0)
+    step = max(1, args.products // args.user_favorites)
+    data['favorites'] = [
+        {'user_id': 1, 'product_id': product_id}
+        for product_id in range(1, args.products + 1, step)
+    ][:args.user_favorites]
+
+    report = {'benchmark': 'favorites_expand', 'products': args.products,
+              'user_favorites': len(data['favorites']), 'results': []}
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='bench-expand-')
+    try:
+        with open(os.path.join(workdir, 'db.json'), 'w') as f:
+            json.dump(data, f)
+        os.chdir(workdir)
+        DatabaseConnection._instances.clear()
+        from app import app
+        client = app.test_client()
+        for name, strategy in (('n_plus_one', n_plus_one), ('expand', expand)):
+            strategy(client, 1)  # Calentamiento
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                strategy(client, 1)
+            report['results'].append({
+                'strategy': name,
+                'ms_per_call': round((time.perf_counter() - start) / args.repeat * 1000, 3),
+                'requests_per_call': 1 + len(data['favorites']) if name == 'n_plus_one' else 1,
+            })
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Agregar / borrar / consultar favoritos: lista plana vs. FavoriteStore.
+
+La lista reproduce la implementación anterior de FavoriteRepository
+(append sin control de duplicados, borrado y consulta por usuario con
+comprensiones sobre toda la lista). Solo se mide la estructura en
+memoria, sin persistencia.
+
+    python -m benchmarks.favorites_store --favorites 10000000 --ops 20
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import process_rss_mb, write_report
+from repositories.favorite_repository import FavoriteStore
+
+
+class ListFavorites:
+    """Implementación anterior, basada en una lista."""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def add(self, user_id, product_id):
+        self.items.append({'user_id': user_id, 'product_id': product_id})
+
+    def discard(self, user_id, product_id):
+        self.items = [
+            f for f in self.items
+            if not (f['user_id'] == user_id and f['product_id'] == product_id)
+        ]
+
+    def by_left(self, user_id):
+        return [f for f in self.items if f['user_id'] == user_id]
+
+
+def timed(operation, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        operation(*args)
+    return round((time.perf_counter() - start) / len(args_list) * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--favorites', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--ops', type=int, default=20, help='Operaciones medidas por tipo')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pairs = [(rng.randint(1, args.users), rng.randint(1, args.products)) for _ in range(args.favorites)]
+    items = [{'user_id': u, 'product_id': p} for u, p in pairs]
+    existing = [rng.choice(pairs) for _ in range(args.ops)]
+    new = [(args.users + n + 1, 1) for n in range(args.ops)]
+    users = [(u,) for u, _ in existing]
+
+    report = {'benchmark': 'favorites_store', 'favorites': args.favorites, 'ops': args.ops, 'results': []}
+    for name, factory in (('list', ListFavorites), ('adjacency', FavoriteStore)):
+        rss_before = process_rss_mb()
+        start = time.perf_counter()
+        store = factory(items)
+        build_s = time.perf_counter() - start
+        report['results'].append({
+            'implementation': name,
+            'build_s': round(build_s, 3),
+            'rss_delta_mb': round((process_rss_mb() or 0) - (rss_before or 0), 1),
+            'add_us': timed(store.add, new),
+            'lookup_by_user_us': timed(store.by_left, users),
+            'remove_us': timed(store.discard, existing),
+        })
+        del store
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
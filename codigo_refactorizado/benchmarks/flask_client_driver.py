@@ -0,0 +1,53 @@
+"""
+Driver en proceso: ejecuta un escenario con el test client de Flask.
+
+Se lanza como script (no como módulo) con PYTHONPATH apuntando a la app
+a medir y el directorio de trabajo en la carpeta con el db.json:
+
+    PYTHONPATH=../codigo_original python benchmarks/flask_client_driver.py products \\
+        --requests 500 --sizes '{"products": 1000, ...}'
+
+Imprime una línea JSON con el resumen de latencias y el RSS del proceso.
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from common import process_rss_mb, summarize
+from scenarios import request_factory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('scenario')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--sizes', required=True, help='JSON con el tamaño de la base')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    from app import app
+
+    client = app.test_client()
+    next_request = request_factory(args.scenario, json.loads(args.sizes))
+    headers = {'Authorization': 'abcd1234'}
+
+    errors = 0
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        method, path, body = next_request()
+        request_start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        latencies.append(time.perf_counter() - request_start)
+        if response.status_code >= 400:
+            errors += 1
+    result = summarize(latencies, time.perf_counter() - start)
+    result['errors'] = errors
+    result['rss_mb'] = process_rss_mb()
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Throughput de escritura según el nivel de concurrencia, con y sin group
+commit.
+
+Cada hilo agrega favoritos con FavoriteRepository.create durante
+`duration` segundos; se reporta escrituras/s, reescrituras del archivo y
+latencia de confirmación.
+
+    python -m benchmarks.group_commit --products 10000 --concurrency 1 4 16 64
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import summarize, write_report
+from benchmarks.synthetic_db import generate_database
+from config.settings import GROUP_COMMIT_MAX_BATCH
+from repositories.favorite_repository import FavoriteRepository
+from utils.database_connection import DatabaseConnection
+from utils.group_commit import GroupCommitWriter
+
+
+def run(db, concurrency, duration, products):
+    repository = FavoriteRepository(db)
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def writer(n):
+        local = []
+        while time.monotonic() < deadline:
+            # Pares siempre nuevos y con productos existentes
+            round_, offset = divmod(len(local), products)
+            start = time.perf_counter()
+            repository.create(user_id=n + round_ * concurrency, product_id=offset + 1)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--favorites', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--window', type=float, default=0.0, help='Ventana de group commit (s)')
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'group_commit', 'products': args.products, 'favorites': args.favorites,
+              'window': args.window, 'results': []}
+    for group_commit in (False, True):
+        for concurrency in args.concurrency:
+            workdir = tempfile.mkdtemp(prefix='bench-group-commit-')
+            try:
+                path = os.path.join(workdir, 'db.json')
+                generate_database(path, products=args.products, favorites=args.favorites)
+                db = DatabaseConnection(path)
+                saves = []
+                save = db._save
+                db._save = lambda: (saves.append(1), save())
+                db.group_commit = (
+                    GroupCommitWriter(db._save, args.window, GROUP_COMMIT_MAX_BATCH) if group_commit else None
+                )
+                result = run(db, concurrency, args.duration, args.products)
+            finally:
+                DatabaseConnection._instances.pop(path, None)
+                shutil.rmtree(workdir, ignore_errors=True)
+            report['results'].append({
+                'group_commit': group_commit,
+                'concurrency': concurrency,
+                'writes_per_s': result['throughput_rps'],
+                'file_rewrites': len(saves),
+                'p50_ms': result['p50_ms'],
+                'p99_ms': result['p99_ms'],
+            })
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
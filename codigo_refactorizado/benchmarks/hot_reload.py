@@ -0,0 +1,88 @@
+"""
+Tiempo de recarga de db.json tras un cambio externo en una sola
+colección, con una base grande.
+
+- parse: solo json.load del archivo (piso de cualquier recarga).
+- incremental: DatabaseConnection.reload(), que sincroniza únicamente las
+  colecciones que cambiaron (ver VersionedCollection.sync).
+- full: abrir una conexión nueva que carga y reindexa todo.
+
+Cada repetición cambia el precio de un producto en el archivo.
+
+    python -m benchmarks.hot_reload --products 100000 --favorites 200000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import write_report
+from benchmarks.synthetic_db import generate_database
+from repositories.favorite_repository import FavoriteRepository
+from repositories.product_repository import ProductRepository
+from utils.database_connection import DatabaseConnection
+
+
+def edit_price(path, data, n):
+    data['products'][n % len(data['products'])]['price'] += 1
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def open_repositories(db):
+    """Convierte las colecciones a sus stores indexados, como en la app."""
+    return ProductRepository(db), FavoriteRepository(db)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--favorites', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'hot_reload', 'products': args.products, 'favorites': args.favorites, 'results': []}
+    workdir = tempfile.mkdtemp(prefix='bench-hot-reload-')
+    path = os.path.join(workdir, 'db.json')
+    try:
+        data = generate_database(path, products=args.products, favorites=args.favorites)
+        db = DatabaseConnection(path)
+        open_repositories(db)
+        timings = {'parse': [], 'incremental': [], 'full': []}
+        for n in range(args.repeat):
+            edit_price(path, data, n)
+            with open(path) as f:
+                timings['parse'].append(timed(lambda: json.load(f))[0])
+            elapsed, changed = timed(db.reload)
+            assert changed == ['products'], changed
+            timings['incremental'].append(elapsed)
+
+            DatabaseConnection._instances.pop(path)
+            timings['full'].append(timed(lambda: open_repositories(DatabaseConnection(path)))[0])
+            DatabaseConnection._instances.pop(path)
+            DatabaseConnection._instances.get_or_create(path, lambda: db)
+        for mode, values in timings.items():
+            report['results'].append({
+                'mode': mode,
+                'min_ms': round(min(values), 1),
+                'median_ms': round(sorted(values)[len(values) // 2], 1),
+            })
+    finally:
+        DatabaseConnection._instances.pop(path, None)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
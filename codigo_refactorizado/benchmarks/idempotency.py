@@ -0,0 +1,115 @@
+"""
+Costo de la cabecera Idempotency-Key.
+
+- cache_*: IdempotencyCache sola, en memoria y con FileBackend; `miss` es
+  reservar y completar una clave nueva, `hit` repetir una guardada.
+- api_*: POST /favorites en proceso (test client de Flask) sin cabecera,
+  con una clave nueva por petición, y reintentos de una clave ya usada.
+  La diferencia entre api_plain y api_new_key es lo que agrega la caché a
+  una escritura; api_replay es lo que cuesta un reintento.
+
+    python -m benchmarks.idempotency --operations 100000 --requests 2000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import TOKEN, prepare_workdir, summarize, write_report
+from utils.database_connection import DatabaseConnection
+from utils.idempotency import IdempotencyCache, FileBackend
+
+
+def latency(values):
+    summary = summarize(values, 0)
+    del summary['throughput_rps']
+    summary['mean_us'] = round(sum(values) / len(values) * 1e6, 2)
+    return summary
+
+
+def bench_misses(cache, operations):
+    """Reservar y completar `operations` claves nuevas."""
+    timings = []
+    for n in range(operations):
+        began = time.perf_counter()
+        claim = cache.begin('POST /favorites', f'key-{n}', 'fingerprint')
+        cache.complete(claim, {'message': 'Product added to favorites'}, 201)
+        timings.append(time.perf_counter() - began)
+    return latency(timings)
+
+
+def bench_hits(cache, operations):
+    """Reintentos de las claves que dejó bench_misses."""
+    timings = []
+    for n in range(operations):
+        began = time.perf_counter()
+        cache.begin('POST /favorites', f'key-{n}', 'fingerprint')
+        timings.append(time.perf_counter() - began)
+    return latency(timings)
+
+
+def bench_api(client, requests):
+    """
+    Peticiones sin clave y con clave nueva intercaladas (la base crece con
+    cada favorito, así ambos casos la ven del mismo tamaño), y luego
+    reintentos de una misma clave.
+    """
+    timings = {'api_plain': [], 'api_new_key': [], 'api_replay': []}
+
+    def send(case, user_id, key=None):
+        headers = {'Authorization': TOKEN}
+        if key:
+            headers['Idempotency-Key'] = key
+        began = time.perf_counter()
+        response = client.post('/favorites', json={'user_id': user_id, 'product_id': 1}, headers=headers)
+        timings[case].append(time.perf_counter() - began)
+        assert response.status_code in (200, 201), response.get_json()
+
+    for n in range(requests):
+        send('api_plain', 2 * n + 1)
+        send('api_new_key', 2 * n + 2, f'new-{n}')
+    for n in range(requests):
+        send('api_replay', 2, 'new-0')
+    return [{'case': case, **latency(values)} for case, values in timings.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=100000, help='Operaciones sobre la caché sola')
+    parser.add_argument('--requests', type=int, default=2000, help='Peticiones por caso de la API')
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'idempotency', 'operations': args.operations, 'requests': args.requests, 'results': []}
+    keydir = tempfile.mkdtemp(prefix='bench-idempotency-')
+    try:
+        for name, backend in (('memory', None), ('file', FileBackend(keydir, sweep_interval=3600))):
+            cache = IdempotencyCache(max_keys=args.operations, backend=backend)
+            report['results'].append({'case': f'cache_{name}_miss', **bench_misses(cache, args.operations)})
+            report['results'].append({'case': f'cache_{name}_hit', **bench_hits(cache, args.operations)})
+            if backend is not None:
+                # Caché de otro worker: cada hit se lee del directorio compartido
+                other = IdempotencyCache(max_keys=args.operations, backend=backend)
+                report['results'].append({'case': 'cache_file_hit_other_worker', **bench_hits(other, args.operations)})
+    finally:
+        shutil.rmtree(keydir, ignore_errors=True)
+
+    cwd = os.getcwd()
+    workdir = prepare_workdir()
+    try:
+        os.chdir(workdir)
+        DatabaseConnection._instances.clear()
+        from app import app
+        client = app.test_client()
+        report['results'].extend(bench_api(client, args.requests))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
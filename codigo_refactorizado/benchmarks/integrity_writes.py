@@ -0,0 +1,106 @@
+"""
+Latencia de escritura con integridad referencial.
+
+- off: REFERENTIAL_INTEGRITY deshabilitado.
+- indexed: validaciones por índices (categoría por nombre, producto por ID).
+- scan: la alternativa obvia, validar recorriendo la colección referida.
+
+Se miden altas de productos y de favoritos sin persistencia (el archivo no
+se reescribe) para aislar el costo de la validación.
+
+    python -m benchmarks.integrity_writes --products 1000000 --ops 200
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import repositories.favorite_repository as favorite_module
+import repositories.product_repository as product_module
+from benchmarks.common import percentile, write_report
+from benchmarks.synthetic_db import build_data
+from repositories.favorite_repository import FavoriteRepository
+from repositories.product_repository import ProductRepository
+from utils.database_connection import DatabaseConnection
+
+
+def timed(operation, count):
+    latencies = []
+    for n in range(count):
+        start = time.perf_counter()
+        operation(n)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'p50_us': round(percentile(latencies, 50) * 1e6, 2),
+        'p99_us': round(percentile(latencies, 99) * 1e6, 2),
+    }
+
+
+def scan_checked(db, collection_name, field, value, write):
+    """Valida recorriendo la colección y luego escribe (sin índices)."""
+    with db.transaction():
+        if not any(item.get(field) == value for item in db.get_collection(collection_name)):
+            raise ValueError(f'{value} does not exist')
+        return write()
+
+
+def run(path, strategy, ops, category, max_product_id):
+    DatabaseConnection._instances.pop(path, None)
+    db = DatabaseConnection(path)
+    db._save = lambda: None
+    db.group_commit = None
+    products, favorites = ProductRepository(db), FavoriteRepository(db)
+    enabled = strategy == 'indexed'
+    product_module.REFERENTIAL_INTEGRITY = favorite_module.REFERENTIAL_INTEGRITY = enabled
+
+    if strategy == 'scan':
+        create_product = lambda n: scan_checked(
+            db, 'categories', 'name', category, lambda: products.create(f'p{n}', category, 1.0))
+        create_favorite = lambda n: scan_checked(
+            db, 'products', 'id', max_product_id - n, lambda: favorites.create(-1, max_product_id - n))
+    else:
+        create_product = lambda n: products.create(f'p{n}', category, 1.0)
+        create_favorite = lambda n: favorites.create(-1, max_product_id - n)
+
+    try:
+        return {
+            'strategy': strategy,
+            # create genera el ID recorriendo la colección: se mide aparte
+            'create_favorite': timed(create_favorite, ops),
+            'create_product': timed(create_product, max(1, ops // 20)),
+        }
+    finally:
+        DatabaseConnection._instances.pop(path, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--categories', type=int, default=1000)
+    parser.add_argument('--ops', type=int, default=200)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    data = build_data(products=args.products, categories=args.categories, favorites=0)
+    category = data['categories'][-1]['name']
+    report = {'benchmark': 'integrity_writes', 'products': args.products,
+              'categories': args.categories, 'ops': args.ops, 'results': []}
+    workdir = tempfile.mkdtemp(prefix='bench-integrity-')
+    try:
+        path = os.path.join(workdir, 'db.json')
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        for strategy in ('off', 'indexed', 'scan'):
+            report['results'].append(run(path, strategy, args.ops, category, args.products))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Ranking de popularidad (GET /products/popular) con muchos favoritos.
+
+Se aplican `favorites` eventos de favorito agregado sobre `products`
+productos (distribución log-uniforme: pocos productos muy populares) y
+luego un 10% de eventos de favorito eliminado. Se reporta:
+
+- update: costo por evento de PopularityBoard.favorite_added / favorite_removed.
+- query: latencia del top-K global y por categoría.
+- recount: contar todos los favoritos desde cero (lo que se evita por consulta
+  y, con el checkpoint, al reiniciar).
+- checkpoint / restore: guardar y cargar el checkpoint.
+
+    python -m benchmarks.popularity --favorites 10000000 --products 1000000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from array import array
+from collections import Counter
+
+from benchmarks.common import summarize, write_report
+from utils.popularity import PopularityBoard
+
+CATEGORIES = ['men', 'women', 'kids', 'girls', 'accessories']
+
+
+def latency(values):
+    summary = summarize(values, 0)
+    del summary['throughput_rps']
+    return summary
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--favorites', type=int, default=10000000)
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    product_ids = array('i', (int(args.products ** rng.random()) for _ in range(args.favorites)))
+    removed = array('i', (product_ids[rng.randrange(args.favorites)] for _ in range(args.favorites // 10)))
+
+    workdir = tempfile.mkdtemp(prefix='bench-popularity-')
+    board = PopularityBoard(os.path.join(workdir, 'popularity.json'))
+    report = {'benchmark': 'popularity', 'favorites': args.favorites, 'products': args.products,
+              'limit': args.limit, 'results': []}
+    try:
+        elapsed, _ = timed(lambda: [board.favorite_added(p, CATEGORIES[p % len(CATEGORIES)]) for p in product_ids])
+        report['results'].append({'step': 'update_add', 'events': len(product_ids),
+                                  'us_per_event': round(elapsed / len(product_ids) * 1e6, 3)})
+        elapsed, _ = timed(lambda: [board.favorite_removed(p) for p in removed])
+        report['results'].append({'step': 'update_remove', 'events': len(removed),
+                                  'us_per_event': round(elapsed / len(removed) * 1e6, 3)})
+
+        for scope in (None, 'kids'):
+            samples = []
+            for _ in range(args.queries):
+                began = time.perf_counter()
+                board.top(args.limit, scope)
+                samples.append(time.perf_counter() - began)
+            report['results'].append({'step': 'query', 'category': scope, **latency(samples)})
+
+        elapsed, _ = timed(lambda: Counter(product_ids).most_common(args.limit))
+        report['results'].append({'step': 'recount', 'ms': round(elapsed * 1000, 1)})
+
+        elapsed, _ = timed(board.checkpoint)
+        report['results'].append({'step': 'checkpoint', 'ms': round(elapsed * 1000, 1),
+                                  'ranked_products': len(board.overall),
+                                  'bytes': os.path.getsize(board.checkpoint_file)})
+        restored = PopularityBoard(board.checkpoint_file)
+        elapsed, _ = timed(lambda: restored.restore(expected_total=board.total))
+        report['results'].append({'step': 'restore', 'ms': round(elapsed * 1000, 1)})
+        assert restored.top(args.limit) == board.top(args.limit)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Historial de precios: ingesta y consultas por rango.
+
+Se genera el archivo de historial con `products` productos y `changes`
+cambios de precio cada uno, repartidos en `days` días e intercalados entre
+productos (como llegarían los eventos). Se mide:
+
+- rebuild: reconstruir el historial completo desde el archivo (arranque).
+- ingest: PriceHistoryStore.record de a un evento (escritura + refresh).
+- query_raw / query_day: rango aleatorio de un producto (búsqueda binaria).
+- hot_day: serie de `hot_points` puntos con agregados por día, año completo.
+
+    python -m benchmarks.price_history --products 1000000 --changes 100
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.common import process_rss_mb, summarize, write_report
+from utils.price_history import PriceHistoryStore, RECORD
+
+START = int(datetime(2026, 1, 1).timestamp())
+BATCH = 100000
+
+
+def latency(values):
+    summary = summarize(values, 0)
+    del summary['throughput_rps']
+    return summary
+
+
+def generate(path, products, changes, days, seed):
+    """Escribe products * changes registros en orden de tiempo."""
+    rng = random.Random(seed)
+    total = products * changes
+    step = days * 86400 / total
+    pack = RECORD.pack
+    with open(path, 'wb') as f:
+        for first in range(0, total, BATCH):
+            f.write(b''.join(
+                pack(rng.randrange(products) + 1, START + int(n * step), round(rng.uniform(1, 500), 2))
+                for n in range(first, min(first + BATCH, total))
+            ))
+    return total
+
+
+def query(store, products, days, resolution, samples, rng):
+    timings = []
+    for _ in range(samples):
+        start = datetime.fromtimestamp(START + rng.randrange(days * 86400))
+        end = datetime.fromtimestamp(start.timestamp() + rng.randrange(1, days) * 86400)
+        product_id = rng.randrange(products) + 1
+        began = time.perf_counter()
+        store.history(product_id, start, end, resolution)
+        timings.append(time.perf_counter() - began)
+    return latency(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--changes', type=int, default=100)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--ingest', type=int, default=100000, help='Eventos de a uno para medir la ingesta')
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--hot-points', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='bench-price-history-')
+    path = os.path.join(workdir, 'price_history.bin')
+    report = {'benchmark': 'price_history', 'products': args.products, 'changes': args.changes,
+              'days': args.days, 'results': []}
+    try:
+        records = generate(path, args.products, args.changes, args.days, args.seed)
+        report['file_mb'] = round(os.path.getsize(path) / 2 ** 20, 1)
+
+        store = PriceHistoryStore(path)
+        began = time.perf_counter()
+        store.refresh()
+        elapsed = time.perf_counter() - began
+        report['results'].append({'step': 'rebuild', 'records': records, 's': round(elapsed, 1),
+                                  'records_per_s': round(records / elapsed)})
+        report['rss_mb'] = process_rss_mb()
+
+        began = time.perf_counter()
+        for n in range(args.ingest):
+            store.record(rng.randrange(args.products) + 1, 100.0)
+        elapsed = time.perf_counter() - began
+        report['results'].append({'step': 'ingest', 'events': args.ingest,
+                                  'events_per_s': round(args.ingest / elapsed)})
+
+        for resolution in (None, 'day'):
+            report['results'].append({'step': f'query_{resolution or "raw"}',
+                                      **query(store, args.products, args.days, resolution, args.queries, rng)})
+
+        hot = PriceHistoryStore()
+        for n in range(args.hot_points):
+            hot._add(1, START + n * args.days * 86400 // args.hot_points, rng.uniform(1, 500))
+        timings = []
+        for _ in range(min(args.queries, 1000)):
+            began = time.perf_counter()
+            hot.history(1, resolution='day')
+            timings.append(time.perf_counter() - began)
+        report['results'].append({'step': 'hot_day', 'points': args.hot_points, **latency(timings)})
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
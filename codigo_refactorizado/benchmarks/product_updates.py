@@ -0,0 +1,98 @@
+"""
+Latencia de actualizar y borrar un producto: reconstruir la lista vs.
+mutación en su lugar por el índice de IDs.
+
+- rebuild: la alternativa obvia, recorrer la colección y publicar una
+  lista nueva (lo que hacía `_remove_where` / `save_collection`).
+- in_place: VersionedCollection.update / delete (O(1) por el índice).
+
+Solo se mide la estructura en memoria; con `--persisted` se mide además
+ProductRepository.update de punta a punta (incluye reescribir el archivo).
+
+    python -m benchmarks.product_updates --products 1000000 --ops 50
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import percentile, write_report
+from benchmarks.synthetic_db import build_data, generate_database
+from repositories.product_repository import ProductRepository
+from utils.database_connection import DatabaseConnection
+from utils.snapshot import VersionedCollection
+
+
+def rebuild_update(collection, product_id, changes):
+    collection.replace(
+        {**p, **changes} if p['id'] == product_id else p for p in collection.snapshot()
+    )
+
+
+def rebuild_delete(collection, product_id):
+    collection.replace(p for p in collection.snapshot() if p['id'] != product_id)
+
+
+def timed(operation, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        operation(*args)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'p50_us': round(percentile(latencies, 50) * 1e6, 2),
+        'p99_us': round(percentile(latencies, 99) * 1e6, 2),
+    }
+
+
+def persisted(products, ops, ids):
+    workdir = tempfile.mkdtemp(prefix='bench-product-updates-')
+    path = os.path.join(workdir, 'db.json')
+    try:
+        generate_database(path, products=products, favorites=0)
+        repository = ProductRepository(DatabaseConnection(path))
+        return timed(lambda i: repository.update(i, {'price': 1.0}), [(i,) for i in ids[:ops]])
+    finally:
+        DatabaseConnection._instances.pop(path, None)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--ops', type=int, default=50, help='Operaciones medidas por tipo')
+    parser.add_argument('--persisted', action='store_true', help='Medir también con persistencia')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = build_data(products=args.products, favorites=0)['products']
+    ids = rng.sample(range(1, args.products + 1), args.ops * 2)
+    updates = [(i, {'price': round(rng.uniform(1, 100), 2)}) for i in ids[:args.ops]]
+    deletes = [(i,) for i in ids[args.ops:]]
+
+    report = {'benchmark': 'product_updates', 'products': args.products, 'ops': args.ops, 'results': []}
+    strategies = (
+        ('rebuild', rebuild_update, rebuild_delete),
+        ('in_place', VersionedCollection.update, VersionedCollection.delete),
+    )
+    for name, update, delete in strategies:
+        collection = VersionedCollection(items)
+        report['results'].append({
+            'strategy': name,
+            'update': timed(lambda i, c: update(collection, i, c), updates),
+            'delete': timed(lambda i: delete(collection, i), deletes),
+        })
+    if args.persisted:
+        report['persisted_update'] = persisted(args.products, min(args.ops, 10), ids)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
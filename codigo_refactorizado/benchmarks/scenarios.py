@@ -0,0 +1,59 @@
+"""
+Escenarios de carga: cada uno genera la siguiente petición
+(method, path, body) a partir de un generador aleatorio y de `sizes`, la
+descripción de la base sintética (products, users, category_names).
+
+Este módulo solo usa la biblioteca estándar porque también se importa
+desde los drivers que corren con codigo_original en el PYTHONPATH.
+"""
+
+import random
+
+
+def _auth(rng, sizes):
+    return 'POST', '/auth', {'username': 'student', 'password': 'desingp'}
+
+
+def _products(rng, sizes):
+    return 'GET', '/products', None
+
+
+def _product_by_id(rng, sizes):
+    return 'GET', f"/products/{rng.randint(1, sizes['products'])}", None
+
+
+def _products_by_category(rng, sizes):
+    return 'GET', f"/products?category={rng.choice(sizes['category_names'])}", None
+
+
+def _categories(rng, sizes):
+    return 'GET', '/categories', None
+
+
+def _favorites(rng, sizes):
+    return 'GET', '/favorites', None
+
+
+def _add_favorite(rng, sizes):
+    return 'POST', '/favorites', {
+        'user_id': rng.randint(1, sizes['users']),
+        'product_id': rng.randint(1, sizes['products']),
+    }
+
+
+SCENARIOS = {
+    'auth': _auth,
+    'products': _products,
+    'product_by_id': _product_by_id,
+    'products_by_category': _products_by_category,
+    'categories': _categories,
+    'favorites': _favorites,
+    'add_favorite': _add_favorite,
+}
+
+
+def request_factory(scenario, sizes, seed=0):
+    """Retorna una función sin argumentos que produce la siguiente petición."""
+    rng = random.Random(seed)
+    generate = SCENARIOS[scenario]
+    return lambda: generate(rng, sizes)
@@ -0,0 +1,34 @@
+"""
+Levanta una de las aplicaciones en un proceso aparte para los benchmarks.
+
+    PYTHONPATH=. python benchmarks/serve.py wsgi --port 5001
+    PYTHONPATH=. python benchmarks/serve.py asgi --port 5002
+
+El PYTHONPATH apunta a la app a servir y el directorio de trabajo a la
+carpeta que contiene el db.json a usar.
+"""
+
+import argparse
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('kind', choices=['wsgi', 'asgi'])
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    if args.kind == 'wsgi':
+        from werkzeug.serving import make_server
+        from app import app
+        make_server('127.0.0.1', args.port, app, threaded=True).serve_forever()
+    else:
+        from benchmarks.asgi_server import serve
+        from asgi import app
+        serve(app, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
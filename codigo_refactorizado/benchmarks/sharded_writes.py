@@ -0,0 +1,83 @@
+"""
+Throughput de escritura de favoritos según la cantidad de shards.
+
+Cada hilo agrega favoritos de usuarios propios con
+ShardedFavoriteRepository.create durante `duration` segundos. Con un
+shard todas las escrituras comparten un archivo (y su group commit); con
+N shards las persistencias de usuarios distintos van en paralelo.
+
+    python -m benchmarks.sharded_writes --shards 1 2 4 8 --concurrency 16
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import summarize, write_report
+from benchmarks.synthetic_db import generate_database
+from repositories.sharded_favorite_repository import ShardedFavoriteRepository
+from utils.database_connection import DatabaseConnection
+
+
+def run(repository, concurrency, duration, products):
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def writer(n):
+        local = []
+        while time.monotonic() < deadline:
+            # Pares siempre nuevos y con productos existentes
+            round_, offset = divmod(len(local), products)
+            start = time.perf_counter()
+            repository.create(user_id=n + round_ * concurrency, product_id=offset + 1)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'sharded_writes', 'products': args.products,
+              'concurrency': args.concurrency, 'results': []}
+    for shards in args.shards:
+        workdir = tempfile.mkdtemp(prefix='bench-sharded-writes-')
+        try:
+            path = os.path.join(workdir, 'db.json')
+            generate_database(path, products=args.products, favorites=0)
+            shard_paths = [os.path.join(workdir, f'favorites-{n}.json') for n in range(shards)]
+            repository = ShardedFavoriteRepository(DatabaseConnection(path), shard_paths)
+            result = run(repository, args.concurrency, args.duration, args.products)
+        finally:
+            DatabaseConnection._instances.clear()
+            shutil.rmtree(workdir, ignore_errors=True)
+        report['results'].append({
+            'shards': shards,
+            'writes_per_s': result['throughput_rps'],
+            'p50_ms': result['p50_ms'],
+            'p99_ms': result['p99_ms'],
+        })
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Memoria y latencia de lectura con N workers: cada uno con su copia de la
+base (per_process) o leyendo el catálogo compartido (shared).
+
+- per_process: cada worker abre DatabaseConnection y ProductRepository
+  (decodifica db.json y arma los índices), como hoy.
+- shared: un proceso cargador publica db.json con CatalogLoader y sigue
+  vivo; cada worker lee con CatalogRepository.
+
+Cuando todos los workers están listos se mide su memoria y luego hacen
+`--reads` get_by_id al azar a la vez. La memoria se informa como:
+
+- rss_sum_mb: suma de RSS (cuenta las páginas compartidas una vez por proceso).
+- memory_mb: suma de PSS sin la memoria compartida, más el tamaño de los
+  segmentos en /dev/shm: lo que realmente ocupa el conjunto.
+
+    python -m benchmarks.shared_catalog --products 200000 --workers 1 4 16
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+
+from benchmarks.common import percentile, process_rss_mb, write_report
+from benchmarks.synthetic_db import build_data
+
+MODES = ('per_process', 'shared')
+
+
+def process_memory_mb(pid):
+    """(RSS, PSS sin memoria compartida) de un proceso en MB, desde smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values['Rss'] / 1024, (values['Pss'] - values.get('Pss_Shmem', 0)) / 1024
+
+
+def shm_mb(name):
+    total = 0
+    for entry in os.listdir('/dev/shm'):
+        if entry == name or entry.startswith(f'{name}-g'):
+            total += os.path.getsize(os.path.join('/dev/shm', entry))
+    return total / 2 ** 20
+
+
+def load_reader(mode, path, catalog_name):
+    """Lo que cada worker hace al arrancar: retorna una función get_by_id."""
+    if mode == 'per_process':
+        from utils.database_connection import DatabaseConnection
+        from repositories.product_repository import ProductRepository
+        return ProductRepository(DatabaseConnection(path)).get_by_id
+    from repositories.catalog_repository import CatalogRepository
+    from utils.shared_catalog import SharedCatalog
+    return CatalogRepository(SharedCatalog(catalog_name), 'products').get_by_id
+
+
+def worker(mode, path, catalog_name, products, reads, seed, ready, go, results):
+    os.chdir(os.path.dirname(path))
+    began = time.perf_counter()
+    get_by_id = load_reader(mode, path, catalog_name)
+    load_s = time.perf_counter() - began
+    ready.put(os.getpid())
+    go.wait()
+    rng = random.Random(seed)
+    timings = []
+    for _ in range(reads):
+        product_id = rng.randrange(products) + 1
+        began = time.perf_counter()
+        product = get_by_id(product_id)
+        timings.append(time.perf_counter() - began)
+        assert product['id'] == product_id
+    results.put((load_s, timings))
+
+
+def loader(path, catalog_name, ready, stop):
+    from utils.shared_catalog import CatalogLoader, unlink_catalog
+    catalog_loader = CatalogLoader(path, catalog_name)
+    began = time.perf_counter()
+    catalog_loader.refresh()
+    ready.put(time.perf_counter() - began)
+    stop.wait()
+    unlink_catalog(catalog_name)
+
+
+def run(mode, workers, path, products, reads, context):
+    catalog_name = f'bench-catalog-{uuid.uuid4().hex[:8]}'
+    ready, results = context.Queue(), context.Queue()
+    go, stop = context.Event(), context.Event()
+    result = {'mode': mode, 'workers': workers}
+    helper = None
+    if mode == 'shared':
+        helper = context.Process(target=loader, args=(path, catalog_name, ready, stop))
+        helper.start()
+        result['publish_s'] = round(ready.get(), 2)
+    processes = [
+        context.Process(target=worker, args=(mode, path, catalog_name, products, reads, n, ready, go, results))
+        for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    pids = [ready.get() for _ in processes]
+
+    memory = [process_memory_mb(pid) for pid in pids + ([helper.pid] if helper else [])]
+    result['rss_sum_mb'] = round(sum(rss for rss, _ in memory), 1)
+    result['shm_mb'] = round(shm_mb(catalog_name), 1) if helper else 0.0
+    result['memory_mb'] = round(sum(pss for _, pss in memory) + result['shm_mb'], 1)
+    if helper:
+        result['loader_mb'] = round(memory[-1][1], 1)
+
+    began = time.perf_counter()
+    go.set()
+    collected = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+    if helper:
+        stop.set()
+        helper.join()
+    result['worker_start_s'] = round(max(load_s for load_s, _ in collected), 3)
+    timings = sorted(t for _, worker_timings in collected for t in worker_timings)
+    result['reads_per_s'] = round(len(timings) / elapsed)
+    result['p50_us'] = round(percentile(timings, 50) * 1e6, 2)
+    result['p99_us'] = round(percentile(timings, 99) * 1e6, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--reads', type=int, default=20000, help='get_by_id por worker')
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-catalog-')
+    path = os.path.join(workdir, 'db.json')
+    with open(path, 'w') as f:
+        json.dump(build_data(products=args.products, favorites=0), f)
+    report = {'benchmark': 'shared_catalog', 'products': args.products, 'reads': args.reads,
+              'db_mb': round(os.path.getsize(path) / 2 ** 20, 1), 'cpus': os.cpu_count(),
+              'parent_rss_mb': process_rss_mb(), 'results': []}
+    context = multiprocessing.get_context('spawn')
+    try:
+        for workers in args.workers:
+            for mode in MODES:
+                report['results'].append(run(mode, workers, path, args.products, args.reads, context))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
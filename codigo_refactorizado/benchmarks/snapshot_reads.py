@@ -0,0 +1,116 @@
+"""
+Throughput de lectura con lectores y escritores simultáneos.
+
+Compara los snapshots sin lock de DatabaseConnection contra la
+alternativa obvia: un lock global y una copia defensiva por lectura.
+
+    python -m benchmarks.snapshot_reads --products 100000 --readers 8 --writers 2
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import write_report
+from benchmarks.synthetic_db import generate_database
+from repositories.product_repository import ProductRepository
+from utils.database_connection import DatabaseConnection
+
+
+class LockedCopyStore:
+    """Línea base: lecturas con lock y copia defensiva de la lista."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path) as f:
+            self.data = json.load(f)
+        self.lock = threading.Lock()
+
+    def read(self):
+        with self.lock:
+            return list(self.data['products'])
+
+    def write(self, item):
+        with self.lock:
+            self.data['products'].append(item)
+            with open(self.path, 'w') as f:
+                json.dump(self.data, f)
+
+
+def run(read, write, readers, writers, duration):
+    counts = {'reads': 0, 'writes': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def reader():
+        n = 0
+        while not stop.is_set():
+            items = read()
+            len(items)
+            n += 1
+        with lock:
+            counts['reads'] += n
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            write(n)
+            n += 1
+        with lock:
+            counts['writes'] += n
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        'reads_per_s': round(counts['reads'] / duration, 1),
+        'writes_per_s': round(counts['writes'] / duration, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-snapshot-')
+    try:
+        report = {'benchmark': 'snapshot_reads', 'products': args.products,
+                  'readers': args.readers, 'writers': args.writers, 'results': []}
+
+        path = os.path.join(workdir, 'locked.json')
+        generate_database(path, products=args.products, favorites=0)
+        store = LockedCopyStore(path)
+        report['results'].append({'mode': 'locked_copy', **run(
+            store.read, lambda n: store.write({'id': -n, 'name': 'x', 'category': 'men', 'price': 1.0}),
+            args.readers, args.writers, args.duration,
+        )})
+
+        path = os.path.join(workdir, 'snapshot.json')
+        generate_database(path, products=args.products, favorites=0)
+        repository = ProductRepository(DatabaseConnection(path))
+        report['results'].append({'mode': 'snapshot', **run(
+            repository.get_all, lambda n: repository.add({'id': -n, 'name': 'x', 'category': 'men', 'price': 1.0}),
+            args.readers, args.writers, args.duration,
+        )})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
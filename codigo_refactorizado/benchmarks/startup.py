@@ -0,0 +1,103 @@
+"""
+Tiempo de arranque de un worker: desglose de imports y tiempo hasta la
+primera respuesta, con y sin snapshot binario de db.json.
+
+Cada medición corre en un proceso nuevo (arranque en frío):
+
+- importtime: `python -X importtime -c "from app import app"`, con los
+  módulos que más tardan (tiempo acumulado).
+- first_response: importar la app, construirla y responder el primer
+  GET /products, leyendo db.json o su snapshot binario.
+
+    python -m benchmarks.startup --products 100000 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import PROJECT_DIR, TOKEN, write_report
+from benchmarks.synthetic_db import generate_database
+
+FIRST_RESPONSE = f'''
+import json, time
+start = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+app = module.app
+created = time.perf_counter()
+response = app.test_client().get('/products', headers={{'Authorization': {TOKEN!r}}})
+assert response.status_code == 200
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_response_ms': (done - created) * 1000,
+    'total_ms': (done - start) * 1000,
+}}))
+'''
+
+
+def run_python(args, workdir):
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    return subprocess.run(
+        [sys.executable, *args], cwd=workdir, env=env,
+        capture_output=True, text=True, check=True
+    )
+
+
+def import_breakdown(workdir, top):
+    """Parsea la salida de -X importtime (microsegundos, acumulado)."""
+    stderr = run_python(['-X', 'importtime', '-c', 'from app import app'], workdir).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative), name[1:]))  # la sangría marca la profundidad
+    top_level = [(us, name) for us, name in modules if not name.startswith(' ')]
+    return {
+        'total_ms': round(sum(us for us, _ in top_level) / 1000, 1),
+        'top_modules': [
+            {'module': name.strip(), 'cumulative_ms': round(us / 1000, 1)}
+            for us, name in sorted(modules, reverse=True)[:top]
+        ],
+    }
+
+
+def first_response(workdir, repeat):
+    runs = [json.loads(run_python(['-c', FIRST_RESPONSE], workdir).stdout) for _ in range(repeat)]
+    return {key: round(min(run[key] for run in runs), 1) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--favorites', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3, help='Arranques por modo (se reporta el mínimo)')
+    parser.add_argument('--top', type=int, default=15, help='Módulos a listar en el desglose')
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'startup', 'products': args.products, 'favorites': args.favorites, 'results': []}
+    workdir = tempfile.mkdtemp(prefix='bench-startup-')
+    try:
+        db_path = os.path.join(workdir, 'db.json')
+        generate_database(db_path, products=args.products, favorites=args.favorites)
+        report['importtime'] = import_breakdown(workdir, args.top)
+
+        report['results'].append({'data_load': 'json', **first_response(workdir, args.repeat)})
+        run_python(['-m', 'utils.binary_snapshot', db_path], workdir)
+        report['results'].append({'data_load': 'binary_snapshot', **first_response(workdir, args.repeat)})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
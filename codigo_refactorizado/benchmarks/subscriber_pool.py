@@ -0,0 +1,128 @@
+"""
+Latencia de la API con un suscriptor que consume CPU, ejecutado en el hilo
+de la petición o en el pool de procesos (SubscriberPool).
+
+Cada modo levanta el servidor WSGI en un subproceso con un BusySubscriber
+(`--busy-ms` de CPU por evento) suscrito a FavoriteAddedEvent:
+
+- none: sin el suscriptor (referencia).
+- in_process: LazySubscriber, corre dentro de la petición.
+- out_of_process: ProcessSubscriber sobre un SubscriberPool de `--processes`.
+
+La carga mezcla una escritura (POST /favorites, que emite el evento) cada
+`--read-ratio` lecturas (GET /products/<id>). Con pocos núcleos los
+procesos compiten por la misma CPU: la ganancia es sobre todo que la
+petición ya no espera al suscriptor ni le cede el GIL.
+
+    python -m benchmarks.subscriber_pool --busy-ms 20 --duration 10
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from benchmarks.common import PROJECT_DIR, free_port, prepare_workdir, run_load, stop_server, write_report
+
+MODES = ('none', 'in_process', 'out_of_process')
+
+
+class BusySubscriber:
+    """Suscriptor que ocupa la CPU `busy_ms` milisegundos por evento."""
+
+    def __init__(self, busy_ms):
+        self.busy_ms = busy_ms
+
+    def handle(self, event):
+        deadline = time.perf_counter() + self.busy_ms / 1000
+        total = 0
+        while time.perf_counter() < deadline:
+            total += sum(range(1000))
+        return total
+
+
+def serve(mode, port, busy_ms, processes):
+    """Servidor del modo pedido (corre en el subproceso)."""
+    from werkzeug.serving import make_server
+    from app import app, register_subscribers
+    from notifications.event_manager import EventManager
+
+    register_subscribers()
+    target = 'benchmarks.subscriber_pool:BusySubscriber'
+    if mode == 'in_process':
+        from notifications.subscribers.lazy_subscriber import LazySubscriber
+        EventManager().subscribe('FavoriteAddedEvent', LazySubscriber(target, busy_ms))
+    elif mode == 'out_of_process':
+        from notifications.process_pool import SubscriberPool
+        from notifications.subscribers.process_subscriber import ProcessSubscriber
+        pool = SubscriberPool(processes)
+        EventManager().subscribe('FavoriteAddedEvent', ProcessSubscriber(pool, target, busy_ms))
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def start(mode, workdir, port, busy_ms, processes, timeout=15):
+    import socket
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.subscriber_pool', '--serve', mode, '--port', str(port),
+         '--busy-ms', str(busy_ms), '--processes', str(processes)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f'server {mode} did not start on port {port}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--busy-ms', type=float, default=20)
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--read-ratio', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.busy_ms, args.processes)
+        return
+
+    report = {'benchmark': 'subscriber_pool', 'busy_ms': args.busy_ms, 'processes': args.processes,
+              'read_ratio': args.read_ratio, 'concurrency': args.concurrency, 'cpus': os.cpu_count(),
+              'results': []}
+    for mode in MODES:
+        workdir = prepare_workdir()
+        port = free_port()
+        server = start(mode, workdir, port, args.busy_ms, args.processes)
+        users = itertools.count(1)
+        turn = itertools.count()
+
+        def next_request():
+            if next(turn) % (args.read_ratio + 1) == 0:
+                return 'POST', '/favorites', {'user_id': next(users), 'product_id': 1}
+            return 'GET', '/products/2', None
+
+        try:
+            report['results'].append({'mode': mode, **run_load(port, next_request, args.concurrency, args.duration)})
+        finally:
+            stop_server(server)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
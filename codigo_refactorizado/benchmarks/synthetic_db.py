@@ -0,0 +1,66 @@
+"""
+Generador de bases de datos sintéticas con el mismo formato que db.json.
+
+    python -m benchmarks.synthetic_db out/db.json --products 100000 --favorites 500000
+"""
+
+import argparse
+import json
+import os
+import random
+
+CATEGORY_NAMES = ['men', 'women', 'kids', 'accessories', 'shoes', 'sports', 'home', 'beauty']
+PRODUCT_NAMES = ['T-Shirt', 'Dress', 'Pants', 'Blouse', 'Jacket', 'Skirt', 'Sweater', 'Shorts', 'Hat', 'Socks']
+
+
+def build_data(products=1000, categories=8, favorites=1000, users=100, seed=0):
+    """Construye el diccionario de datos en memoria."""
+    rng = random.Random(seed)
+    category_names = [
+        CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f'category-{i + 1}'
+        for i in range(categories)
+    ]
+    return {
+        'products': [
+            {
+                'id': i + 1,
+                'name': f'{rng.choice(PRODUCT_NAMES)} {i + 1}',
+                'price': round(rng.uniform(5, 200), 2),
+                'category': rng.choice(category_names),
+            }
+            for i in range(products)
+        ],
+        'categories': [{'id': i + 1, 'name': name} for i, name in enumerate(category_names)],
+        'favorites': [
+            {'user_id': rng.randint(1, users), 'product_id': rng.randint(1, max(products, 1))}
+            for _ in range(favorites)
+        ],
+    }
+
+
+def generate_database(path, **sizes):
+    """Escribe una base sintética en `path` y retorna los datos generados."""
+    data = build_data(**sizes)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path')
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--favorites', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate_database(
+        args.path, products=args.products, categories=args.categories,
+        favorites=args.favorites, users=args.users, seed=args.seed,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Memoria y latencia con miles de bases (un archivo por tenant), con y sin
+límite en el registro de conexiones.
+
+Se generan `tenants` archivos y se leen en orden aleatorio, con una
+distribución log-uniforme: pocos tenants muy activos y una cola larga.
+Cada modo corre en un proceso nuevo:
+
+- unbounded: el registro no desaloja (todas las bases quedan cargadas).
+- bounded: a lo sumo `max_open` conexiones abiertas; las demás se
+  recargan al pedirlas.
+
+Se reporta RSS final y pico, y la latencia de los accesos que
+encontraron la base abierta (hit) y de los que la recargaron (reload).
+
+    python -m benchmarks.tenant_registry --tenants 2000 --products 500 --max-open 100
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import PROJECT_DIR, process_rss_mb, summarize, write_report
+from benchmarks.synthetic_db import generate_database
+
+
+def latency(values):
+    summary = summarize(values, 0)
+    del summary['throughput_rps']
+    return summary
+
+
+def worker(workdir, tenants, accesses, max_open, seed):
+    """Accesos a los tenants dentro de este proceso; imprime el resultado."""
+    from utils.database_connection import DatabaseConnection
+
+    registry = DatabaseConnection._instances
+    registry.max_open = max_open
+    rng = random.Random(seed)
+    hits, reloads = [], []
+    for _ in range(accesses):
+        tenant = int(tenants ** rng.random()) - 1
+        path = os.path.join(workdir, f'tenant-{tenant}.json')
+        opened = path in registry
+        began = time.perf_counter()
+        with DatabaseConnection.session(path) as db:
+            db.get_collection('products').get_by_id(1)
+        (hits if opened else reloads).append(time.perf_counter() - began)
+    print(json.dumps({
+        'open_connections': len(registry),
+        'evictions': registry.evictions,
+        'estimated_mb': round(registry.total_bytes() / 2 ** 20, 2),
+        'rss_mb': process_rss_mb(),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        'hit': latency(hits),
+        'reload': latency(reloads),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tenants', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--accesses', type=int, default=20000)
+    parser.add_argument('--max-open', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON de salida')
+    parser.add_argument('--worker', metavar='DIR', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.tenants, args.accesses, args.max_open or None, args.seed)
+        return
+
+    report = {'benchmark': 'tenant_registry', 'tenants': args.tenants, 'products': args.products,
+              'accesses': args.accesses, 'results': []}
+    workdir = tempfile.mkdtemp(prefix='bench-tenants-')
+    try:
+        for tenant in range(args.tenants):
+            generate_database(os.path.join(workdir, f'tenant-{tenant}.json'),
+                              products=args.products, favorites=0)
+        for mode, max_open in (('unbounded', 0), ('bounded', args.max_open)):
+            stdout = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.tenant_registry', '--worker', workdir,
+                 '--tenants', str(args.tenants), '--accesses', str(args.accesses),
+                 '--max-open', str(max_open), '--seed', str(args.seed)],
+                cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+            ).stdout
+            report['results'].append({'mode': mode, 'max_open': max_open or None, **json.loads(stdout)})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,98 @@ Módulo de configuración centralizada.
 # Configuración de la base de datos
 DATABASE_FILE = 'db.json'
 FAVORITES_FILE = 'favorites.json'
+DATABASE_FSYNC = True  # fsync antes de confirmar cada escritura
+DATABASE_BINARY_SNAPSHOT = True  # Leer <db.json>.snapshot si existe y está al día
+
+# Conexiones abiertas a la vez (p. ej. un archivo por tenant); None: sin límite.
+# Al pasarse se cierran las menos usadas sin peticiones en curso.
+DATABASE_MAX_OPEN = None
+DATABASE_MAX_MEMORY = None  # Bytes (tamaño del JSON) sumando todas las conexiones
+
+# Recargar la base si el archivo se modifica desde afuera (p. ej. al restaurar
+# db_bck.json). Un hilo por conexión abierta: inotify en Linux, o sondeo.
+DATABASE_WATCH = False
+DATABASE_WATCH_INTERVAL = 1.0  # Segundos entre revisiones (o de respaldo con inotify)
+
+# Favoritos particionados por user_id (hashing consistente). Vacío: todo en
+# DATABASE_FILE. Al cambiar la lista, redistribuir con:
+#   python -m repositories.sharded_favorite_repository --from ... --to ...
+FAVORITES_SHARDS = []  # p. ej. ['favorites-0.json', 'favorites-1.json']
+FAVORITES_SHARD_REPLICAS = 64  # Puntos de cada shard en el anillo
+
+# Productos más favoritos (GET /products/popular). Los conteos se mantienen
+# con los eventos de favoritos y se guardan cada tanto para no recontar al
+# reiniciar; si el checkpoint no coincide con la base se recuenta.
+POPULARITY_CHECKPOINT_FILE = 'popularity.json'
+POPULARITY_CHECKPOINT_INTERVAL = 30  # Segundos entre checkpoints
+POPULAR_DEFAULT_LIMIT = 10
+POPULAR_MAX_LIMIT = 100
+
+# Log de auditoría (LogSubscriber, GET /audit). Se rota a segmentos .gz con
+# índice por tiempo y tipo de evento al pasar el tamaño o la antigüedad.
+AUDIT_LOG_FILE = 'audit.log'
+AUDIT_MAX_BYTES = 64 * 2 ** 20  # Bytes del archivo activo antes de rotar (None: sin límite)
+AUDIT_MAX_AGE = 24 * 3600       # Segundos desde su primera entrada (None: sin límite)
+AUDIT_BLOCK_SIZE = 256 * 1024   # Bytes sin comprimir por bloque indexado
+AUDIT_COMPRESSION_LEVEL = 6
+
+# Historial de precios (GET /products/<id>/price-history): archivo binario
+# de solo agregado que alimenta PriceHistorySubscriber
+PRICE_HISTORY_FILE = 'price_history.bin'
+
+# Suscriptores fuera de proceso: los marcados 'process' en app.SUBSCRIBERS
+# se ejecutan en este número de procesos (0: todos en el hilo de la petición)
+SUBSCRIBER_PROCESSES = 0
+SUBSCRIBER_BATCH_SIZE = 256    # Eventos por lote enviado a un proceso
+SUBSCRIBER_QUEUE_SIZE = 10000  # Eventos en espera antes de frenar a quien emite
+
+# Catálogo compartido entre workers (utils/shared_catalog.py). Con un nombre,
+# las lecturas de productos y categorías salen de la memoria compartida que
+# publica `python -m utils.shared_catalog db.json`; cada worker vuelve a
+# publicar lo que escribe antes de responder (None: cada worker usa su propia
+# copia de la base). Favoritos, /products/popular y el historial de precios
+# no pasan por el catálogo: siguen cargándose en cada worker
+SHARED_CATALOG = None
+
+# Cabecera Idempotency-Key en POST /products y POST /favorites: un reintento
+# con la misma clave recibe la respuesta original sin repetir la escritura
+IDEMPOTENCY_TTL = 24 * 3600   # Segundos que se recuerda cada clave
+IDEMPOTENCY_MAX_KEYS = 10000  # Claves en memoria por proceso
+IDEMPOTENCY_WAIT = 10         # Segundos que un duplicado espera al original (luego 409)
+IDEMPOTENCY_DIRECTORY = None  # Directorio compartido entre workers (None: solo en memoria)
+IDEMPOTENCY_LEASE = 30        # Segundos tras los que una reserva sin respuesta se abandona
+
+# Group commit: escrituras concurrentes comparten una sola persistencia
+GROUP_COMMIT_ENABLED = True
+GROUP_COMMIT_WINDOW = 0.0     # Segundos extra que el líder espera a más escritores
+GROUP_COMMIT_MAX_BATCH = 128  # Escritores máximos por persistencia
+
+# Integridad referencial (categoría de un producto, producto de un favorito).
+# Para bases con productos cuya categoría no tiene fila, crearlas antes con:
+#   python -m repositories.category_repository db.json
+REFERENTIAL_INTEGRITY = True
+CATEGORY_ON_DELETE = 'restrict'  # 'restrict' (409 si tiene productos) o 'cascade'
+
+# Registro de cambios (GET /changes)
+CHANGE_LOG_SIZE = 10000   # Entradas que se conservan en memoria
+CHANGES_MAX_WAIT = 30     # Segundos máximos de long-poll
+
+# Compresión de respuestas (gzip/deflate según Accept-Encoding)
+COMPRESSION_ENABLED = True
+COMPRESSION_LEVEL = 6        # 1 (rápido) a 9 (más pequeño)
+COMPRESSION_MIN_SIZE = 1024  # Bytes; las respuestas menores van sin comprimir
+COMPRESSION_CACHE = True     # Cachear listados comprimidos por versión
 
 # Configuración de autenticación
 VALID_TOKEN = 'abcd1234'
 AUTH_USERNAME = 'student'
 AUTH_PASSWORD = 'desingp'
 
+# Profiling por muestreo (endpoint de administración: /admin/profile)
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.01  # Fracción de peticiones muestreadas
+PROFILING_INTERVAL = 0.005    # Segundos entre muestras de pila
+
 # Mensajes de error (centralizados para consistencia)
 ERROR_MESSAGES = {
     'token_not_found': 'Unauthorized: access token not found',
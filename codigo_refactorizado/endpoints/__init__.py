@@ -1,4 +1,23 @@
-from .auth import AuthenticationResource
-from .products import ProductsResource
-from .categories import CategoriesResource
-from .favorites import FavoritesResource
+"""
+Recursos REST de la API.
+
+Los nombres se importan al usarlos por primera vez (ver utils/lazy_exports.py):
+create_app solo carga los recursos que registra.
+"""
+
+from utils.lazy_exports import lazy_exports
+
+_EXPORTS = {
+    'AuthenticationResource': '.auth',
+    'ProductsResource': '.products',
+    'CategoriesResource': '.categories',
+    'FavoritesResource': '.favorites',
+    'ChangesResource': '.changes',
+    'PopularProductsResource': '.popular_products',
+    'AuditResource': '.audit',
+    'PriceHistoryResource': '.price_history',
+    'ProfileResource': '.profiling',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_exports(globals(), _EXPORTS)
@@ -0,0 +1,42 @@
+from datetime import datetime
+from itertools import islice
+from flask import Response, stream_with_context
+from flask_restful import Resource, reqparse
+from utils.auth_decorator import require_auth
+from utils.audit_log import audit_log
+from config.settings import AUDIT_LOG_FILE
+
+
+def iso_datetime(value):
+    """Valida un instante ISO 8601 y lo conserva como texto (el log compara strings)."""
+    datetime.fromisoformat(value)
+    return value
+
+
+class AuditResource(Resource):
+    """Recurso REST para consultar el log de auditoría."""
+
+    def __init__(self):
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('event_type', type=str, location='args', help='Event type')
+        self.parser.add_argument('since', type=iso_datetime, location='args', help='ISO 8601 date (inclusive)')
+        self.parser.add_argument('until', type=iso_datetime, location='args', help='ISO 8601 date (exclusive)')
+        self.parser.add_argument('limit', type=int, location='args', help='Maximum number of entries')
+
+    @require_auth
+    def get(self):
+        """
+        Retorna las entradas del log (una por línea, application/x-ndjson).
+
+        - ?event_type=ProductDeletedEvent: solo ese tipo de evento
+        - ?since=...&until=...: rango de 'logged_at' (ISO 8601)
+        - ?limit=N: a lo sumo N entradas, las más antiguas primero
+
+        La respuesta se envía a medida que se leen los segmentos; solo se
+        descomprimen los bloques que el índice no descarta.
+        """
+        args = self.parser.parse_args()
+        lines = audit_log(AUDIT_LOG_FILE).query(args['event_type'], args['since'], args['until'])
+        if args['limit'] is not None:
+            lines = islice(lines, max(args['limit'], 0))
+        return Response(stream_with_context(line + '\n' for line in lines), mimetype='application/x-ndjson')
@@ -1,58 +1,90 @@
-from flask_restful import Resource, reqparse
-from utils.database_connection import DatabaseConnection
-from utils.auth_decorator import require_auth
-from repositories.category_repository import CategoryRepository
-from config.settings import DATABASE_FILE
-
-
-class CategoriesResource(Resource):
-    """Recurso REST para operaciones con categorías."""
-
-    def __init__(self):
-        db = DatabaseConnection(DATABASE_FILE)
-        self.repository = CategoryRepository(db)
-        
-        self.parser = reqparse.RequestParser()
-        self.parser.add_argument('name', type=str, required=True, help='Name of the category')
-
-    @require_auth
-    def get(self, category_id=None):
-        """
-        Obtiene categorías.
-        
-        - Sin parámetros: retorna todas las categorías
-        - Con category_id: retorna una categoría específica
-        """
-        if category_id is not None:
-            category = self.repository.get_by_id(category_id)
-            if category:
-                return category
-            return {'message': 'Category not found'}, 404
-        
-        return self.repository.get_all()
-
-    @require_auth
-    def post(self):
-        """Crea una nueva categoría."""
-        args = self.parser.parse_args()
-        category_name = args['name']
-
-        # Validar que no exista
-        if self.repository.exists(category_name):
-            return {'message': 'Category already exists'}, 400
-
-        new_category = self.repository.create(category_name)
-        return {'message': 'Category added successfully', 'category': new_category}, 201
-
-    @require_auth
-    def delete(self):
-        """Elimina una categoría por nombre."""
-        args = self.parser.parse_args()
-        category_name = args['name']
-
-        # Validar que exista
-        if not self.repository.exists(category_name):
-            return {'message': 'Category not found'}, 404
-
-        self.repository.remove(category_name)
-        return {'message': 'Category removed successfully'}, 200
+from functools import cached_property
+from flask_restful import Resource, reqparse
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import require_auth
+from utils.conditional import conditional_get
+from repositories.base_repository import IntegrityError
+from repositories.category_repository import CategoryRepository
+from repositories.catalog_repository import catalog_repository
+from config.settings import DATABASE_FILE, CATEGORY_ON_DELETE
+from notifications.event_manager import EventManager
+from notifications.events.product_events import ProductDeletedEvent
+
+
+class CategoriesResource(Resource):
+    """Recurso REST para operaciones con categorías."""
+
+    def __init__(self):
+        # Con el catálogo compartido (SHARED_CATALOG) las lecturas no abren la base
+        self.catalog = catalog_repository(CategoryRepository.COLLECTION_NAME)
+        self.event_manager = EventManager()
+        
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('name', type=str, required=True, help='Name of the category')
+
+        self.delete_parser = self.parser.copy()
+        self.delete_parser.add_argument(
+            'on_delete', choices=('restrict', 'cascade'), default=CATEGORY_ON_DELETE,
+            help='What to do with the products of the category: restrict or cascade'
+        )
+
+    @cached_property
+    def repository(self):
+        return CategoryRepository(DatabaseConnection(DATABASE_FILE))
+
+    @require_auth
+    def get(self, category_id=None):
+        """
+        Obtiene categorías.
+        
+        - Sin parámetros: retorna todas las categorías
+        - Con category_id: retorna una categoría específica
+        """
+        reader = self.catalog or self.repository
+        if category_id is not None:
+            category = reader.get_by_id(category_id)
+            if category:
+                return category
+            return {'message': 'Category not found'}, 404
+        
+        return conditional_get(reader, reader.get_all())
+
+    @require_auth
+    def post(self):
+        """Crea una nueva categoría."""
+        args = self.parser.parse_args()
+        category_name = args['name']
+
+        # Validar que no exista
+        if self.repository.exists(category_name):
+            return {'message': 'Category already exists'}, 400
+
+        new_category = self.repository.create(category_name)
+        return {'message': 'Category added successfully', 'category': new_category}, 201
+
+    @require_auth
+    def delete(self):
+        """
+        Elimina una categoría por nombre.
+
+        Con on_delete=restrict (por defecto, ver CATEGORY_ON_DELETE) responde
+        409 si algún producto la usa; con on_delete=cascade borra también
+        esos productos y sus favoritos.
+        """
+        args = self.delete_parser.parse_args()
+        category_name = args['name']
+
+        # Validar que exista
+        if not self.repository.exists(category_name):
+            return {'message': 'Category not found'}, 404
+
+        try:
+            removed_products = self.repository.remove(category_name, args['on_delete'])
+        except IntegrityError as error:
+            return {'message': str(error)}, 409
+        for product in removed_products:
+            self.event_manager.emit(ProductDeletedEvent(product['id'], product['name']))
+        return {
+            'message': 'Category removed successfully',
+            'removed_products': len(removed_products)
+        }, 200
@@ -0,0 +1,46 @@
+from flask_restful import Resource, reqparse
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import require_auth
+from config.settings import DATABASE_FILE, CHANGES_MAX_WAIT
+
+
+class ChangesResource(Resource):
+    """Recurso REST con el registro de cambios (deltas) de la base."""
+
+    def __init__(self):
+        self.db = DatabaseConnection(DATABASE_FILE)
+
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('since', type=int, default=0, location='args', help='Last version seen')
+        self.parser.add_argument('epoch', type=str, location='args', help='Epoch of the version seen')
+        self.parser.add_argument('collection', type=str, location='args', help='Comma separated collections')
+        self.parser.add_argument('wait', type=float, default=0, location='args', help='Long-poll seconds')
+
+    @require_auth
+    def get(self):
+        """
+        Retorna los cambios posteriores a ?since=<version>.
+
+        - ?collection=products,favorites: filtra por colección
+        - ?wait=N: si no hay cambios, espera hasta N segundos (long-poll)
+        - ?epoch=X: época de `since` (la que vino con esa versión)
+
+        Si `truncated` es true (p. ej. el servidor se reinició o la
+        petición llegó a otro worker), el cliente debe volver a pedir las
+        colecciones completas y continuar desde `epoch` y `version`.
+        """
+        args = self.parser.parse_args()
+        collections = set(args['collection'].split(',')) if args['collection'] else None
+
+        wait = min(max(args['wait'], 0), CHANGES_MAX_WAIT)
+        changes, truncated = self.db.changes.since(args['since'], collections, args['epoch'])
+        if wait and not changes and not truncated:
+            self.db.changes.wait(args['since'], wait)
+            changes, truncated = self.db.changes.since(args['since'], collections, args['epoch'])
+
+        return {
+            'epoch': self.db.changes.epoch,
+            'version': self.db.changes.version,
+            'truncated': truncated,
+            'changes': [] if truncated else changes,
+        }, 200
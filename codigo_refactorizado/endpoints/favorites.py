@@ -1,52 +1,92 @@
-from flask_restful import Resource, reqparse
-from utils.database_connection import DatabaseConnection
-from utils.auth_decorator import require_auth
-from repositories.favorite_repository import FavoriteRepository
-from config.settings import DATABASE_FILE
-from notifications.event_manager import EventManager
-from notifications.events.favorite_events import FavoriteAddedEvent
-
-
-class FavoritesResource(Resource):
-    """Recurso REST para operaciones con favoritos."""
-
-    def __init__(self):
-        db = DatabaseConnection(DATABASE_FILE)
-        self.repository = FavoriteRepository(db)
-        self.event_manager = EventManager()
-        
-        self.parser = reqparse.RequestParser()
-        self.parser.add_argument('user_id', type=int, required=True, help='User ID')
-        self.parser.add_argument('product_id', type=int, required=True, help='Product ID')
-
-    @require_auth
-    def get(self):
-        """Obtiene todos los favoritos."""
-        return self.repository.get_all(), 200
-
-    @require_auth
-    def post(self):
-        """Agrega un producto a favoritos."""
-        args = self.parser.parse_args()
-        
-        new_favorite = self.repository.create(
-            user_id=args['user_id'],
-            product_id=args['product_id']
-        )
-        
-        event = FavoriteAddedEvent(new_favorite)
-        self.event_manager.emit(event)
-        
-        return {
-            'message': 'Product added to favorites',
-            'favorite': new_favorite
-        }, 201
-
-    @require_auth
-    def delete(self):
-        """Elimina un producto de favoritos."""
-        args = self.parser.parse_args()
-        
-        self.repository.remove(args['user_id'], args['product_id'])
-        
-        return {'message': 'Product removed from favorites'}, 200
+from flask import request
+from flask_restful import Resource, reqparse
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import require_auth
+from utils.idempotency import idempotent
+from utils.conditional import conditional_get
+from repositories.base_repository import IntegrityError
+from repositories.sharded_favorite_repository import favorite_repository
+from repositories.product_repository import ProductRepository
+from config.settings import DATABASE_FILE
+from notifications.event_manager import EventManager
+from notifications.events.favorite_events import FavoriteAddedEvent, FavoriteRemovedEvent
+
+
+class FavoritesResource(Resource):
+    """Recurso REST para operaciones con favoritos."""
+
+    def __init__(self):
+        db = DatabaseConnection(DATABASE_FILE)
+        self.repository = favorite_repository(db)
+        self.products = ProductRepository(db)
+        self.event_manager = EventManager()
+        
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('user_id', type=int, required=True, help='User ID')
+        self.parser.add_argument('product_id', type=int, required=True, help='Product ID')
+
+    @require_auth
+    def get(self):
+        """
+        Obtiene favoritos (con ETag por versión).
+
+        - Sin parámetros: retorna todos los favoritos
+        - Con ?user_id=X: retorna los del usuario, desde el índice
+        - Con ?user_id=X&expand=product: incluye cada producto completo
+        """
+        favorites = self.repository.get_all()
+        user_id = request.args.get('user_id', type=int)
+        if user_id is not None and request.args.get('expand') == 'product':
+            return self._expand_products(self.repository.get_by_user(user_id)), 200
+        if user_id is not None:
+            return conditional_get(
+                self.repository, favorites,
+                lambda: self.repository.get_by_user(user_id)
+            )
+        return conditional_get(self.repository, favorites)
+
+    def _expand_products(self, favorites):
+        """
+        Une favoritos con productos en un solo lote (sin N+1 peticiones).
+
+        Los productos salen de un único snapshot, así todos corresponden
+        a la misma versión del catálogo.
+        """
+        products = self.products.get_all()
+        by_id = {p['id']: p for p in products.get_many({f['product_id'] for f in favorites})}
+        return [{**f, 'product': by_id.get(f['product_id'])} for f in favorites]
+
+    @require_auth
+    @idempotent
+    def post(self):
+        """Agrega un producto a favoritos (idempotente)."""
+        args = self.parser.parse_args()
+        
+        try:
+            new_favorite, created = self.repository.add_if_absent(
+                user_id=args['user_id'],
+                product_id=args['product_id']
+            )
+        except IntegrityError as error:
+            return {'message': str(error)}, 400
+        if not created:
+            return {'message': 'Product already in favorites', 'favorite': new_favorite}, 200
+        
+        event = FavoriteAddedEvent(new_favorite)
+        self.event_manager.emit(event)
+        
+        return {
+            'message': 'Product added to favorites',
+            'favorite': new_favorite
+        }, 201
+
+    @require_auth
+    def delete(self):
+        """Elimina un producto de favoritos."""
+        args = self.parser.parse_args()
+        
+        removed = self.repository.remove(args['user_id'], args['product_id'])
+        for favorite in removed:
+            self.event_manager.emit(FavoriteRemovedEvent(favorite))
+        
+        return {'message': 'Product removed from favorites'}, 200
@@ -0,0 +1,33 @@
+from flask_restful import Resource, reqparse
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import require_auth
+from repositories.product_repository import ProductRepository
+from notifications.subscribers.popularity_subscriber import popular_products
+from config.settings import DATABASE_FILE, POPULAR_DEFAULT_LIMIT, POPULAR_MAX_LIMIT
+
+
+class PopularProductsResource(Resource):
+    """Recurso REST con los productos más agregados a favoritos."""
+
+    def __init__(self):
+        self.products = ProductRepository(DatabaseConnection(DATABASE_FILE))
+
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('category', type=str, location='args', help='Category of the products')
+        self.parser.add_argument('limit', type=int, default=POPULAR_DEFAULT_LIMIT, location='args',
+                                 help='Number of products')
+
+    @require_auth
+    def get(self):
+        """
+        Retorna los productos con más favoritos (cada uno con 'favorites').
+
+        - ?category=X: solo los de esa categoría
+        - ?limit=N: cantidad (hasta POPULAR_MAX_LIMIT)
+
+        Sale del ranking que mantiene PopularitySubscriber: no recorre los
+        favoritos en cada petición.
+        """
+        args = self.parser.parse_args()
+        limit = min(max(args['limit'], 1), POPULAR_MAX_LIMIT)
+        return popular_products(self.products, args['category'], limit), 200
@@ -0,0 +1,39 @@
+from datetime import datetime
+from flask_restful import Resource, reqparse
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import require_auth
+from utils.price_history import price_history_store, RESOLUTIONS
+from repositories.product_repository import ProductRepository
+from config.settings import DATABASE_FILE, PRICE_HISTORY_FILE
+
+
+class PriceHistoryResource(Resource):
+    """Recurso REST con el historial de precios de un producto."""
+
+    def __init__(self):
+        self.products = ProductRepository(DatabaseConnection(DATABASE_FILE))
+        self.store = price_history_store(PRICE_HISTORY_FILE)
+
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('from', type=datetime.fromisoformat, location='args', help='ISO 8601 date (inclusive)')
+        self.parser.add_argument('to', type=datetime.fromisoformat, location='args', help='ISO 8601 date (exclusive)')
+        self.parser.add_argument('resolution', type=str, choices=('raw', *RESOLUTIONS), default='raw',
+                                 location='args', help='raw, hour or day')
+
+    @require_auth
+    def get(self, product_id):
+        """
+        Retorna los precios del producto en el rango pedido.
+
+        - ?from=...&to=...: rango de fechas (ISO 8601)
+        - ?resolution=raw: cada cambio de precio (por defecto)
+        - ?resolution=hour|day: intervalos con open/high/low/close
+        """
+        args = self.parser.parse_args()
+        resolution = None if args['resolution'] == 'raw' else args['resolution']
+        points = self.store.history(product_id, args['from'], args['to'], resolution)
+        if points is None:
+            if self.products.get_by_id(product_id) is None:
+                return {'message': 'Product not found'}, 404
+            points = []
+        return {'product_id': product_id, 'resolution': args['resolution'], 'points': points}, 200
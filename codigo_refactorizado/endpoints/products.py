@@ -1,65 +1,154 @@
-from flask import request
-from flask_restful import Resource, reqparse
-from utils.database_connection import DatabaseConnection
-from utils.auth_decorator import require_auth
-from repositories.product_repository import ProductRepository
-from config.settings import DATABASE_FILE
-from notifications.event_manager import EventManager
-from notifications.events.product_events import ProductCreatedEvent
-
-
-class ProductsResource(Resource):
-    """Recurso REST para operaciones con productos."""
-
-    def __init__(self):
-        # Inyección de dependencias a través del repositorio
-        db = DatabaseConnection(DATABASE_FILE)
-        self.repository = ProductRepository(db)
-        self.event_manager = EventManager()
-        
-        # Parser para validar datos de entrada
-        self.parser = reqparse.RequestParser()
-        self.parser.add_argument('name', type=str, required=True, help='Name of the product')
-        self.parser.add_argument('category', type=str, required=True, help='Category of the product')
-        self.parser.add_argument('price', type=float, required=True, help='Price of the product')
-
-    @require_auth  # Decorador que maneja la autenticación
-    def get(self, product_id=None):
-        """
-        Obtiene productos.
-        
-        - Sin parámetros: retorna todos los productos
-        - Con product_id: retorna un producto específico
-        - Con ?category=X: filtra por categoría
-        """
-        category_filter = request.args.get('category')
-
-        # Filtrar por categoría si se especifica
-        if category_filter:
-            return self.repository.get_by_category(category_filter)
-        
-        # Buscar producto específico por ID
-        if product_id is not None:
-            product = self.repository.get_by_id(product_id)
-            if product:
-                return product
-            return {'message': 'Product not found'}, 404
-        
-        # Retornar todos los productos
-        return self.repository.get_all()
-
-    @require_auth
-    def post(self):
-        """Crea un nuevo producto."""
-        args = self.parser.parse_args()
-        
-        new_product = self.repository.create(
-            name=args['name'],
-            category=args['category'],
-            price=args['price']
-        )
-        
-        event = ProductCreatedEvent(new_product)
-        self.event_manager.emit(event)
-        
-        return {'message': 'Product added', 'product': new_product}, 201
+from functools import cached_property
+from flask import request
+from flask_restful import Resource, reqparse
+from utils.database_connection import DatabaseConnection
+from utils.auth_decorator import require_auth
+from utils.idempotency import idempotent
+from utils.conditional import conditional_get
+from repositories.base_repository import IntegrityError
+from repositories.product_repository import ProductRepository
+from repositories.catalog_repository import catalog_repository
+from config.settings import DATABASE_FILE
+from notifications.event_manager import EventManager
+from notifications.events.product_events import (
+    ProductCreatedEvent,
+    ProductPriceChangedEvent,
+    ProductDeletedEvent
+)
+
+
+class ProductsResource(Resource):
+    """Recurso REST para operaciones con productos."""
+
+    def __init__(self):
+        # Con el catálogo compartido (SHARED_CATALOG) las lecturas no abren la base
+        self.catalog = catalog_repository(ProductRepository.COLLECTION_NAME)
+        self.event_manager = EventManager()
+        
+        # Parser para validar datos de entrada
+        self.parser = reqparse.RequestParser()
+        self.parser.add_argument('name', type=str, required=True, help='Name of the product')
+        self.parser.add_argument('category', type=str, required=True, help='Category of the product')
+        self.parser.add_argument('price', type=float, required=True, help='Price of the product')
+
+        # Parser para actualizaciones parciales (PATCH): todos opcionales
+        self.patch_parser = reqparse.RequestParser()
+        self.patch_parser.add_argument('name', type=str, store_missing=False, help='Name of the product')
+        self.patch_parser.add_argument('category', type=str, store_missing=False, help='Category of the product')
+        self.patch_parser.add_argument('price', type=float, store_missing=False, help='Price of the product')
+
+    @cached_property
+    def repository(self):
+        """Inyección de dependencias a través del repositorio (se abre al usarlo)."""
+        return ProductRepository(DatabaseConnection(DATABASE_FILE))
+
+    @require_auth  # Decorador que maneja la autenticación
+    def get(self, product_id=None):
+        """
+        Obtiene productos.
+        
+        - Sin parámetros: retorna todos los productos
+        - Con product_id: retorna un producto específico
+        - Con ?category=X: filtra por categoría
+        - Con ?ids=1,2,3: retorna esos productos (multi-get por índice)
+
+        Los listados llevan ETag con la versión de la colección y responden
+        304 si el cliente envía If-None-Match con esa versión.
+        """
+        reader = self.catalog or self.repository
+        category_filter = request.args.get('category')
+        ids_filter = request.args.get('ids')
+        products = reader.get_all()
+
+        # Multi-get: una sola pasada por el índice de IDs
+        if ids_filter:
+            try:
+                ids = [int(i) for i in ids_filter.split(',') if i]
+            except ValueError:
+                return {'message': {'ids': 'Comma separated product IDs'}}, 400
+            return conditional_get(
+                reader, products,
+                lambda: products.get_many(ids)
+            )
+
+        # Filtrar por categoría si se especifica
+        if category_filter:
+            return conditional_get(
+                reader, products,
+                lambda: reader.get_by_category(category_filter)
+            )
+        
+        # Buscar producto específico por ID
+        if product_id is not None:
+            product = reader.get_by_id(product_id)
+            if product:
+                return product
+            return {'message': 'Product not found'}, 404
+        
+        # Retornar todos los productos
+        return conditional_get(reader, products)
+
+    @require_auth
+    @idempotent
+    def post(self):
+        """Crea un nuevo producto."""
+        args = self.parser.parse_args()
+        
+        try:
+            new_product = self.repository.create(
+                name=args['name'],
+                category=args['category'],
+                price=args['price']
+            )
+        except IntegrityError as error:
+            return {'message': str(error)}, 400
+        
+        event = ProductCreatedEvent(new_product)
+        self.event_manager.emit(event)
+        
+        return {'message': 'Product added', 'product': new_product}, 201
+
+    @require_auth
+    def put(self, product_id=None):
+        """Reemplaza nombre, categoría y precio de un producto."""
+        return self._update(product_id, self.parser)
+
+    @require_auth
+    def patch(self, product_id=None):
+        """Actualiza solo los campos enviados de un producto."""
+        return self._update(product_id, self.patch_parser)
+
+    @require_auth
+    def delete(self, product_id=None):
+        """Elimina un producto (y en cascada los favoritos que lo referencian)."""
+        if product_id is None:
+            return {'message': 'Product ID is required'}, 400
+
+        product = self.repository.remove(product_id)
+        if product is None:
+            return {'message': 'Product not found'}, 404
+
+        self.event_manager.emit(ProductDeletedEvent(product['id'], product['name']))
+        return {'message': 'Product deleted', 'product': product}
+
+    def _update(self, product_id, parser):
+        """Aplica los campos validados por `parser` y emite el evento de precio."""
+        if product_id is None:
+            return {'message': 'Product ID is required'}, 400
+        changes = parser.parse_args()
+        if not changes:
+            return {'message': 'No fields to update'}, 400
+
+        try:
+            result = self.repository.update(product_id, dict(changes))
+        except IntegrityError as error:
+            return {'message': str(error)}, 400
+        if result is None:
+            return {'message': 'Product not found'}, 404
+
+        previous, product = result
+        if previous['price'] != product['price']:
+            event = ProductPriceChangedEvent(product_id, previous['price'], product['price'])
+            self.event_manager.emit(event)
+
+        return {'message': 'Product updated', 'product': product}
@@ -0,0 +1,26 @@
+from flask import Response, current_app, request
+from flask_restful import Resource
+from utils.auth_decorator import require_auth
+
+
+class ProfileResource(Resource):
+    """Recurso de administración que expone las muestras del profiler."""
+
+    @require_auth
+    def get(self):
+        """
+        Retorna las pilas muestreadas en formato collapsed (text/plain).
+
+        - ?endpoint=GET /products: solo ese endpoint
+        - ?summary=1: muestras por endpoint en JSON
+        - ?reset=1: limpia las muestras después de leerlas
+        """
+        profiler = current_app.extensions['profiler']
+
+        if request.args.get('summary'):
+            return profiler.endpoints(), 200
+
+        body = profiler.collapsed(request.args.get('endpoint'))
+        if request.args.get('reset'):
+            profiler.reset()
+        return Response(body, mimetype='text/plain')
@@ -0,0 +1,43 @@
+import asyncio
+import inspect
+
+
+class AsyncEventManager:
+    """
+    Variante asíncrona del EventManager (Singleton).
+
+    Los suscriptores pueden ser corrutinas (``async def handle``) o
+    suscriptores normales; estos últimos se ejecutan en el executor por
+    defecto del loop porque suelen escribir en archivos.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._subscribers = {}
+        return cls._instance
+
+    def subscribe(self, event_type, subscriber):
+        if event_type not in self._subscribers:
+            self._subscribers[event_type] = []
+        self._subscribers[event_type].append(subscriber)
+
+    def unsubscribe(self, event_type, subscriber):
+        if event_type in self._subscribers:
+            self._subscribers[event_type].remove(subscriber)
+
+    async def emit(self, event):
+        event_type = type(event).__name__
+        subscribers = self._subscribers.get(event_type, [])
+        if not subscribers:
+            return
+
+        loop = asyncio.get_running_loop()
+        pending = []
+        for subscriber in subscribers:
+            if inspect.iscoroutinefunction(subscriber.handle):
+                pending.append(subscriber.handle(event))
+            else:
+                pending.append(loop.run_in_executor(None, subscriber.handle, event))
+        await asyncio.gather(*pending)
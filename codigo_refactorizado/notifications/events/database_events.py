@@ -0,0 +1,10 @@
+from .base_event import BaseEvent
+
+class DatabaseReloadedEvent(BaseEvent):
+    """reload() aplicó cambios hechos al archivo fuera de la app."""
+
+    def __init__(self, path, collections):
+        super().__init__({
+            'path': path,
+            'collections': list(collections)
+        })
@@ -6,3 +6,10 @@ class FavoriteAddedEvent(BaseEvent):
             'user_id': favorite['user_id'],
             'product_id': favorite['product_id']
         })
+
+class FavoriteRemovedEvent(BaseEvent):
+    def __init__(self, favorite):
+        super().__init__({
+            'user_id': favorite['user_id'],
+            'product_id': favorite['product_id']
+        })
@@ -15,7 +15,7 @@ class ProductPriceChangedEvent(BaseEvent):
             'product_id': product_id,
             'old_price': old_price,
             'new_price': new_price,
-            'change_percentage': ((new_price - old_price) / old_price) * 100
+            'change_percentage': ((new_price - old_price) / old_price) * 100 if old_price else None
         })
 
 class ProductDeletedEvent(BaseEvent):
@@ -0,0 +1,266 @@
+"""
+Suscriptores que corren en procesos aparte.
+
+`EventManager.emit` ejecuta a cada suscriptor en el hilo de la petición;
+uno que use mucha CPU le quita tiempo (y el GIL) a las demás peticiones.
+Con `SubscriberPool`, `ProcessSubscriber.handle` solo encola el evento y
+lo entrega un pool de procesos (multiprocessing, 'spawn'):
+
+- Los eventos viajan en lotes (hasta `batch_size`) como tuplas
+  (suscriptor, tipo, timestamp, data) serializadas con pickle; los
+  suscriptores viajan una sola vez por proceso (ruta 'modulo:Clase' y
+  argumentos, construidos con LazySubscriber en el proceso hijo).
+- Cada proceso responde cuántos eventos manejó y los errores de sus
+  suscriptores, que quedan en `errors` (y se imprimen).
+- Si un proceso muere se reinicia y se reenvía el lote (entrega al menos
+  una vez). Un lote que lo hace morir `max_attempts` veces se descarta y
+  se registra como error.
+
+La cola es acotada: si los procesos no dan abasto, `handle` espera
+(contrapresión) en lugar de acumular memoria sin límite.
+"""
+
+import atexit
+import collections
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from datetime import datetime
+
+_STOP = object()
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class SubscriberPool:
+    """
+    Args:
+        processes: Procesos de trabajo.
+        batch_size: Eventos máximos por lote.
+        queue_size: Eventos encolados máximos antes de que `submit` espere.
+        max_attempts: Veces que se intenta un lote si el proceso muere.
+        start_method: Método de multiprocessing ('spawn' no hereda los
+            hilos ni los locks del servidor).
+    """
+
+    def __init__(self, processes=2, batch_size=256, queue_size=10000, max_attempts=2, start_method='spawn'):
+        self.processes = processes
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._context = multiprocessing.get_context(start_method)
+        self._queue = queue.Queue(queue_size)
+        self._targets = []        # (target, args) en orden de registro
+        self._target_index = {}
+        self._slots = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._started = False
+        self._closed = False
+        self.errors = collections.deque(maxlen=100)
+        self.handled = 0
+        self.batches = 0
+        self.restarts = 0
+
+    def register(self, target, *args):
+        """Registra un suscriptor ('modulo:Clase' y argumentos); retorna su índice."""
+        key = (target, args)
+        with self._lock:
+            if key not in self._target_index:
+                self._target_index[key] = len(self._targets)
+                self._targets.append(key)
+            return self._target_index[key]
+
+    def submit(self, index, event):
+        """Encola el evento para el suscriptor `index` (inicia el pool si hace falta)."""
+        if not self._started:
+            self._start()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('SubscriberPool is closed')
+            self._pending += 1
+        self._queue.put((index, type(event).__name__, event.timestamp.timestamp(), event.data))
+
+    def flush(self, timeout=None):
+        """Espera a que se entreguen los eventos encolados. Retorna False si venció `timeout`."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout=5.0):
+        """Entrega lo pendiente (hasta `timeout`) y detiene los procesos."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if not self._started:
+            return
+        self.flush(timeout)
+        for _ in self._slots:
+            self._queue.put(_STOP)
+        for slot in self._slots:
+            slot.thread.join(timeout)
+            slot.stop()
+
+    def stats(self):
+        return {
+            'processes': self.processes,
+            'queued': self._pending,
+            'handled': self.handled,
+            'batches': self.batches,
+            'errors': len(self.errors),
+            'restarts': self.restarts,
+        }
+
+    # ============ Hilos de entrega (uno por proceso) ============
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            for n in range(self.processes):
+                slot = _Slot(self._context, n)
+                slot.thread = threading.Thread(target=self._serve, args=(slot,), name=f'subscriber-pool-{n}',
+                                               daemon=True)
+                self._slots.append(slot)
+                slot.thread.start()
+            self._started = True
+        atexit.register(self.close)
+
+    def _serve(self, slot):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            records = [item]
+            while len(records) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                records.append(item)
+            try:
+                self._deliver(slot, records)
+            except Exception as error:
+                # p. ej. un evento que no se puede serializar: el hilo sigue con el próximo lote
+                self._record(0, [(self._targets[index][0], event_type, repr(error))
+                                 for index, event_type, _, _ in records])
+            finally:
+                with self._idle:
+                    self._pending -= len(records)
+                    if not self._pending:
+                        self._idle.notify_all()
+        slot.stop()
+
+    def _deliver(self, slot, records):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self._lock:
+                    new_targets = self._targets[slot.known:]
+                handled, errors = slot.call(new_targets, records)
+                break
+            except (EOFError, OSError):
+                # El proceso murió con el lote: se reinicia y se reintenta
+                slot.stop()
+                with self._lock:
+                    self.restarts += 1
+                if attempt == self.max_attempts:
+                    handled = 0
+                    errors = [(self._targets[index][0], event_type, 'worker process died')
+                              for index, event_type, _, _ in records]
+        self._record(handled, errors)
+
+    def _record(self, handled, errors):
+        with self._lock:
+            self.batches += 1
+            self.handled += handled
+            self.errors.extend(errors)
+        for target, event_type, message in errors:
+            print(f"Error in subscriber {target} ({event_type}): {message}")
+
+
+class _Slot:
+    """Un proceso de trabajo y su extremo del Pipe; lo usa un solo hilo."""
+
+    def __init__(self, context, number):
+        self.context = context
+        self.number = number
+        self.process = None
+        self.conn = None
+        self.known = 0  # Suscriptores ya enviados a este proceso
+        self.thread = None
+
+    def call(self, new_targets, records):
+        """Envía un lote y espera la respuesta (handled, errors)."""
+        if self.process is None:
+            self._spawn()
+        self.conn.send_bytes(pickle.dumps((new_targets, records), PROTOCOL))
+        while not self.conn.poll(0.1):
+            if not self.process.is_alive():
+                raise EOFError('worker process died')
+        result = pickle.loads(self.conn.recv_bytes())
+        self.known += len(new_targets)
+        return result
+
+    def _spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_worker_main, args=(child_conn, os.getcwd()),
+                                            name=f'subscriber-worker-{self.number}', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop(self):
+        if self.conn is not None:
+            self.conn.close()  # El proceso termina al leer EOF
+            self.conn = None
+        if self.process is not None:
+            self.process.join(1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        self.known = 0  # Un proceso nuevo no conoce ningún suscriptor
+
+
+# ============ Proceso de trabajo ============
+
+def _worker_main(conn, cwd):
+    from notifications.events.base_event import BaseEvent
+    from notifications.subscribers.lazy_subscriber import LazySubscriber
+
+    os.chdir(cwd)
+    subscribers = []
+    event_classes = {}
+    while True:
+        try:
+            new_targets, records = pickle.loads(conn.recv_bytes())
+        except EOFError:
+            return
+        subscribers.extend(LazySubscriber(target, *args) for target, args in new_targets)
+        handled, errors = 0, []
+        for index, event_type, timestamp, data in records:
+            event_class = event_classes.get(event_type)
+            if event_class is None:
+                # Misma clase por nombre: los suscriptores usan type(event).__name__
+                event_class = event_classes[event_type] = type(event_type, (BaseEvent,), {})
+            event = event_class.__new__(event_class)
+            event.timestamp = datetime.fromtimestamp(timestamp)
+            event.data = data
+            try:
+                subscribers[index].handle(event)
+                handled += 1
+            except Exception as error:
+                errors.append((subscribers[index].target, event_type, repr(error)))
+        conn.send_bytes(pickle.dumps((handled, errors), PROTOCOL))
@@ -4,3 +4,8 @@ class BaseSubscriber(ABC):
     @abstractmethod
     def handle(self, event):
         pass
+
+class AsyncBaseSubscriber(ABC):
+    @abstractmethod
+    async def handle(self, event):
+        pass
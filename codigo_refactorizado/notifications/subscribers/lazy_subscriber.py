@@ -0,0 +1,33 @@
+from .base_subscriber import BaseSubscriber
+from importlib import import_module
+import threading
+
+class LazySubscriber(BaseSubscriber):
+    """
+    Difiere el import y la construcción de un suscriptor hasta su primer
+    evento, así registrarlo no cuesta nada al arrancar la app.
+
+    Args:
+        target: Ruta 'modulo:Clase' del suscriptor real.
+        *args, **kwargs: Argumentos para construirlo.
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        self.target = target
+        self._args = args
+        self._kwargs = kwargs
+        self._subscriber = None
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber(self):
+        if self._subscriber is None:
+            with self._lock:
+                if self._subscriber is None:
+                    module_name, class_name = self.target.split(':')
+                    subscriber_class = getattr(import_module(module_name), class_name)
+                    self._subscriber = subscriber_class(*self._args, **self._kwargs)
+        return self._subscriber
+
+    def handle(self, event):
+        self.subscriber.handle(event)
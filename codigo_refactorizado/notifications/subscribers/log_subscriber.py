@@ -1,9 +1,12 @@
 from .base_subscriber import BaseSubscriber
-import json
 from datetime import datetime
+from utils.audit_log import audit_log
+from config.settings import AUDIT_LOG_FILE
 
 class LogSubscriber(BaseSubscriber):
-    def __init__(self, log_file='audit.log'):
+    """Registra cada evento en el log de auditoría (rotado y consultable, ver utils/audit_log.py)."""
+
+    def __init__(self, log_file=AUDIT_LOG_FILE):
         self.log_file = log_file
     
     def handle(self, event):
@@ -11,5 +14,5 @@ class LogSubscriber(BaseSubscriber):
             'logged_at': datetime.now().isoformat(),
             **event.to_dict()
         }
-        with open(self.log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Se resuelve en cada evento: una ruta relativa sigue al directorio actual
+        audit_log(self.log_file).append(log_entry)
@@ -0,0 +1,116 @@
+from .base_subscriber import BaseSubscriber
+from collections import Counter
+import threading
+from utils.database_connection import DatabaseConnection
+from utils.popularity import PopularityBoard
+from repositories.category_repository import category_key
+from repositories.product_repository import ProductRepository
+from repositories.sharded_favorite_repository import favorite_repository
+from config.settings import DATABASE_FILE, POPULARITY_CHECKPOINT_FILE, POPULARITY_CHECKPOINT_INTERVAL
+
+_board = None
+_board_lock = threading.Lock()
+_recount = False  # El próximo ranking se recuenta sin mirar el checkpoint
+
+
+def popularity_board():
+    """
+    Ranking de popularidad del proceso.
+
+    Se construye con el primer uso: desde el checkpoint si coincide con la
+    cantidad de favoritos de la base, o recontando los favoritos.
+
+    Returns:
+        Tupla (board, creado).
+    """
+    global _board, _recount
+    if _board is not None:
+        return _board, False
+    with _board_lock:
+        if _board is not None:
+            return _board, False
+        _board = build_board(DatabaseConnection(DATABASE_FILE), POPULARITY_CHECKPOINT_FILE, restore=not _recount)
+        _recount = False
+        _board.start_checkpoints(POPULARITY_CHECKPOINT_INTERVAL)
+        return _board, True
+
+
+def reset_popularity_board(recount=False):
+    """
+    Descarta el ranking del proceso (se reconstruye en el próximo uso).
+    Con `recount` se recuenta desde la base aunque el checkpoint coincida
+    (p. ej. la base se recargó con cambios externos).
+    """
+    global _board, _recount
+    with _board_lock:
+        if _board is not None:
+            _board.stop_checkpoints()
+        _board = None
+        _recount = recount
+
+
+def build_board(db, checkpoint_file=None, restore=True):
+    """Crea un ranking desde el checkpoint o, si no sirve, recontando la base."""
+    board = PopularityBoard(checkpoint_file)
+    favorites = favorite_repository(db).get_all()
+    if restore and board.restore(expected_total=len(favorites)):
+        return board
+    products = ProductRepository(db).get_all()
+    for product_id, count in Counter(f['product_id'] for f in favorites).items():
+        product = products.get_by_id(product_id)
+        if product is not None:
+            board.favorite_added(product_id, category_key(product['category']), count)
+    return board
+
+
+def popular_products(products, category=None, limit=10):
+    """
+    Productos más favoritos (con su conteo en 'favorites'), de mayor a menor.
+
+    El ranking guarda la categoría del producto al recibir su primer
+    favorito; si cambió o el producto ya no existe se corrige aquí y se
+    vuelve a consultar.
+    """
+    board = popularity_board()[0]
+    key = category_key(category) if category else None
+    while True:
+        ranked = board.top(limit, key)
+        snapshot = products.get_all()  # Después del top: incluye todo producto rankeado
+        result, stale = [], False
+        for product_id, count in ranked:
+            product = snapshot.get_by_id(product_id)
+            if product is None:
+                board.product_deleted(product_id)
+                stale = True
+            elif key is not None and category_key(product['category']) != key:
+                board.move(product_id, category_key(product['category']))
+                stale = True
+            else:
+                result.append({**product, 'favorites': count})
+        if not stale:
+            return result
+
+
+class PopularitySubscriber(BaseSubscriber):
+    """
+    Mantiene el ranking de popularidad con los eventos de favoritos
+    (FavoriteAddedEvent, FavoriteRemovedEvent) y de productos eliminados.
+    """
+
+    def __init__(self, db_file=DATABASE_FILE):
+        self.db_file = db_file
+
+    def handle(self, event):
+        board, created = popularity_board()
+        if created:
+            return  # El recuento inicial ya incluye este evento
+        event_type = type(event).__name__
+        product_id = event.data['product_id']
+        if event_type == 'FavoriteAddedEvent':
+            product = ProductRepository(DatabaseConnection(self.db_file)).get_by_id(product_id)
+            if product is not None:
+                board.favorite_added(product_id, category_key(product['category']))
+        elif event_type == 'FavoriteRemovedEvent':
+            board.favorite_removed(product_id)
+        elif event_type == 'ProductDeletedEvent':
+            board.product_deleted(product_id)
@@ -0,0 +1,17 @@
+from .base_subscriber import BaseSubscriber
+from utils.price_history import price_history_store
+from config.settings import PRICE_HISTORY_FILE
+
+class PriceHistorySubscriber(BaseSubscriber):
+    """
+    Guarda el precio de cada producto al crearlo (ProductCreatedEvent) y
+    en cada cambio (ProductPriceChangedEvent) en el historial de precios.
+    """
+
+    def __init__(self, history_file=PRICE_HISTORY_FILE):
+        self.history_file = history_file
+
+    def handle(self, event):
+        data = event.data
+        price = data['new_price'] if 'new_price' in data else data['price']
+        price_history_store(self.history_file).record(data['product_id'], price, event.timestamp)
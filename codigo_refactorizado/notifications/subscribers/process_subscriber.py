@@ -0,0 +1,20 @@
+from .base_subscriber import BaseSubscriber
+
+class ProcessSubscriber(BaseSubscriber):
+    """
+    Ejecuta un suscriptor en los procesos de un SubscriberPool: `handle`
+    solo encola el evento (ver notifications/process_pool.py).
+
+    Args:
+        pool: SubscriberPool que entrega los eventos.
+        target: Ruta 'modulo:Clase' del suscriptor real.
+        *args: Argumentos para construirlo (deben poder serializarse con pickle).
+    """
+
+    def __init__(self, pool, target, *args):
+        self.pool = pool
+        self.target = target
+        self._index = pool.register(target, *args)
+
+    def handle(self, event):
+        self.pool.submit(self._index, event)
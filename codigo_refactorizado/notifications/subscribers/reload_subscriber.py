@@ -0,0 +1,28 @@
+from .base_subscriber import BaseSubscriber
+from .popularity_subscriber import reset_popularity_board
+from utils.compression import invalidate_listings
+from utils.idempotency import idempotency_cache
+from config.settings import DATABASE_FILE, FAVORITES_SHARDS
+
+class ReloadSubscriber(BaseSubscriber):
+    """
+    Invalida lo que se deriva de la base y no depende de su versión cuando
+    reload() aplica cambios hechos fuera de la app (DatabaseReloadedEvent):
+
+    - El ranking de popularidad se recuenta en el próximo uso.
+    - Las respuestas de idempotencia en memoria se olvidan: pueden citar
+      registros que ya no existen (p. ej. al restaurar un respaldo).
+    - Los listados comprimidos de esas colecciones se descartan.
+    """
+
+    def __init__(self, db_file=DATABASE_FILE, shard_files=FAVORITES_SHARDS):
+        self.paths = {db_file, *shard_files}
+
+    def handle(self, event):
+        if event.data['path'] not in self.paths:
+            return
+        collections = set(event.data['collections'])
+        if collections & {'products', 'favorites'}:
+            reset_popularity_board(recount=True)
+            idempotency_cache().forget_completed()
+        invalidate_listings(collections)
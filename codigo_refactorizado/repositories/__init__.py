@@ -1,4 +1,23 @@
-from .base_repository import BaseRepository
-from .product_repository import ProductRepository
-from .category_repository import CategoryRepository
-from .favorite_repository import FavoriteRepository
+"""
+Repositorios de acceso a datos.
+
+Los nombres se importan al usarlos por primera vez (ver utils/lazy_exports.py).
+"""
+
+from utils.lazy_exports import lazy_exports
+
+_EXPORTS = {
+    'BaseRepository': '.base_repository',
+    'IntegrityError': '.base_repository',
+    'ProductRepository': '.product_repository',
+    'CategoryRepository': '.category_repository',
+    'FavoriteRepository': '.favorite_repository',
+    'ShardedFavoriteRepository': '.sharded_favorite_repository',
+    'favorite_repository': '.sharded_favorite_repository',
+    'AsyncRepository': '.async_repository',
+    'CatalogRepository': '.catalog_repository',
+    'catalog_repository': '.catalog_repository',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_exports(globals(), _EXPORTS)
@@ -0,0 +1,45 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+# Hilos de escritura: DatabaseConnection serializa las mutaciones y el
+# group commit agrupa las persistencias de escrituras concurrentes.
+_write_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='db-writer')
+
+
+class AsyncRepository:
+    """
+    Adaptador asíncrono para cualquier repositorio (patrón Adapter).
+
+    - Las lecturas se resuelven en memoria y se ejecutan directamente.
+    - Las escrituras (que terminan en DatabaseConnection._save) se delegan
+      a un executor para no bloquear el event loop.
+
+    Uso:
+        products = AsyncRepository(ProductRepository(db))
+        await products.get_all()
+        await products.create(name='Hat', category='men', price=9.99)
+    """
+
+    WRITE_METHODS = (
+        'add', 'create', 'update', 'remove', 'add_if_absent',
+        'remove_by_product', 'remove_by_category',
+    )
+
+    def __init__(self, repository, executor=None):
+        self._repository = repository
+        self._executor = executor or _write_executor
+
+    def __getattr__(self, name):
+        attr = getattr(self._repository, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            if name in self.WRITE_METHODS:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, partial(attr, *args, **kwargs))
+            return attr(*args, **kwargs)
+
+        return call
@@ -1,4 +1,9 @@
 from abc import ABC
+from utils.snapshot import VersionedCollection
+
+
+class IntegrityError(Exception):
+    """Una escritura rompería una referencia entre colecciones."""
 
 
 class BaseRepository(ABC):
@@ -7,37 +12,57 @@ class BaseRepository(ABC):
     
     Cada repositorio hijo solo necesita definir:
     - COLLECTION_NAME: nombre de la colección en el JSON
+    - STORE_CLASS (opcional): estructura en memoria de la colección
     """
 
     # Cada repositorio define su colección
     COLLECTION_NAME = None
+    STORE_CLASS = VersionedCollection
 
     def __init__(self, db_connection):
         """Recibe la conexión a BD (inyección de dependencias)."""
         self.db = db_connection
+        self.store = db_connection.use_store(self.COLLECTION_NAME, self.STORE_CLASS)
+
+    @property
+    def epoch(self):
+        """Identifica la carga de la base (ver utils/conditional.py)."""
+        return self.db.changes.epoch
 
     def get_all(self):
-        """Obtiene todos los elementos de la colección."""
+        """
+        Obtiene todos los elementos de la colección.
+
+        Retorna un snapshot inmutable (O(1), sin copias ni locks).
+        """
         return self.db.get_collection(self.COLLECTION_NAME)
 
+    def _remove_where(self, predicate):
+        """Elimina los elementos que cumplen el predicado."""
+        return self.db.remove(self.COLLECTION_NAME, predicate)
+
     def _save_all(self, items):
         """Guarda todos los elementos de la colección."""
         self.db.save_collection(self.COLLECTION_NAME, items)
 
     def get_by_id(self, item_id):
-        """Obtiene un elemento por su ID."""
-        items = self.get_all()
-        return next((item for item in items if item.get('id') == item_id), None)
+        """Obtiene un elemento por su ID (O(1) con el índice del snapshot)."""
+        return self.get_all().get_by_id(item_id)
+
+    def get_many(self, item_ids):
+        """Obtiene varios elementos por ID en una sola pasada por el índice."""
+        return self.get_all().get_many(item_ids)
 
     def add(self, item):
         """Agrega un nuevo elemento."""
-        items = self.get_all()
-        items.append(item)
-        self._save_all(items)
+        self.db.append(self.COLLECTION_NAME, item)
 
     def _generate_id(self):
-        """Genera un nuevo ID basado en el máximo existente."""
-        items = self.get_all()
-        if not items:
-            return 1
-        return max(item.get('id', 0) for item in items) + 1
+        """
+        Genera un nuevo ID con el contador de la colección (O(1), no
+        reutiliza los IDs de registros borrados).
+
+        Llamar dentro de `self.db.transaction()` para que dos escritores no
+        obtengan el mismo ID.
+        """
+        return self.db.next_id(self.COLLECTION_NAME)
@@ -0,0 +1,53 @@
+from utils.shared_catalog import shared_catalog
+from config.settings import SHARED_CATALOG
+from .category_repository import category_key
+
+
+class CatalogRepository:
+    """
+    Repositorio de solo lectura sobre el catálogo compartido (ver
+    utils/shared_catalog.py), con los métodos de lectura de
+    ProductRepository y CategoryRepository que usan los endpoints.
+
+    Cada llamada lee la última generación publicada; get_all() retorna
+    una colección inmutable de esa generación, como un snapshot.
+    """
+
+    def __init__(self, catalog, collection_name):
+        self.catalog = catalog
+        self.COLLECTION_NAME = collection_name
+
+    @property
+    def epoch(self):
+        """Identifica el catálogo: las generaciones vuelven a empezar si se recrea."""
+        return self.catalog.current().catalog_id
+
+    def get_all(self):
+        return self.catalog.current().collection(self.COLLECTION_NAME)
+
+    def get_by_id(self, item_id):
+        return self.get_all().get_by_id(item_id)
+
+    def get_many(self, item_ids):
+        return self.get_all().get_many(item_ids)
+
+    def get_by_category(self, category):
+        """Productos de una categoría (índice por categoría del catálogo)."""
+        return self.get_all().lookup(category_key(category))
+
+    def exists(self, name):
+        """Verifica si una categoría existe (índice por nombre del catálogo)."""
+        return self.get_all().has(category_key(name))
+
+
+def catalog_repository(collection_name):
+    """
+    CatalogRepository de la colección si SHARED_CATALOG está configurado y
+    ya se publicó; None si no (los endpoints leen entonces de la base).
+    """
+    if not SHARED_CATALOG:
+        return None
+    catalog = shared_catalog(SHARED_CATALOG)
+    if not catalog.available():
+        return None
+    return CatalogRepository(catalog, collection_name)
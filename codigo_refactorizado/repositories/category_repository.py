@@ -1,31 +1,117 @@
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, IntegrityError
+from utils.indexed_collection import IndexedCollection
+from config.settings import CATEGORY_ON_DELETE
+
+
+def category_key(name):
+    """
+    Clave normalizada de una categoría (sin distinguir mayúsculas).
+
+    La usan tanto el índice de categorías como el de productos por
+    categoría: si normalizaran distinto, 'Men' y 'men' podrían ser la
+    misma categoría para uno y distinta para el otro.
+    """
+    return name.lower() if isinstance(name, str) else name
+
+
+class CategoryStore(IndexedCollection):
+    """Categorías indexadas también por nombre (sin distinguir mayúsculas)."""
+
+    INDEX_FIELD = 'name'
+
+    def _field_key(self, value):
+        return category_key(value)
 
 
 class CategoryRepository(BaseRepository):
     """Repositorio específico para categorías."""
     
     COLLECTION_NAME = 'categories'
+    STORE_CLASS = CategoryStore
 
     def get_by_name(self, name):
-        """Obtiene una categoría por nombre."""
-        categories = self.get_all()
-        return next((c for c in categories if c['name'] == name), None)
+        """Obtiene una categoría por nombre (O(1) por el índice de nombres)."""
+        matches = self.store.lookup(name)
+        return matches[0] if matches else None
 
     def exists(self, name):
         """Verifica si una categoría existe."""
-        return self.get_by_name(name) is not None
+        return self.store.has(name)
 
     def create(self, name):
         """Crea una nueva categoría con ID automático."""
-        new_category = {
-            'id': self._generate_id(),
-            'name': name
-        }
-        self.add(new_category)
+        with self.db.transaction():
+            new_category = {
+                'id': self._generate_id(),
+                'name': name
+            }
+            self.add(new_category)
         return new_category
 
-    def remove(self, name):
-        """Elimina una categoría por nombre."""
-        categories = self.get_all()
-        updated = [c for c in categories if c['name'] != name]
-        self._save_all(updated)
+    def backfill(self):
+        """
+        Crea las categorías que usan los productos y no tienen fila (datos
+        anteriores a la integridad referencial), así `restrict` y la
+        validación de escrituras parten de datos consistentes.
+
+        Returns:
+            Lista de categorías creadas.
+        """
+        from .product_repository import ProductRepository
+
+        products = ProductRepository(self.db)
+        with self.db.transaction():
+            missing = {}
+            for product in products.get_all():
+                name = product.get('category')
+                if isinstance(name, str) and not self.exists(name):
+                    missing.setdefault(category_key(name), name)
+            return [self.create(name) for name in missing.values()]
+
+    def remove(self, name, on_delete=CATEGORY_ON_DELETE):
+        """
+        Elimina una categoría por nombre.
+
+        Args:
+            name: Nombre de la categoría.
+            on_delete: 'restrict' no la borra si algún producto la usa;
+                'cascade' borra también esos productos (y sus favoritos).
+
+        Returns:
+            Lista de productos borrados en cascada.
+
+        Raises:
+            IntegrityError: Con 'restrict', si la categoría tiene productos.
+        """
+        # Import local: product_repository importa este módulo
+        from .product_repository import ProductRepository
+
+        products = ProductRepository(self.db)
+        with self.db.transaction():
+            removed_products = []
+            if products.store.has(name):
+                if on_delete != 'cascade':
+                    raise IntegrityError(f"Category '{name}' has products")
+                removed_products = products.remove_by_category(name)
+            for category in self.store.lookup(name):
+                self.db.apply(
+                    self.COLLECTION_NAME, 'delete',
+                    lambda store, version: [store.delete(category['id'], version)]
+                )
+        return removed_products
+
+
+def main():
+    import argparse
+    import json
+    from utils.database_connection import DatabaseConnection
+
+    parser = argparse.ArgumentParser(description='Crea las categorías que usan los productos y no existen.')
+    parser.add_argument('paths', nargs='+', help='Archivos de base de datos')
+    args = parser.parse_args()
+    created = {path: CategoryRepository(DatabaseConnection(path)).backfill() for path in args.paths}
+    print(json.dumps(created, indent=2))
+
+
+if __name__ == '__main__':
+    main()
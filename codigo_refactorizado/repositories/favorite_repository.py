@@ -1,30 +1,83 @@
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, IntegrityError
+from utils.adjacency_store import AdjacencyStore
+from config.settings import REFERENTIAL_INTEGRITY
+
+
+class FavoriteStore(AdjacencyStore):
+    """Favoritos como adyacencia usuario -> productos (y producto -> usuarios)."""
+
+    LEFT_KEY = 'user_id'
+    RIGHT_KEY = 'product_id'
 
 
 class FavoriteRepository(BaseRepository):
     """Repositorio específico para favoritos."""
     
     COLLECTION_NAME = 'favorites'
+    STORE_CLASS = FavoriteStore
+    PRODUCTS_COLLECTION = 'products'  # Colección a la que apunta product_id
+
+    def __init__(self, db_connection, products_db=None):
+        """
+        Args:
+            products_db: Base donde viven los productos, si no es la misma
+                (p. ej. un shard de favoritos; ver sharded_favorite_repository).
+        """
+        super().__init__(db_connection)
+        self.products_db = products_db or db_connection
 
     def get_by_user(self, user_id):
-        """Obtiene todos los favoritos de un usuario."""
-        favorites = self.get_all()
-        return [f for f in favorites if f['user_id'] == user_id]
+        """Obtiene todos los favoritos de un usuario (desde el índice, O(k))."""
+        return self.store.by_left(user_id)
+
+    def get_by_product(self, product_id):
+        """Obtiene los favoritos que apuntan a un producto (índice inverso)."""
+        return self.store.by_right(product_id)
+
+    def exists(self, user_id, product_id):
+        """Verifica en O(1) si el producto ya es favorito del usuario."""
+        return self.store.contains(user_id, product_id)
+
+    def add_if_absent(self, user_id, product_id):
+        """
+        Agrega un favorito si no existe (idempotente).
+
+        Returns:
+            Tupla (favorito, creado).
+
+        Raises:
+            IntegrityError: Si el producto no existe.
+        """
+        with self.db.transaction():
+            self._check_product(product_id)
+            added = self.db.apply(
+                self.COLLECTION_NAME, 'insert',
+                lambda store, version: store.add(user_id, product_id, version)
+            )
+        if added:
+            return added[0], True
+        return self.store.get(user_id, product_id), False
 
     def create(self, user_id, product_id):
-        """Agrega un producto a favoritos."""
-        new_favorite = {
-            'user_id': user_id,
-            'product_id': product_id
-        }
-        self.add(new_favorite)
-        return new_favorite
+        """Agrega un producto a favoritos (sin duplicar el par)."""
+        return self.add_if_absent(user_id, product_id)[0]
 
     def remove(self, user_id, product_id):
-        """Elimina un favorito específico."""
-        favorites = self.get_all()
-        updated = [
-            f for f in favorites
-            if not (f['user_id'] == user_id and f['product_id'] == product_id)
-        ]
-        self._save_all(updated)
+        """Elimina un favorito específico en O(1)."""
+        return self.db.apply(
+            self.COLLECTION_NAME, 'delete',
+            lambda store, version: store.discard(user_id, product_id, version)
+        )
+
+    def remove_by_product(self, product_id):
+        """Elimina los favoritos de un producto usando el índice inverso."""
+        return self.db.apply(
+            self.COLLECTION_NAME, 'delete',
+            lambda store, version: store.discard_right(product_id, version)
+        )
+
+    def _check_product(self, product_id):
+        """Valida en O(1) (índice de IDs) que el producto exista."""
+        products = self.products_db.get_collection(self.PRODUCTS_COLLECTION)
+        if REFERENTIAL_INTEGRITY and products.get_by_id(product_id) is None:
+            raise IntegrityError(f'Product {product_id} does not exist')
@@ -1,23 +1,91 @@
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, IntegrityError
+from .category_repository import CategoryRepository, category_key
+from .sharded_favorite_repository import favorite_repository
+from utils.indexed_collection import IndexedCollection
+from config.settings import REFERENTIAL_INTEGRITY
+
+
+class ProductStore(IndexedCollection):
+    """Productos indexados también por categoría (sin distinguir mayúsculas)."""
+
+    INDEX_FIELD = 'category'
+
+    def _field_key(self, value):
+        return category_key(value)
 
 
 class ProductRepository(BaseRepository):
     """Repositorio específico para productos."""
     
     COLLECTION_NAME = 'products'
+    STORE_CLASS = ProductStore
+
+    def __init__(self, db_connection):
+        super().__init__(db_connection)
+        self.categories = CategoryRepository(db_connection)
 
     def get_by_category(self, category):
-        """Obtiene productos filtrados por categoría."""
-        products = self.get_all()
-        return [p for p in products if p['category'].lower() == category.lower()]
+        """Obtiene productos filtrados por categoría (desde el índice, O(k))."""
+        return self.store.lookup(category)
 
     def create(self, name, category, price):
         """Crea un nuevo producto con ID automático."""
-        new_product = {
-            'id': self._generate_id(),
-            'name': name,
-            'category': category,
-            'price': price
-        }
-        self.add(new_product)
+        with self.db.transaction():
+            self._check_category(category)
+            new_product = {
+                'id': self._generate_id(),
+                'name': name,
+                'category': category,
+                'price': price
+            }
+            self.add(new_product)
         return new_product
+
+    def update(self, product_id, changes):
+        """
+        Actualiza campos de un producto en su lugar (O(1) por el índice).
+
+        Returns:
+            Tupla (producto anterior, producto actualizado) o None si no existe.
+        """
+        with self.db.transaction():
+            previous = self.get_by_id(product_id)
+            if previous is None:
+                return None
+            # Solo se valida si cambia: los productos existentes siguen
+            # actualizables aunque su categoría no tenga fila
+            category = changes.get('category', previous.get('category'))
+            if category_key(category) != category_key(previous.get('category')):
+                self._check_category(category)
+            updated = self.db.apply(
+                self.COLLECTION_NAME, 'update',
+                lambda store, version: [store.update(product_id, changes, version)]
+            )
+        return previous, updated[0]
+
+    def remove(self, product_id):
+        """
+        Elimina un producto por ID en O(1) y, en la misma transacción, los
+        favoritos que lo referencian (por el índice producto -> usuarios).
+
+        Returns:
+            El producto eliminado o None si no existe.
+        """
+        with self.db.transaction():
+            removed = self.db.apply(
+                self.COLLECTION_NAME, 'delete',
+                lambda store, version: [p for p in (store.delete(product_id, version),) if p]
+            )
+            if removed:
+                favorite_repository(self.db).remove_by_product(product_id)
+        return removed[0] if removed else None
+
+    def remove_by_category(self, category):
+        """Elimina (en cascada) los productos de una categoría; los retorna."""
+        with self.db.transaction():
+            return [self.remove(p['id']) for p in self.get_by_category(category)]
+
+    def _check_category(self, category):
+        """Valida en O(1) que la categoría exista; requiere transacción."""
+        if REFERENTIAL_INTEGRITY and not self.categories.exists(category):
+            raise IntegrityError(f"Category '{category}' does not exist")
@@ -0,0 +1,210 @@
+"""
+Favoritos particionados en varios archivos de base de datos.
+
+Con `FAVORITES_SHARDS` configurado, cada favorito vive en el shard que el
+anillo de hashing consistente asigna a su `user_id` (ver
+utils/hash_ring.py). Cada shard es una DatabaseConnection propia, con su
+lock de escritura y su group commit, así las escrituras de usuarios
+distintos no compiten por un único archivo.
+
+- Operaciones de un usuario (agregar, borrar, listar sus favoritos): van
+  a un solo shard.
+- Consultas sin usuario (listado completo, favoritos de un producto,
+  borrado en cascada de un producto): se reparten entre todos los shards
+  en paralelo y se juntan los resultados (scatter-gather).
+
+Los productos siguen en la base principal. La integridad se valida antes
+de escribir y otra vez después: si el producto se borró entre medio, el
+favorito recién agregado se quita, así no quedan referencias colgadas.
+
+Los cambios de los shards no aparecen en GET /changes (solo registra la
+base principal). Para cambiar la cantidad de shards, ver rebalance().
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
+from itertools import chain
+import os
+import threading
+
+from .base_repository import IntegrityError
+from .favorite_repository import FavoriteRepository
+from utils.database_connection import DatabaseConnection
+from utils.hash_ring import HashRing
+from utils.snapshot import CollectionSnapshot
+from config.settings import FAVORITES_SHARDS, FAVORITES_SHARD_REPLICAS, REFERENTIAL_INTEGRITY
+
+# Hilos para repartir consultas y borrados entre shards
+_scatter_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='shard-scatter')
+_snapshots = {}  # rutas de los shards -> ((store, versión) por shard, snapshot combinado)
+_snapshots_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _ring(paths, replicas):
+    return HashRing(paths, replicas)
+
+
+class ShardedFavoriteRepository:
+    """
+    Misma interfaz que FavoriteRepository, repartida en varios shards.
+
+    `db` es la base principal (productos); la usan las validaciones de
+    integridad y las ETags de los listados.
+    """
+
+    COLLECTION_NAME = FavoriteRepository.COLLECTION_NAME
+
+    def __init__(self, db_connection, shard_paths, replicas=FAVORITES_SHARD_REPLICAS):
+        self.db = db_connection
+        self.ring = _ring(tuple(shard_paths), replicas)
+        self.shards = {
+            path: FavoriteRepository(DatabaseConnection(path), products_db=db_connection)
+            for path in self.ring.nodes
+        }
+
+    def shard_for(self, user_id):
+        """Repositorio del shard dueño de los favoritos de `user_id`."""
+        return self.shards[self.ring.node_for(user_id)]
+
+    def _scatter(self, operation):
+        """Ejecuta `operation(shard)` en todos los shards en paralelo."""
+        return list(_scatter_executor.map(operation, self.shards.values()))
+
+    # ============ Lectura ============
+
+    @property
+    def epoch(self):
+        """Época de la base principal (ver utils/conditional.py)."""
+        return self.db.changes.epoch
+
+    def get_all(self):
+        """
+        Listado completo como un snapshot combinado.
+
+        Se materializa una vez por combinación de versiones de los shards.
+        Su versión es un hash del vector ordenado (shard, época, versión):
+        estados distintos de los shards nunca comparten ETag, aunque sus
+        versiones sumen lo mismo (p. ej. tras un rebalanceo o al reabrir
+        un shard).
+        """
+        key = tuple(self.shards)
+        stores = [shard.store for shard in self.shards.values()]
+        cached = _snapshots.get(key)
+        if cached is not None and cached[0] == tuple((store, store.version) for store in stores):
+            return cached[1]
+        parts = self._scatter(lambda shard: shard.get_all())
+        items = list(chain.from_iterable(parts))
+        vector = [(path, shard.db.changes.epoch, part.version)
+                  for (path, shard), part in zip(self.shards.items(), parts)]
+        version = hashlib.blake2b(repr(vector).encode(), digest_size=8).hexdigest()
+        snapshot = CollectionSnapshot(items, len(items), version)
+        with _snapshots_lock:
+            _snapshots[key] = (tuple((store, part.version) for store, part in zip(stores, parts)), snapshot)
+        return snapshot
+
+    def get_by_user(self, user_id):
+        return self.shard_for(user_id).get_by_user(user_id)
+
+    def get_by_product(self, product_id):
+        return list(chain.from_iterable(self._scatter(lambda shard: shard.get_by_product(product_id))))
+
+    def exists(self, user_id, product_id):
+        return self.shard_for(user_id).exists(user_id, product_id)
+
+    # ============ Escritura ============
+
+    def add_if_absent(self, user_id, product_id):
+        """
+        Agrega un favorito en el shard del usuario (idempotente).
+
+        Returns:
+            Tupla (favorito, creado).
+
+        Raises:
+            IntegrityError: Si el producto no existe.
+        """
+        shard = self.shard_for(user_id)
+        favorite, created = shard.add_if_absent(user_id, product_id)
+        if created and self._product_missing(product_id):
+            # El producto se borró mientras se agregaba: deshacer
+            shard.remove(user_id, product_id)
+            raise IntegrityError(f'Product {product_id} does not exist')
+        return favorite, created
+
+    def create(self, user_id, product_id):
+        return self.add_if_absent(user_id, product_id)[0]
+
+    def remove(self, user_id, product_id):
+        return self.shard_for(user_id).remove(user_id, product_id)
+
+    def remove_by_product(self, product_id):
+        """Elimina los favoritos de un producto en todos los shards."""
+        return list(chain.from_iterable(self._scatter(lambda shard: shard.remove_by_product(product_id))))
+
+    def _product_missing(self, product_id):
+        products = self.db.get_collection(FavoriteRepository.PRODUCTS_COLLECTION)
+        return REFERENTIAL_INTEGRITY and products.get_by_id(product_id) is None
+
+
+def favorite_repository(db_connection):
+    """FavoriteRepository, o su versión particionada si FAVORITES_SHARDS está configurado."""
+    if FAVORITES_SHARDS:
+        return ShardedFavoriteRepository(db_connection, FAVORITES_SHARDS)
+    return FavoriteRepository(db_connection)
+
+
+def rebalance(source_paths, target_paths, replicas=FAVORITES_SHARD_REPLICAS):
+    """
+    Reparte los favoritos de `source_paths` entre `target_paths` según el
+    anillo nuevo. Con hashing consistente solo se mueven los usuarios
+    cuyos tramos cambian de dueño.
+
+    Se hace en dos pasadas: primero cada destino recibe los favoritos
+    nuevos (conservando los que se van) y recién después cada archivo
+    queda solo con los suyos. Si se interrumpe, puede haber favoritos
+    duplicados en dos shards, pero nunca perdidos: basta con volver a
+    ejecutarlo. Los workers deben reiniciarse con la configuración nueva.
+
+    Para pasar de una base sin shards, usar la base principal como origen.
+
+    Returns:
+        Diccionario con la cantidad de favoritos movidos y por shard.
+    """
+    ring = HashRing(target_paths, replicas)
+    paths = [path for path in dict.fromkeys([*source_paths, *ring.nodes])
+             if path in ring.nodes or os.path.exists(path)]
+    current = {path: DatabaseConnection(path).get_collection(FavoriteRepository.COLLECTION_NAME).to_list()
+               for path in paths}
+    buckets = {path: [] for path in paths}
+    moved = 0
+    for path, items in current.items():
+        for item in items:
+            owner = ring.node_for(item['user_id'])
+            moved += owner != path
+            buckets[owner].append(item)
+
+    for path in ring.nodes:
+        present = {(item['user_id'], item['product_id']) for item in current[path]}
+        incoming = [item for item in buckets[path] if (item['user_id'], item['product_id']) not in present]
+        DatabaseConnection(path).save_collection(FavoriteRepository.COLLECTION_NAME, current[path] + incoming)
+    for path in paths:
+        DatabaseConnection(path).save_collection(FavoriteRepository.COLLECTION_NAME, buckets[path])
+    return {'moved': moved, 'shards': {path: len(buckets[path]) for path in ring.nodes}}
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Redistribuye los favoritos entre shards.')
+    parser.add_argument('--from', dest='sources', nargs='+', required=True, help='Shards (o base) actuales')
+    parser.add_argument('--to', dest='targets', nargs='+', required=True, help='Shards nuevos')
+    parser.add_argument('--replicas', type=int, default=FAVORITES_SHARD_REPLICAS)
+    args = parser.parse_args()
+    print(json.dumps(rebalance(args.sources, args.targets, args.replicas), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import os
+import shutil
+import pytest
+from utils.database_connection import DatabaseConnection
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Directorio de trabajo con una copia de db.json, conexiones, ranking y claves nuevos."""
+    from notifications.subscribers.popularity_subscriber import reset_popularity_board
+    from utils.idempotency import reset_idempotency_cache
+    shutil.copy(os.path.join(PROJECT_DIR, 'db.json'), tmp_path / 'db.json')
+    monkeypatch.chdir(tmp_path)
+    DatabaseConnection._instances.clear()
+    reset_popularity_board()
+    reset_idempotency_cache()
+    yield tmp_path
+    reset_popularity_board()
+    reset_idempotency_cache()
+    DatabaseConnection._instances.clear()
+
+
+@pytest.fixture
+def app(workdir):
+    from app import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Suscriptores de la app sobre un EventManager nuevo (otros tests lo reinician)."""
+    import app as app_module
+    from notifications.event_manager import EventManager
+    monkeypatch.setattr(EventManager, '_instance', None)
+    monkeypatch.setattr(app_module, '_subscribers_registered', False)
+    app_module.register_subscribers()
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import pytest
+from notifications.async_event_manager import AsyncEventManager
+from notifications.subscribers.base_subscriber import AsyncBaseSubscriber, BaseSubscriber
+from notifications.events.base_event import BaseEvent
+
+
+class SimpleEvent(BaseEvent):
+    def __init__(self, message):
+        super().__init__({'message': message})
+
+
+class AsyncMockSubscriber(AsyncBaseSubscriber):
+    def __init__(self):
+        self.handled_events = []
+
+    async def handle(self, event):
+        await asyncio.sleep(0)
+        self.handled_events.append(event)
+
+
+class SyncMockSubscriber(BaseSubscriber):
+    def __init__(self):
+        self.handled_events = []
+
+    def handle(self, event):
+        self.handled_events.append(event)
+
+
+@pytest.fixture
+def event_manager():
+    AsyncEventManager._instance = None
+    return AsyncEventManager()
+
+
+def call_asgi(app, method, path, body=None, query=b'', token='abcd1234'):
+    """Ejecuta una petición contra la app ASGI y retorna (status, json)."""
+    headers = [(b'authorization', token.encode())] if token else []
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'headers': headers}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': json.dumps(body).encode() if body else b''}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages[0]['status'], json.loads(messages[1]['body'])
+
+
+def test_async_emit_mixes_coroutine_and_sync_subscribers(event_manager):
+    async_sub = AsyncMockSubscriber()
+    sync_sub = SyncMockSubscriber()
+    event_manager.subscribe('SimpleEvent', async_sub)
+    event_manager.subscribe('SimpleEvent', sync_sub)
+
+    event = SimpleEvent('hello')
+    asyncio.run(event_manager.emit(event))
+
+    assert async_sub.handled_events == [event]
+    assert sync_sub.handled_events == [event]
+
+
+def test_async_emit_without_subscribers(event_manager):
+    asyncio.run(event_manager.emit(SimpleEvent('nobody')))
+
+
+def test_asgi_requires_token(workdir):
+    from asgi import app
+    status, body = call_asgi(app, 'GET', '/products', token=None)
+    assert status == 401
+    assert 'token not found' in body['message']
+
+
+def test_asgi_products_and_favorites(workdir):
+    from asgi import app
+    status, products = call_asgi(app, 'GET', '/products')
+    assert status == 200
+    assert len(products) == 24
+
+    status, product = call_asgi(app, 'GET', '/products/2')
+    assert status == 200 and product['name'] == 'Dress'
+
+    status, filtered = call_asgi(app, 'GET', '/products', query=b'category=women')
+    assert all(p['category'] == 'women' for p in filtered)
+
+    status, body = call_asgi(app, 'POST', '/favorites', {'user_id': 1, 'product_id': 2})
+    assert status == 201
+    with open(workdir / 'db.json') as f:
+        assert json.load(f)['favorites'] == [{'user_id': 1, 'product_id': 2}]
+
+
+def test_asgi_validates_required_fields(workdir):
+    from asgi import app
+    status, body = call_asgi(app, 'POST', '/products', {'name': 'Hat'})
+    assert status == 400
+    assert set(body['message']) == {'category', 'price'}
+
+
+def test_asgi_updates_and_deletes_products(workdir):
+    from asgi import app
+
+    status, body = call_asgi(app, 'PATCH', '/products/1', {'price': 42.0})
+    assert status == 200 and body['product']['price'] == 42.0
+    status, body = call_asgi(app, 'PUT', '/products/1', {'name': 'X'})
+    assert status == 400 and 'category' in body['message']
+    status, body = call_asgi(app, 'DELETE', '/products/1')
+    assert status == 200 and body['product']['id'] == 1
+    assert call_asgi(app, 'GET', '/products/1')[0] == 404
+
+
+def test_asgi_audit_streams_in_chunks(workdir, monkeypatch):
+    from asgi import app, StreamingBody
+    from utils.audit_log import audit_log
+    monkeypatch.setattr(StreamingBody, 'CHUNK_LINES', 2)
+    log = audit_log('audit.log')
+    for n in range(5):
+        log.append({'logged_at': f'2026-01-01T00:00:0{n}', 'event_type': 'ProductCreatedEvent', 'data': {'n': n}})
+
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/audit', 'query_string': b'since=2026-01-01T00:00:01',
+             'headers': [(b'authorization', b'abcd1234')]}
+    asyncio.run(app(scope, receive, send))
+
+    assert messages[0]['status'] == 200 and len(messages) == 4  # start, 2 partes y el cierre
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    assert [json.loads(line)['data']['n'] for line in body.splitlines()] == [1, 2, 3, 4]
+
+
+def test_asgi_rejects_bodies_that_are_not_objects(workdir):
+    from asgi import app
+    assert call_asgi(app, 'POST', '/products', ['Hat', 'men', 1.0]) == (400, {'message': 'Request body must be a JSON object'})
+    assert call_asgi(app, 'POST', '/auth', [1], token=None)[0] == 400
+    assert call_asgi(app, 'PATCH', '/products/1', 42)[0] == 400
+
+
+def test_asgi_popular_products_run_off_the_event_loop(workdir, monkeypatch):
+    import threading
+    import asgi
+
+    threads = []
+
+    def popular_products(products, category, limit):
+        threads.append(threading.current_thread())
+        return []
+    monkeypatch.setattr(asgi, 'popular_products', popular_products)
+
+    assert call_asgi(asgi.app, 'GET', '/products/popular') == (200, [])
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_asgi_price_history_reads_off_the_event_loop(workdir, monkeypatch):
+    import threading
+    import asgi
+
+    threads = []
+
+    class Store:
+        def history(self, *args):
+            threads.append(threading.current_thread())
+            return []
+    monkeypatch.setattr(asgi, 'price_history_store', lambda path: Store())
+
+    status, body = call_asgi(asgi.app, 'GET', '/products/2/price-history')
+    assert status == 200 and body['points'] == []
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,105 @@
+import gzip
+import json
+import os
+import pytest
+import utils.audit_log as audit_module
+from utils.audit_log import AuditLog
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+def entry(n, event_type='ProductCreatedEvent', day=1):
+    return {'logged_at': f'2026-01-{day:02d}T00:00:{n % 60:02d}.{n:06d}', 'event_type': event_type, 'data': {'n': n}}
+
+
+@pytest.fixture
+def log(tmp_path):
+    return AuditLog(str(tmp_path / 'audit.log'), max_bytes=2000, block_size=500)
+
+
+def numbers(lines):
+    return [json.loads(line)['data']['n'] for line in lines]
+
+
+def test_rotation_keeps_every_entry_queryable_in_order(log, tmp_path):
+    for n in range(60):
+        log.append(entry(n, 'FavoriteAddedEvent' if n % 3 else 'ProductDeletedEvent'))
+
+    assert len(log.segments()) >= 2
+    with gzip.open(log.segments()[0]) as f:  # Los bloques forman un .gz válido
+        assert json.loads(f.readline())['data']['n'] == 0
+    index = json.loads((tmp_path / 'audit.log.000001.idx').read_text())
+    assert len(index['blocks']) > 1 and index['event_types'] == ['FavoriteAddedEvent', 'ProductDeletedEvent']
+
+    assert numbers(log.query()) == list(range(60))
+    assert numbers(log.query('ProductDeletedEvent')) == list(range(0, 60, 3))
+    since, until = entry(10)['logged_at'], entry(20)['logged_at']
+    assert numbers(log.query(since=since, until=until)) == list(range(10, 20))
+
+
+def test_index_skips_segments_and_blocks_that_cannot_match(log, monkeypatch):
+    for day in (1, 2, 3):
+        for n in range(20):
+            log.append(entry(n + 100 * day, 'ProductCreatedEvent' if day != 2 else 'ProductDeletedEvent', day))
+        log.rotate()
+
+    decompressed = []
+    real = gzip.decompress
+    monkeypatch.setattr(audit_module.gzip, 'decompress', lambda data: decompressed.append(1) or real(data))
+
+    assert numbers(log.query('ProductDeletedEvent')) == list(range(200, 220))
+    blocks_day_two = len(log._index(log.segments()[1][:-3] + '.idx')['blocks'])
+    assert len(decompressed) == blocks_day_two
+
+    decompressed.clear()
+    assert numbers(log.query(since='2026-01-03')) == list(range(300, 320))
+    assert len(decompressed) == len(log._index(log.segments()[2][:-3] + '.idx')['blocks'])
+
+
+def test_rotation_by_age(tmp_path):
+    log = AuditLog(str(tmp_path / 'audit.log'), max_bytes=None, max_age=3600)
+    log.append(entry(1, day=1))
+    log.append(entry(2, day=1))
+    assert log.segments() == []
+    log.append(entry(3, day=2))
+    assert len(log.segments()) == 1 and not os.path.exists(log.path)
+
+
+def test_interrupted_rotation_is_still_queried_and_then_completed(log):
+    for n in range(5):
+        log.append(entry(n))
+    os.replace(log.path, log.rotating_path)  # El proceso murió antes de comprimir
+    log.append(entry(5))
+
+    assert numbers(log.query()) == list(range(6))
+    log.rotate()  # Termina la rotación pendiente; el archivo activo queda para la próxima
+    assert not os.path.exists(log.rotating_path) and len(log.segments()) == 1
+    assert numbers(log.query()) == list(range(6))
+    log.rotate()
+    assert numbers(log.query()) == list(range(6)) and len(log.segments()) == 2
+
+
+def test_audit_endpoint_streams_matching_entries(client):
+    for name in ('Shoes', 'Hat'):
+        client.post('/products', json={'name': name, 'category': 'men', 'price': 10}, headers=TOKEN)
+    client.delete('/products/1', headers=TOKEN)
+
+    response = client.get('/audit?event_type=ProductCreatedEvent&limit=5', headers=TOKEN)
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    entries = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [e['data']['product_name'] for e in entries] == ['Shoes', 'Hat']
+
+    assert client.get('/audit?since=yesterday', headers=TOKEN).status_code == 400
+    assert client.get('/audit?until=2000-01-01', headers=TOKEN).get_data() == b''
+
+
+def test_shared_log_uses_the_settings_whoever_opens_it_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_module, '_instances', {})
+    monkeypatch.setattr(audit_module, 'AUDIT_MAX_BYTES', 1234)
+    path = str(tmp_path / 'audit.log')
+
+    first = audit_module.audit_log(path)  # p. ej. GET /audit antes del primer evento
+    assert first.max_bytes == 1234
+    assert audit_module.audit_log(path, max_bytes=1234) is first
+    with pytest.raises(ValueError):
+        audit_module.audit_log(path, max_bytes=99)
@@ -0,0 +1,21 @@
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+def test_products_multi_get_keeps_requested_order(client):
+    response = client.get('/products?ids=3,1,999', headers=TOKEN)
+    assert [p['id'] for p in response.get_json()] == [3, 1]
+
+
+def test_products_multi_get_rejects_invalid_ids(client):
+    assert client.get('/products?ids=1,x', headers=TOKEN).status_code == 400
+
+
+def test_favorites_expand_joins_products(client):
+    for product_id in (2, 4):
+        client.post('/favorites', json={'user_id': 5, 'product_id': product_id}, headers=TOKEN)
+    client.post('/favorites', json={'user_id': 6, 'product_id': 1}, headers=TOKEN)
+
+    response = client.get('/favorites?user_id=5&expand=product', headers=TOKEN)
+    expanded = response.get_json()
+    assert [f['product']['name'] for f in expanded] == ['Dress', 'Blouse']
+    assert all(f['user_id'] == 5 for f in expanded)
@@ -0,0 +1,95 @@
+import threading
+import time
+from utils.database_connection import DatabaseConnection
+from repositories.category_repository import CategoryRepository
+from repositories.favorite_repository import FavoriteRepository
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+def test_mutations_bump_collection_version_and_record_changes(workdir):
+    db = DatabaseConnection('db.json')
+    favorites = FavoriteRepository(db)
+    categories = CategoryRepository(db)
+
+    favorites.create(1, 2)
+    favorites.create(1, 3)
+    categories.remove('girls')
+    favorites.remove(1, 2)
+
+    assert db.get_collection('favorites').version == 4
+    assert db.get_collection('categories').version == 3
+    changes, truncated = db.changes.since(1)
+    assert not truncated
+    assert [(c['version'], c['collection'], c['op']) for c in changes] == [
+        (2, 'favorites', 'insert'),
+        (3, 'categories', 'delete'),
+        (4, 'favorites', 'delete'),
+    ]
+    assert changes[1]['item']['name'] == 'girls'
+
+
+def test_remove_without_matches_is_not_a_change(workdir):
+    db = DatabaseConnection('db.json')
+    FavoriteRepository(db).remove(99, 99)
+    assert db.changes.version == 0
+
+
+def test_conditional_get_returns_304_until_collection_changes(client):
+    first = client.get('/products', headers=TOKEN)
+    etag = first.headers['ETag']
+
+    cached = client.get('/products', headers={**TOKEN, 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    client.post('/products', json={'name': 'Hat', 'category': 'men', 'price': 9.5}, headers=TOKEN)
+    fresh = client.get('/products', headers={**TOKEN, 'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+    assert len(fresh.get_json()) == len(first.get_json()) + 1
+
+
+def test_changes_endpoint_returns_only_deltas(client):
+    client.post('/favorites', json={'user_id': 1, 'product_id': 2}, headers=TOKEN)
+    version = client.get('/changes', headers=TOKEN).get_json()['version']
+    client.post('/favorites', json={'user_id': 1, 'product_id': 5}, headers=TOKEN)
+    client.post('/categories', json={'name': 'shoes'}, headers=TOKEN)
+
+    body = client.get(f'/changes?since={version}&collection=favorites', headers=TOKEN).get_json()
+    assert body['truncated'] is False
+    assert [c['item'] for c in body['changes']] == [{'user_id': 1, 'product_id': 5}]
+    assert body['version'] == version + 2
+
+
+def test_changes_long_poll_wakes_up_on_write(client, workdir):
+    db = DatabaseConnection('db.json')
+
+    def write_later():
+        time.sleep(0.1)
+        FavoriteRepository(db).create(7, 1)
+
+    thread = threading.Thread(target=write_later)
+    thread.start()
+    start = time.monotonic()
+    body = client.get('/changes?since=0&wait=5', headers=TOKEN).get_json()
+    thread.join()
+
+    assert time.monotonic() - start < 5
+    assert body['changes'][0]['item'] == {'user_id': 7, 'product_id': 1}
+
+
+def test_changes_from_unknown_version_is_truncated(client):
+    body = client.get('/changes?since=1000', headers=TOKEN).get_json()
+    assert body['truncated'] is True
+    assert body['changes'] == []
+
+
+def test_versions_from_another_epoch_are_truncated(client):
+    body = client.get('/changes', headers=TOKEN).get_json()
+    current = client.get(f"/changes?since={body['version']}&epoch={body['epoch']}", headers=TOKEN).get_json()
+    assert current['truncated'] is False
+
+    stale = client.get(f"/changes?since={body['version']}&epoch=other-run", headers=TOKEN).get_json()
+    assert stale['truncated'] is True and stale['epoch'] == body['epoch']
+    assert body['epoch'] in client.get('/products', headers=TOKEN).headers['ETag']
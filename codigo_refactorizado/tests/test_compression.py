@@ -0,0 +1,54 @@
+import gzip
+import json
+import zlib
+import pytest
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+@pytest.fixture(autouse=True)
+def compressor(app, monkeypatch):
+    compressor = app.extensions['compression']
+    monkeypatch.setattr(compressor, 'min_size', 200)
+    compressor._bodies.clear()
+    return compressor
+
+
+def test_full_listing_is_compressed_once_per_version(app):
+    client = app.test_client()
+    plain = client.get('/products', headers=TOKEN)
+    first = client.get('/products', headers={**TOKEN, 'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in first.headers['Vary']
+    assert json.loads(gzip.decompress(first.data)) == plain.get_json()
+    assert first.headers['ETag'] == plain.headers['ETag'] and first.headers['ETag'].startswith('W/')
+
+    bodies = app.extensions['compression']._bodies['products'][1]
+    cached = bodies['gzip']
+    second = client.get('/products', headers={**TOKEN, 'Accept-Encoding': 'gzip'})
+    assert second.data == first.data and bodies['gzip'] is cached
+
+    client.post('/products', json={'name': 'Hat', 'category': 'men', 'price': 1}, headers=TOKEN)
+    fresh = client.get('/products', headers={**TOKEN, 'Accept-Encoding': 'gzip'})
+    assert len(json.loads(gzip.decompress(fresh.data))) == len(plain.get_json()) + 1
+    assert app.extensions['compression']._bodies['products'][1] is not bodies
+
+
+def test_other_responses_are_compressed_on_the_fly(app):
+    client = app.test_client()
+    response = client.get('/products?category=men', headers={**TOKEN, 'Accept-Encoding': 'deflate'})
+    assert response.headers['Content-Encoding'] == 'deflate'
+    assert json.loads(zlib.decompress(response.data))[0]['category'] == 'men'
+
+    small = client.get('/products/1', headers={**TOKEN, 'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_not_modified_has_no_body_to_compress(app):
+    client = app.test_client()
+    etag = client.get('/categories', headers=TOKEN).headers['ETag']
+    response = client.get('/categories', headers={**TOKEN, 'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304 and response.data == b''
+    assert response.headers['ETag'] == etag and 'Accept-Encoding' in response.headers['Vary']
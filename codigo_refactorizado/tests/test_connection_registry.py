@@ -0,0 +1,78 @@
+import json
+import pytest
+from utils.connection_registry import ConnectionRegistry
+from utils.database_connection import ConnectionClosedError, DatabaseConnection
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in 'abcd':
+        (tmp_path / f'{name}.json').write_text(json.dumps({'items': [{'id': 1, 'tenant': name}]}))
+    registry = ConnectionRegistry(max_open=2)
+    monkeypatch.setattr(DatabaseConnection, '_instances', registry)
+    return registry
+
+
+def test_least_recently_used_connection_is_evicted_and_reloaded(registry):
+    a = DatabaseConnection('a.json')
+    DatabaseConnection('b.json')
+    assert DatabaseConnection('a.json') is a  # a pasa a ser la más usada
+    DatabaseConnection('c.json')
+
+    assert 'b.json' not in registry and 'a.json' in registry and len(registry) == 2
+    reloaded = DatabaseConnection('b.json')
+    assert reloaded.get_collection('items')[0]['tenant'] == 'b'
+    assert registry.evictions == 2
+
+
+def test_connections_in_use_are_not_evicted(registry):
+    with DatabaseConnection.session('a.json') as a:
+        DatabaseConnection('b.json')
+        DatabaseConnection('c.json')
+        DatabaseConnection('d.json')
+        assert 'a.json' in registry and registry.stats()['a.json']['refs'] == 1
+        assert a.get_collection('items')[0]['tenant'] == 'a'
+    assert registry.stats()['a.json']['refs'] == 0
+
+
+def test_unsaved_changes_are_flushed_before_eviction(registry, monkeypatch):
+    a = DatabaseConnection('a.json')
+    monkeypatch.setattr(a, '_commit', lambda: None)  # La escritura queda solo en memoria
+    a.append('items', {'id': 2, 'tenant': 'a'})
+    DatabaseConnection('b.json')
+    DatabaseConnection('c.json')
+
+    with open('a.json') as f:
+        assert [item['id'] for item in json.load(f)['items']] == [1, 2]
+    with pytest.raises(ConnectionClosedError):
+        a.append('items', {'id': 3})
+
+
+def test_memory_limit_bounds_the_loaded_files(registry):
+    registry.max_open = None
+    DatabaseConnection('a.json')
+    registry.max_bytes = DatabaseConnection('a.json').memory_bytes * 2
+    for name in 'bcd':
+        DatabaseConnection(f'{name}.json')
+
+    assert len(registry) == 2 and registry.total_bytes() <= registry.max_bytes
+    assert list(registry.stats()) == ['c.json', 'd.json']
+
+
+def test_failed_eviction_keeps_watching_the_file(registry, monkeypatch):
+    a = DatabaseConnection('a.json')
+    watcher = a.watch(interval=0.05)
+    a._pending = True
+
+    def fail():
+        raise OSError('disk full')
+    monkeypatch.setattr(a, '_save', fail)
+    DatabaseConnection('b.json')
+    DatabaseConnection('c.json')
+
+    assert 'a.json' in registry and registry.evictions == 0
+    try:
+        assert a._watcher is not watcher and a._watcher.alive
+    finally:
+        a._watcher.stop()
@@ -0,0 +1,81 @@
+import json
+import pytest
+from utils.database_connection import DatabaseConnection
+from repositories.favorite_repository import FavoriteRepository, FavoriteStore
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text(json.dumps({'products': [{'id': 10, 'name': 'Hat', 'category': 'men', 'price': 1.0}], 'favorites': [
+        {'user_id': 1, 'product_id': 10},
+        {'user_id': 1, 'product_id': 10},
+        {'user_id': 2, 'product_id': 10},
+    ]}))
+    DatabaseConnection._instances.clear()
+    yield DatabaseConnection(str(path))
+    DatabaseConnection._instances.clear()
+
+
+def test_store_indexes_both_directions_without_duplicates():
+    store = FavoriteStore([{'user_id': 1, 'product_id': 10}, {'user_id': 1, 'product_id': 10}])
+    assert store.add(1, 11) == [{'user_id': 1, 'product_id': 11}]
+    assert store.add(1, 11) == []
+
+    assert len(store) == 2
+    assert store.contains(1, 11)
+    assert [f['product_id'] for f in store.by_left(1)] == [10, 11]
+    assert store.by_right(11) == [{'user_id': 1, 'product_id': 11}]
+
+    assert store.discard(1, 10) == [{'user_id': 1, 'product_id': 10}]
+    assert store.discard(1, 10) == []
+    assert store.by_right(10) == []
+
+
+def test_snapshot_is_materialized_once_per_version():
+    store = FavoriteStore([{'user_id': 1, 'product_id': 10}])
+    first = store.snapshot()
+    assert store.snapshot() is first
+    store.add(2, 10)
+    assert store.snapshot() is not first
+    assert first == [{'user_id': 1, 'product_id': 10}]
+
+
+def test_repository_dedupes_loaded_data_and_adds_idempotently(db):
+    repository = FavoriteRepository(db)
+    assert len(repository.get_all()) == 2
+
+    favorite, created = repository.add_if_absent(1, 10)
+    assert not created and favorite == {'user_id': 1, 'product_id': 10}
+    version = db.changes.version
+
+    repository.create(3, 10)
+    repository.create(3, 10)
+    assert db.changes.version == version + 1
+    assert [f['user_id'] for f in repository.get_by_product(10)] == [1, 2, 3]
+
+
+def test_repository_remove_persists_and_records_change(db):
+    repository = FavoriteRepository(db)
+    assert repository.remove(2, 10) == [{'user_id': 2, 'product_id': 10}]
+    assert repository.remove(2, 10) == []
+    assert not repository.exists(2, 10)
+
+    changes, _ = db.changes.since(0)
+    assert [c['op'] for c in changes] == ['delete']
+    with open(db.json_file_path) as f:
+        assert json.load(f)['favorites'] == [{'user_id': 1, 'product_id': 10}]
+
+
+def test_favorites_endpoint_filters_by_user_and_ignores_duplicates(client):
+    first = client.post('/favorites', json={'user_id': 1, 'product_id': 2}, headers=TOKEN)
+    again = client.post('/favorites', json={'user_id': 1, 'product_id': 2}, headers=TOKEN)
+    client.post('/favorites', json={'user_id': 2, 'product_id': 3}, headers=TOKEN)
+
+    assert first.status_code == 201
+    assert again.status_code == 200
+    response = client.get('/favorites?user_id=1', headers=TOKEN)
+    assert response.get_json() == [{'user_id': 1, 'product_id': 2}]
+    assert len(client.get('/favorites', headers=TOKEN).get_json()) == 2
@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+import pytest
+from utils.database_connection import DatabaseConnection
+from utils.group_commit import GroupCommitWriter
+from repositories.favorite_repository import FavoriteRepository
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text(json.dumps({
+        'products': [{'id': 1, 'name': 'Hat', 'category': 'men', 'price': 1.0}],
+        'categories': [{'id': 1, 'name': 'men'}],
+        'favorites': []
+    }))
+    DatabaseConnection._instances.clear()
+    yield DatabaseConnection(str(path))
+    DatabaseConnection._instances.clear()
+
+
+def run_concurrently(target, count):
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_commits_share_flushes():
+    flushed = []
+
+    def slow_flush():
+        time.sleep(0.02)
+        flushed.append(time.monotonic())
+
+    writer = GroupCommitWriter(slow_flush)
+    acknowledged = []
+
+    def commit(n):
+        writer.commit()
+        acknowledged.append(time.monotonic())
+
+    run_concurrently(commit, 20)
+
+    assert len(acknowledged) == 20
+    assert 1 <= writer.flushes < 20
+    # Nadie recibe el ack antes de que exista una persistencia
+    assert min(acknowledged) >= min(flushed)
+
+
+def test_max_batch_limits_writers_per_flush():
+    writer = GroupCommitWriter(lambda: time.sleep(0.01), window=0.5, max_batch=5)
+    run_concurrently(lambda n: writer.commit(), 10)
+    assert writer.flushes >= 2
+
+
+def test_flush_error_is_raised_to_every_writer_of_the_batch():
+    def failing_flush():
+        time.sleep(0.01)
+        raise OSError('disk full')
+
+    writer = GroupCommitWriter(failing_flush, window=0.05)
+    errors = []
+
+    def commit(n):
+        try:
+            writer.commit()
+        except OSError as e:
+            errors.append(e)
+
+    run_concurrently(commit, 5)
+    assert len(errors) == 5
+
+
+def test_concurrent_favorites_are_all_persisted(db):
+    repository = FavoriteRepository(db)
+    run_concurrently(lambda n: repository.create(user_id=n, product_id=1), 30)
+
+    with open(db.json_file_path) as f:
+        stored = json.load(f)['favorites']
+    assert sorted(f['user_id'] for f in stored) == list(range(30))
+    assert db.group_commit.flushes <= 30
+
+
+def test_transaction_persists_once_at_the_end(db):
+    saves = []
+    db.group_commit = None
+    original_save = db._save
+    db._save = lambda: (saves.append(1), original_save())
+
+    with db.transaction():
+        db.append('favorites', {'user_id': 1, 'product_id': 1})
+        db.append('favorites', {'user_id': 2, 'product_id': 1})
+    db.remove('favorites', lambda f: f['user_id'] == 99)
+
+    assert len(saves) == 1
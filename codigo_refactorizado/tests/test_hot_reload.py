@@ -0,0 +1,147 @@
+import json
+import os
+import time
+from utils.adjacency_store import AdjacencyStore
+from utils.database_connection import DatabaseConnection
+from utils.file_watcher import FileWatcher
+from utils.snapshot import VersionedCollection
+from repositories.favorite_repository import FavoriteRepository
+from repositories.product_repository import ProductRepository
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+class PairStore(AdjacencyStore):
+    LEFT_KEY = 'user_id'
+    RIGHT_KEY = 'product_id'
+
+
+def edit_file(path, change):
+    """Edita el archivo como una herramienta externa, reemplazándolo de una vez."""
+    with open(path) as f:
+        data = json.load(f)
+    change(data)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f)
+    # Escribirlo en el lugar podría dejar al watcher leyendo un JSON a medias
+    os.replace(path + '.tmp', path)
+
+
+def test_sync_applies_minimal_changes_and_publishes_once():
+    collection = VersionedCollection([{'id': n, 'v': n} for n in range(1, 11)], version=1)
+    before = collection.snapshot()
+    items = [{'id': n, 'v': n} for n in range(1, 11) if n != 3]
+    items[0] = {'id': 1, 'v': 100}
+    items.append({'id': 11, 'v': 11})
+
+    applied = collection.sync(items, 2)
+    assert applied == [('delete', [{'id': 3, 'v': 3}]), ('update', [{'id': 1, 'v': 100}]),
+                       ('insert', [{'id': 11, 'v': 11}])]
+    assert collection.snapshot() == items and collection.version == 2
+    assert before.get_by_id(1) == {'id': 1, 'v': 1} and len(before) == 10
+    assert collection.sync(items, 3) == [] and collection.version == 2
+    assert collection.sync(list(reversed(items)), 4) == [('reset', [None])]
+
+
+def test_adjacency_sync_only_touches_changed_pairs():
+    store = PairStore([{'user_id': 1, 'product_id': 1}, {'user_id': 1, 'product_id': 2}])
+    applied = store.sync([{'user_id': 1, 'product_id': 2}, {'user_id': 2, 'product_id': 1}], 5)
+
+    assert applied == [('delete', [{'user_id': 1, 'product_id': 1}]), ('insert', [{'user_id': 2, 'product_id': 1}])]
+    assert store.by_left(1) == [{'user_id': 1, 'product_id': 2}] and store.by_right(1) == [{'user_id': 2, 'product_id': 1}]
+    assert store.version == 5
+
+
+def test_reload_applies_only_the_collections_that_changed(workdir):
+    db = DatabaseConnection('db.json')
+    products, favorites = ProductRepository(db), FavoriteRepository(db)
+    favorites.create(1, 1)
+    categories_version = db.get_collection('categories').version
+    assert db.reload() == []  # Las escrituras propias no cuentan como cambio externo
+
+    def change(data):
+        data['products'][0]['category'] = 'kids'
+        data['favorites'].append({'user_id': 2, 'product_id': 2})
+    edit_file('db.json', change)
+    product = db.get_collection('products')[0]
+
+    assert sorted(db.reload()) == ['favorites', 'products']
+    assert db.get_collection('categories').version == categories_version
+    assert products.get_by_id(product['id'])['category'] == 'kids'
+    assert product['id'] in [p['id'] for p in products.get_by_category('kids')]
+    assert product['id'] not in [p['id'] for p in products.get_by_category('men')]
+    assert favorites.get_by_user(2) == [{'user_id': 2, 'product_id': 2}]
+    ops = [(e['collection'], e['op']) for e in db.changes.since(0)[0]]
+    # db.json tiene IDs de productos repetidos: esa colección se reemplaza completa
+    assert ops[-2:] == [('products', 'reset'), ('favorites', 'insert')]
+
+
+def test_watcher_reloads_external_edits_and_changes_the_etag(client):
+    db = DatabaseConnection('db.json')
+    etag = client.get('/products', headers=TOKEN).headers['ETag']
+    watcher = db.watch(interval=0.05)
+    try:
+        edit_file('db.json', lambda data: data['products'][0].update(price=1234.5))
+        deadline = time.monotonic() + 5
+        while db.get_collection('products')[0]['price'] != 1234.5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        db.close()
+
+    assert watcher.errors == 0
+    response = client.get('/products', headers={**TOKEN, 'If-None-Match': etag})
+    assert response.status_code == 200 and response.get_json()[0]['price'] == 1234.5
+
+
+def test_watcher_falls_back_to_polling_when_inotify_fails(tmp_path):
+    class BrokenInotify:
+        def wait(self, timeout):
+            raise OSError('inotify read failed')
+
+        def close(self):
+            pass
+
+    calls = []
+    watcher = FileWatcher(str(tmp_path / 'db.json'), lambda: calls.append(1), interval=0.01)
+    watcher.start()
+    watcher._waiter = BrokenInotify()
+    try:
+        deadline = time.monotonic() + 5
+        while (watcher.mode != 'polling' or len(calls) < 3) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watcher.mode == 'polling' and len(calls) >= 3 and watcher.alive
+    finally:
+        watcher.stop()
+
+
+def test_reload_keeps_acknowledged_writes_that_are_not_on_disk_yet(workdir, monkeypatch):
+    db = DatabaseConnection('db.json')
+    monkeypatch.setattr(db, '_commit', lambda: None)  # Group commit todavía sin persistir
+    product = ProductRepository(db).create('Cap', 'men', 10.0)
+    edit_file('db.json', lambda data: data['products'][0].update(price=1.0))
+
+    assert db.reload() == []
+    assert db.get_collection('products').get_by_id(product['id']) == product
+    db._save()
+    with open('db.json') as f:
+        assert product in json.load(f)['products']
+
+
+def test_reload_invalidates_popularity_and_idempotency(client, events):
+    def popular():
+        return [(p['id'], p['favorites']) for p in client.get('/products/popular', headers=TOKEN).get_json()]
+
+    client.post('/favorites', json={'user_id': 1, 'product_id': 2}, headers=TOKEN)
+    assert popular() == [(2, 1)]
+    headers = {**TOKEN, 'Idempotency-Key': 'restore-1'}
+    created = client.post('/products', json={'name': 'Cap', 'category': 'men', 'price': 10.0}, headers=headers)
+
+    # Se restaura un respaldo sin el favorito ni el producto creado
+    removed = created.get_json()['product']['id']
+    edit_file('db.json', lambda data: data.update(
+        favorites=[], products=[p for p in data['products'] if p['id'] != removed]))
+    assert set(DatabaseConnection('db.json').reload()) >= {'favorites', 'products'}
+
+    assert popular() == []
+    retry = client.post('/products', json={'name': 'Cap', 'category': 'men', 'price': 10.0}, headers=headers)
+    assert retry.status_code == 201 and 'Idempotent-Replayed' not in retry.headers
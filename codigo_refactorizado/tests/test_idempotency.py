@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from notifications.event_manager import EventManager
+from utils.idempotency import IdempotencyCache, FileBackend, IN_PROGRESS, MISMATCH
+
+TOKEN = {'Authorization': 'abcd1234'}
+PRODUCT = {'name': 'Panama Hat', 'category': 'men', 'price': 15.0}
+
+
+class Recorder:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.events = []
+
+    def handle(self, event):
+        time.sleep(self.delay)
+        self.events.append(event)
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    monkeypatch.setattr(EventManager, '_instance', None)
+    recorder = Recorder()
+    for event_type in ('ProductCreatedEvent', 'FavoriteAddedEvent'):
+        EventManager().subscribe(event_type, recorder)
+    return recorder
+
+
+def post(client, path, body, key):
+    return client.post(path, json=body, headers={**TOKEN, 'Idempotency-Key': key})
+
+
+def test_retry_replays_the_response_without_writing(client, recorder):
+    first = post(client, '/products', PRODUCT, 'k1')
+    retry = post(client, '/products', PRODUCT, 'k1')
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true' and 'Idempotent-Replayed' not in first.headers
+    assert len(recorder.events) == 1
+    names = [p['name'] for p in client.get('/products', headers=TOKEN).get_json()]
+    assert names.count('Panama Hat') == 1
+
+    assert post(client, '/products', {**PRODUCT, 'price': 16.0}, 'k1').status_code == 422
+    assert post(client, '/products', PRODUCT, 'k2').status_code == 201
+    assert client.post('/products', json=PRODUCT, headers=TOKEN).status_code == 201
+    assert post(client, '/products', PRODUCT, '').status_code == 400
+    assert len(recorder.events) == 3
+
+
+def test_failed_request_releases_the_key(client, recorder):
+    assert post(client, '/products', {'name': 'Panama Hat'}, 'k1').status_code == 400
+    assert post(client, '/products', PRODUCT, 'k1').status_code == 201
+
+
+def test_simultaneous_duplicates_run_once(app, recorder):
+    recorder.delay = 0.2  # El original sigue en curso cuando llegan los duplicados
+    barrier = threading.Barrier(8)
+    responses = []
+
+    def send():
+        client = app.test_client()
+        barrier.wait()
+        response = post(client, '/favorites', {'user_id': 9, 'product_id': 3}, 'fav-9-3')
+        responses.append((response.status_code, response.get_json(), 'Idempotent-Replayed' in response.headers))
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {(status, json.dumps(body)) for status, body, _ in responses} == {
+        (201, json.dumps(responses[0][1]))
+    }
+    assert sorted(replayed for _, _, replayed in responses) == [False] + [True] * 7
+    assert len(recorder.events) == 1
+
+
+def test_cache_expires_and_bounds_keys():
+    now = [1000.0]
+    cache = IdempotencyCache(ttl=60, max_keys=2, wait=0, clock=lambda: now[0])
+    cache.complete(cache.begin('POST /products', 'a', 'x'), {'id': 1}, 201)
+    assert cache.begin('POST /products', 'a', 'x').replay == ({'id': 1}, 201)
+    assert cache.begin('POST /products', 'a', 'y').conflict == MISMATCH
+    in_flight = cache.begin('POST /favorites', 'a', 'y')  # Otra ruta, otra clave
+    assert in_flight.owned
+
+    cache.complete(cache.begin('POST /products', 'b', 'x'), {'id': 2}, 201)
+    assert len(cache) == 2 and cache.begin('POST /products', 'a', 'x').owned  # 'a' se descartó
+    # La clave en curso nunca se descarta, aunque sea la más antigua
+    cache.begin('POST /products', 'c', 'x')
+    assert cache.begin('POST /favorites', 'a', 'y').conflict == IN_PROGRESS
+
+    now[0] += 61
+    cache.complete(in_flight, {}, 201)
+    cache.begin('POST /products', 'd', 'x')
+    assert len(cache) == 3  # Vencidas las completadas; 'a' y 'c' siguen en curso
+
+
+def test_file_backend_is_shared_between_workers(tmp_path):
+    now = [1000.0]
+    clock = lambda: now[0]
+    backend = FileBackend(str(tmp_path), lease=30)
+    first = IdempotencyCache(wait=0.1, backend=backend, clock=clock)
+    second = IdempotencyCache(wait=0.1, backend=FileBackend(str(tmp_path), lease=30), clock=clock)
+
+    claim = first.begin('POST /products', 'k', 'x')
+    assert claim.owned
+    assert second.begin('POST /products', 'k', 'x').conflict == IN_PROGRESS
+    first.complete(claim, {'id': 7}, 201)
+    assert second.begin('POST /products', 'k', 'x').replay == ({'id': 7}, 201)
+    assert second.begin('POST /products', 'k', 'y').conflict == MISMATCH
+
+    # Una reserva sin respuesta (el worker murió) se puede tomar al vencer el lease
+    assert first.begin('POST /products', 'other', 'x').owned
+    now[0] += 31
+    assert second.begin('POST /products', 'other', 'x').owned
+
+
+def test_expired_key_is_taken_over_by_a_single_worker(tmp_path):
+    backends = [FileBackend(str(tmp_path), lease=30) for _ in range(8)]
+    for round_ in range(20):
+        ident = ('POST /products', f'k{round_}')
+        assert backends[0].claim(ident, 'x', 1000.0 + 60, 1000.0) == ('claimed', None)
+        barrier = threading.Barrier(len(backends))
+        states = []
+
+        def take_over(backend):
+            barrier.wait()
+            states.append(backend.claim(ident, 'x', 2000.0 + 60, 2000.0)[0])  # Lease vencido
+
+        threads = [threading.Thread(target=take_over, args=(backend,)) for backend in backends]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert states.count('claimed') == 1
+
+
+def call_asgi(app, path, body, key):
+    headers = [(b'authorization', b'abcd1234'), (b'idempotency-key', key.encode())]
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'query_string': b'', 'headers': headers}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': json.dumps(body).encode()}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages[0]['status'], dict(messages[0]['headers']), json.loads(messages[1]['body'])
+
+
+def test_asgi_replays_the_response(workdir):
+    from asgi import app
+    status, headers, body = call_asgi(app, '/favorites', {'user_id': 9, 'product_id': 3}, 'k1')
+    assert status == 201 and b'idempotent-replayed' not in headers
+
+    assert call_asgi(app, '/favorites', {'user_id': 9, 'product_id': 3}, 'k1') == (
+        201, {**headers, b'idempotent-replayed': b'true'}, body
+    )
+    assert call_asgi(app, '/favorites', {'user_id': 9, 'product_id': 4}, 'k1')[0] == 422
@@ -0,0 +1,125 @@
+import json
+import pytest
+from utils.database_connection import DatabaseConnection
+from repositories.base_repository import IntegrityError
+from repositories.category_repository import CategoryRepository
+from repositories.favorite_repository import FavoriteRepository
+from repositories.product_repository import ProductRepository, ProductStore
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text(json.dumps({
+        'categories': [{'id': 1, 'name': 'men'}, {'id': 2, 'name': 'women'}],
+        'products': [
+            {'id': 1, 'name': 'Hat', 'category': 'men', 'price': 5.0},
+            {'id': 2, 'name': 'Dress', 'category': 'women', 'price': 30.0},
+            {'id': 3, 'name': 'Tie', 'category': 'Men', 'price': 8.0},
+        ],
+        'favorites': [{'user_id': 1, 'product_id': 1}, {'user_id': 1, 'product_id': 2}],
+    }))
+    DatabaseConnection._instances.clear()
+    yield DatabaseConnection(str(path))
+    DatabaseConnection._instances.clear()
+
+
+def test_secondary_index_follows_updates_and_deletes():
+    store = ProductStore([{'id': 1, 'category': 'men'}, {'id': 2, 'category': 'Men'}])
+    assert [p['id'] for p in store.lookup('MEN')] == [1, 2]
+
+    store.update(1, {'category': 'women'})
+    store.delete(2)
+    assert not store.has('men')
+    assert store.lookup('women') == [{'id': 1, 'category': 'women'}]
+
+
+def test_writes_with_missing_references_are_rejected(db):
+    products = ProductRepository(db)
+    with pytest.raises(IntegrityError):
+        products.create('Boot', 'shoes', 10.0)
+    with pytest.raises(IntegrityError):
+        products.update(1, {'category': 'shoes'})
+    with pytest.raises(IntegrityError):
+        FavoriteRepository(db).create(1, 99)
+
+    assert len(products.get_all()) == 3
+    assert products.get_by_id(1)['category'] == 'men'
+
+
+def test_existing_products_without_category_row_stay_updatable(db):
+    products = ProductRepository(db)
+    db.save_collection('products', products.get_all().to_list() + [
+        {'id': 4, 'name': 'Gloves', 'category': 'accessories', 'price': 6.0},
+    ])
+    assert products.update(4, {'name': 'Gloves', 'category': 'Accessories', 'price': 7.0})[1]['price'] == 7.0
+    with pytest.raises(IntegrityError):
+        products.update(1, {'category': 'accessories'})
+
+    categories = CategoryRepository(db)
+    assert [c['name'] for c in categories.backfill()] == ['Accessories']
+    assert categories.backfill() == []
+    products.update(1, {'category': 'accessories'})
+
+
+def test_category_delete_restricts_or_cascades(db):
+    categories = CategoryRepository(db)
+    products = ProductRepository(db)
+    favorites = FavoriteRepository(db)
+
+    with pytest.raises(IntegrityError):
+        categories.remove('men')
+    assert categories.exists('men')
+
+    removed = categories.remove('men', on_delete='cascade')
+    assert sorted(p['id'] for p in removed) == [1, 3]
+    assert not categories.exists('men')
+    assert [p['id'] for p in products.get_all()] == [2]
+    assert favorites.get_by_user(1) == [{'user_id': 1, 'product_id': 2}]
+
+
+def test_category_names_match_products_without_case(db):
+    categories = CategoryRepository(db)
+    products = ProductRepository(db)
+    categories.create('Kids')
+
+    assert categories.exists('kids') and categories.get_by_name('KIDS')['name'] == 'Kids'
+    products.create('Cap', 'kids', 3.0)
+    with pytest.raises(IntegrityError):
+        categories.remove('KIDS')
+    assert [p['name'] for p in products.get_by_category('Kids')] == ['Cap']
+
+
+def test_endpoints_report_integrity_errors(client):
+    response = client.post('/products', json={'name': 'Boot', 'category': 'shoes', 'price': 1}, headers=TOKEN)
+    assert response.status_code == 400
+    hat = {'name': 'Hat', 'category': 'accessories', 'price': 12.5}  # db.json trae la fila 'accessories'
+    assert client.put('/products/10', json=hat, headers=TOKEN).status_code == 200
+    assert client.post('/products', json=hat, headers=TOKEN).status_code == 201
+    assert client.post('/favorites', json={'user_id': 1, 'product_id': 999}, headers=TOKEN).status_code == 400
+
+    assert client.delete('/categories', json={'name': 'kids'}, headers=TOKEN).status_code == 409
+    response = client.delete('/categories', json={'name': 'kids', 'on_delete': 'cascade'}, headers=TOKEN)
+    assert response.status_code == 200 and response.get_json()['removed_products'] > 0
+    assert client.get('/products?category=kids', headers=TOKEN).get_json() == []
+
+
+def test_cascade_emits_an_event_per_removed_product(client):
+    from notifications.event_manager import EventManager
+
+    events = []
+
+    class Recorder:
+        def handle(self, event):
+            events.append(event)
+
+    recorder, manager = Recorder(), EventManager()
+    manager.subscribe('ProductDeletedEvent', recorder)
+    try:
+        kids = client.get('/products?category=kids', headers=TOKEN).get_json()
+        client.delete('/categories', json={'name': 'KIDS', 'on_delete': 'cascade'}, headers=TOKEN)
+    finally:
+        manager.unsubscribe('ProductDeletedEvent', recorder)
+    assert sorted(e.data['product_id'] for e in events) == sorted(p['id'] for p in kids)
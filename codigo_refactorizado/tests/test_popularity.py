@@ -0,0 +1,78 @@
+import json
+from utils.database_connection import DatabaseConnection
+from utils.popularity import PopularityBoard, Ranking
+from notifications.subscribers.popularity_subscriber import build_board, popularity_board
+from repositories.favorite_repository import FavoriteRepository
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+def favorite(client, user_id, product_id, method='post'):
+    response = getattr(client, method)('/favorites', json={'user_id': user_id, 'product_id': product_id}, headers=TOKEN)
+    assert response.status_code in (200, 201)
+
+
+def popular(client, query=''):
+    response = client.get(f'/products/popular{query}', headers=TOKEN)
+    assert response.status_code == 200
+    return [(p['id'], p['favorites']) for p in response.get_json()]
+
+
+def test_ranking_orders_by_count_and_drops_empty_levels():
+    ranking = Ranking()
+    for key, count in (('a', 3), ('b', 1), ('c', 3), ('d', 2)):
+        ranking.add(key, count)
+    assert ranking.top(3) == [('a', 3), ('c', 3), ('d', 2)]
+
+    ranking.add('a', -3)
+    ranking.add('b')
+    assert ranking.top(10) == [('c', 3), ('d', 2), ('b', 2)]
+    assert 'a' not in ranking and ranking._levels == [2, 3]
+    assert ranking.discard('c') == 3 and ranking.top(1) == [('d', 2)]
+
+
+def test_popular_products_follow_favorite_events(client, events):
+    for user_id, product_id in ((1, 2), (2, 2), (3, 2), (1, 1), (2, 1), (1, 5)):
+        favorite(client, user_id, product_id)
+    favorite(client, 1, 2)  # Repetido: no cuenta dos veces
+
+    assert popular(client) == [(2, 3), (1, 2), (5, 1)]
+    assert popular(client, '?category=Women') == [(2, 3)]
+    assert popular(client, '?limit=1') == [(2, 3)]
+
+    favorite(client, 1, 2, method='delete')
+    favorite(client, 2, 2, method='delete')
+    assert popular(client) == [(1, 2), (5, 1), (2, 1)]  # Empates: primero el que llegó antes al nivel
+
+    assert client.delete('/products/1', headers=TOKEN).status_code == 200
+    assert popular(client) == [(5, 1), (2, 1)]
+    assert popularity_board()[0].total == 2
+
+
+def test_category_change_is_corrected_on_query(client, events):
+    favorite(client, 1, 2)
+    client.patch('/products/2', json={'category': 'kids'}, headers=TOKEN)
+
+    assert popular(client, '?category=women') == []
+    assert popular(client, '?category=kids') == [(2, 1)]
+
+
+def test_checkpoint_is_reused_only_while_it_matches_the_database(workdir):
+    db = DatabaseConnection('db.json')
+    favorites = FavoriteRepository(db)
+    for user_id in (1, 2):
+        favorites.create(user_id, 3)
+
+    board = build_board(db, 'popularity.json')
+    assert board.top(5) == [(3, 2)] and board.checkpoint()
+    with open('popularity.json') as f:
+        assert json.load(f)['total'] == 2
+
+    restored = PopularityBoard('popularity.json')
+    assert restored.restore(expected_total=2) and restored.top(5, 'men') == [(3, 2)]
+    assert list(restored.overall.ranked()) == list(board.overall.ranked())
+
+    # Un favorito que no llegó al checkpoint: se recuenta desde la base
+    favorites.create(3, 4)
+    assert not PopularityBoard('popularity.json').restore(expected_total=3)
+    assert build_board(db, 'popularity.json').top(5) == [(3, 2), (4, 1)]
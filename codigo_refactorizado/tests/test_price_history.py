@@ -0,0 +1,88 @@
+import os
+import time
+from datetime import datetime, timezone
+import utils.price_history as price_history
+from utils.price_history import PriceHistoryStore, PriceSeries, RECORD
+
+TOKEN = {'Authorization': 'abcd1234'}
+T0 = 1767225600  # 2026-01-01T00:00:00Z
+
+
+def test_series_range_queries_and_out_of_order_points():
+    series = PriceSeries()
+    for n, price in enumerate([10.0, 12.0, 11.0, 15.0]):
+        series.add(T0 + 60 * n, price)
+    series.add(T0 + 90, 99.0)  # Llega tarde: queda entre el 2º y el 3º
+
+    assert series.points(T0 + 60, T0 + 180) == [(T0 + 60, 12.0), (T0 + 90, 99.0), (T0 + 120, 11.0)]
+    assert series.points(T0 + 1000, T0 + 2000) == []
+    assert series.buckets('hour', T0 + 100, T0 + 200) == [(T0, 10.0, 99.0, 10.0, 15.0)]
+
+
+def test_rollups_match_downsampling_from_points(monkeypatch):
+    monkeypatch.setattr(price_history, 'ROLLUP_MIN_POINTS', 50)
+    short, long = PriceSeries(), PriceSeries()
+    for n in range(200):
+        time, price = T0 + 1000 * n, float(n % 17)
+        long.add(time, price)
+        if n < 49:
+            short.add(time, price)
+    assert long.rollups is not None and short.rollups is None
+
+    start, end = T0 + 5000, T0 + 43200  # Intervalos que la serie corta tiene completos
+    assert long.buckets('hour', start, end) == short.buckets('hour', start, end)
+    assert long.buckets('day', T0, T0 + 200000)[1] == (T0 + 86400, *_ohlc(long, T0 + 86400, T0 + 172800))
+
+
+def _ohlc(series, start, end):
+    prices = [price for _, price in series.points(start, end)]
+    return prices[0], max(prices), min(prices), prices[-1]
+
+
+def test_store_is_rebuilt_from_the_file_and_sees_other_writers(tmp_path):
+    path = str(tmp_path / 'history.bin')
+    writer, reader = PriceHistoryStore(path), PriceHistoryStore(path)
+    writer.record(1, 10.0, datetime.fromtimestamp(T0))
+    writer.record(1, 12.5, datetime.fromtimestamp(T0 + 60))
+    with open(path, 'ab') as f:
+        f.write(RECORD.pack(2, T0, 5.0)[:10])  # Registro a medio escribir
+
+    history = reader.history(1)
+    assert [p['price'] for p in history] == [10.0, 12.5]
+    assert history[0]['timestamp'] == '2026-01-01T00:00:00+00:00'
+    assert reader.history(2) is None and reader.points == 2
+    assert os.path.getsize(path) == 2 * RECORD.size + 10
+    writer.close()
+
+
+def test_price_history_endpoint(client, events):
+    response = client.post('/products', json={'name': 'Lamp', 'category': 'men', 'price': 20}, headers=TOKEN)
+    product_id = response.get_json()['product']['id']
+    for price in (25, 18):
+        client.patch(f'/products/{product_id}', json={'price': price}, headers=TOKEN)
+
+    url = f'/products/{product_id}/price-history'
+    body = client.get(url, headers=TOKEN).get_json()
+    assert [p['price'] for p in body['points']] == [20.0, 25.0, 18.0]
+    day = client.get(url + '?resolution=day', headers=TOKEN).get_json()['points']
+    assert [(b['open'], b['high'], b['low'], b['close']) for b in day] == [(20.0, 25.0, 18.0, 18.0)]
+    assert client.get(url + '?to=2000-01-01', headers=TOKEN).get_json()['points'] == []
+
+    assert client.get(url + '?resolution=week', headers=TOKEN).status_code == 400
+    assert client.get('/products/1/price-history', headers=TOKEN).get_json()['points'] == []
+    assert client.get('/products/9999/price-history', headers=TOKEN).status_code == 404
+
+
+def test_buckets_and_timestamps_are_utc_on_any_host(monkeypatch):
+    monkeypatch.setenv('TZ', 'America/Bogota')  # UTC-5
+    time.tzset()
+    try:
+        store = PriceHistoryStore()
+        store.record(1, 10.0, datetime.fromtimestamp(T0 + 3600, tz=timezone.utc))
+        store.record(1, 12.0, datetime.fromtimestamp(T0 + 86400 - 60, tz=timezone.utc))
+        day = store.history(1, resolution='day')
+        assert [(b['timestamp'], b['open'], b['close']) for b in day] == [('2026-01-01T00:00:00+00:00', 10.0, 12.0)]
+        assert store.history(1, datetime(2026, 1, 1, 2), datetime(2026, 1, 2))[0]['timestamp'] == '2026-01-01T23:59:00+00:00'
+    finally:
+        monkeypatch.delenv('TZ')
+        time.tzset()
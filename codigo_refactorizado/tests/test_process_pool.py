@@ -0,0 +1,109 @@
+import os
+import pytest
+from notifications.events.base_event import BaseEvent
+from notifications.process_pool import SubscriberPool
+from notifications.subscribers.process_subscriber import ProcessSubscriber
+
+
+class RecordingSubscriber:
+    """Anota pid, tipo de evento y dato; falla o hace morir al proceso si se le pide."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def handle(self, event):
+        action = event.data.get('action')
+        if action == 'fail':
+            raise ValueError('bad event')
+        if action == 'crash' and not os.path.exists(self.path + '.crashed'):
+            open(self.path + '.crashed', 'w').close()
+            os._exit(1)
+        if action == 'always_crash':
+            os._exit(1)
+        with open(self.path, 'a') as f:
+            f.write(f"{os.getpid()} {type(event).__name__} {event.data['n']}\n")
+
+
+class ItemAddedEvent(BaseEvent):
+    pass
+
+
+TARGET = 'test_process_pool:RecordingSubscriber'
+
+
+@pytest.fixture
+def pool():
+    pool = SubscriberPool(processes=1, batch_size=1)
+    yield pool
+    pool.close()
+
+
+def lines(path):
+    with open(path) as f:
+        return [line.split() for line in f]
+
+
+def test_events_run_in_another_process_in_batches(tmp_path):
+    path = str(tmp_path / 'events.log')
+    pool = SubscriberPool(processes=2, batch_size=50)
+    subscriber = ProcessSubscriber(pool, TARGET, path)
+    try:
+        for n in range(200):
+            subscriber.handle(ItemAddedEvent({'n': n}))
+        assert pool.flush(timeout=30)
+    finally:
+        pool.close()
+
+    recorded = lines(path)
+    assert sorted(int(n) for _, _, n in recorded) == list(range(200))
+    assert {event_type for _, event_type, _ in recorded} == {'ItemAddedEvent'}
+    assert str(os.getpid()) not in {pid for pid, _, _ in recorded}
+    assert pool.stats()['handled'] == 200 and pool.batches < 200
+
+
+def test_subscriber_errors_are_reported_back(pool, tmp_path):
+    path = str(tmp_path / 'events.log')
+    subscriber = ProcessSubscriber(pool, TARGET, path)
+    for n, action in enumerate([None, 'fail', None]):
+        subscriber.handle(ItemAddedEvent({'n': n, 'action': action}))
+    assert pool.flush(timeout=30)
+
+    assert [int(n) for _, _, n in lines(path)] == [0, 2]
+    assert list(pool.errors) == [(TARGET, 'ItemAddedEvent', "ValueError('bad event')")]
+
+
+def test_crashed_worker_is_restarted_and_the_batch_retried(pool, tmp_path):
+    path = str(tmp_path / 'events.log')
+    subscriber = ProcessSubscriber(pool, TARGET, path)
+    subscriber.handle(ItemAddedEvent({'n': 0}))
+    subscriber.handle(ItemAddedEvent({'n': 1, 'action': 'crash'}))
+    subscriber.handle(ItemAddedEvent({'n': 2, 'action': 'always_crash'}))
+    subscriber.handle(ItemAddedEvent({'n': 3}))
+    assert pool.flush(timeout=60)
+
+    recorded = lines(path)
+    assert [int(n) for _, _, n in recorded] == [0, 1, 3]
+    assert len({pid for pid, _, _ in recorded}) == 3  # Un proceso nuevo tras cada caída
+    assert pool.restarts == 3  # 1 por 'crash' y max_attempts (2) por 'always_crash'
+    assert list(pool.errors) == [(TARGET, 'ItemAddedEvent', 'worker process died')]
+
+
+def test_app_runs_process_subscribers_in_the_pool(client, monkeypatch):
+    import app as app_module
+    from notifications.event_manager import EventManager
+    monkeypatch.setattr(EventManager, '_instance', None)
+    monkeypatch.setattr(app_module, '_subscribers_registered', False)
+    monkeypatch.setattr(app_module, 'subscriber_pool', None)
+    monkeypatch.setattr(app_module, 'SUBSCRIBER_PROCESSES', 1)
+    app_module.register_subscribers()
+    pool = app_module.subscriber_pool
+    try:
+        response = client.post('/favorites', json={'user_id': 1, 'product_id': 2},
+                               headers={'Authorization': 'abcd1234'})
+        assert response.status_code == 201
+        assert pool.flush(timeout=30)
+    finally:
+        pool.close()
+    assert pool.handled == 1
+    with open('recommendations.json') as f:
+        assert '"product_id": 2' in f.read()
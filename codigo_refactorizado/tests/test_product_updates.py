@@ -0,0 +1,116 @@
+import pytest
+from utils.snapshot import VersionedCollection
+from notifications.event_manager import EventManager
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+class RecordingSubscriber:
+    def __init__(self):
+        self.events = []
+
+    def handle(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def recorder():
+    subscriber = RecordingSubscriber()
+    manager = EventManager()
+    for event_type in ('ProductPriceChangedEvent', 'ProductDeletedEvent'):
+        manager.subscribe(event_type, subscriber)
+    yield subscriber
+    for event_type in ('ProductPriceChangedEvent', 'ProductDeletedEvent'):
+        manager.unsubscribe(event_type, subscriber)
+
+
+def test_update_and_delete_publish_copies_and_skip_tombstones():
+    collection = VersionedCollection([{'id': 1, 'n': 'a'}, {'id': 2, 'n': 'b'}, {'id': 3, 'n': 'c'}])
+    before = collection.snapshot()
+
+    assert collection.update(2, {'n': 'B', 'id': 99}) == {'id': 2, 'n': 'B'}
+    assert collection.delete(1) == {'id': 1, 'n': 'a'}
+    assert collection.delete(1) is None
+    assert collection.update(1, {'n': 'x'}) is None
+
+    snapshot = collection.snapshot()
+    assert snapshot == [{'id': 2, 'n': 'B'}, {'id': 3, 'n': 'c'}]
+    assert len(snapshot) == 2 and snapshot[0]['id'] == 2
+    assert snapshot.get_by_id(3) == {'id': 3, 'n': 'c'} and snapshot.get_by_id(1) is None
+    assert before.version < snapshot.version
+    # El snapshot anterior no cambia
+    assert before == [{'id': 1, 'n': 'a'}, {'id': 2, 'n': 'b'}, {'id': 3, 'n': 'c'}]
+    assert before[1] == {'id': 2, 'n': 'b'} and before.get_by_id(1) == {'id': 1, 'n': 'a'}
+
+
+def test_copy_on_write_spans_chunks_and_appends():
+    collection = VersionedCollection([{'id': n} for n in range(3000)])
+    before = collection.snapshot()
+    collection.delete(2500)
+    collection.append({'id': 3000})
+    collection.update(10, {'x': 1})
+
+    assert len(before) == 3000 and before.get_by_id(2500) == {'id': 2500}
+    assert before.get_by_id(3000) is None and before.get_by_id(10) == {'id': 10}
+    after = collection.snapshot()
+    assert len(after) == 3000 and after.get_by_id(2500) is None
+    assert after[-1] == {'id': 3000} and after.get_by_id(10) == {'id': 10, 'x': 1}
+
+
+def test_delete_compacts_when_tombstones_accumulate():
+    collection = VersionedCollection([{'id': n} for n in range(2000)])
+    for n in range(1100):
+        collection.delete(n)
+
+    assert collection._length < 2000
+    assert collection.snapshot().get_by_id(1500) == {'id': 1500}
+    assert len(collection.snapshot()) == 900
+
+
+def test_patch_updates_fields_and_emits_price_change(client, recorder):
+    response = client.patch('/products/1', json={'price': 25.0}, headers=TOKEN)
+
+    assert response.status_code == 200
+    product = client.get('/products/1', headers=TOKEN).get_json()
+    assert product['price'] == 25.0 and product['name'] == response.get_json()['product']['name']
+    assert [e.data['new_price'] for e in recorder.events] == [25.0]
+
+    client.patch('/products/1', json={'name': 'Renamed'}, headers=TOKEN)
+    assert len(recorder.events) == 1
+    assert client.patch('/products/999', json={'price': 1}, headers=TOKEN).status_code == 404
+    assert client.patch('/products/1', json={}, headers=TOKEN).status_code == 400
+
+
+def test_put_requires_all_fields(client):
+    assert client.put('/products/1', json={'name': 'X'}, headers=TOKEN).status_code == 400
+    response = client.put('/products/1', json={'name': 'X', 'category': 'women', 'price': 2}, headers=TOKEN)
+    assert response.get_json()['product'] == {'id': 1, 'name': 'X', 'category': 'women', 'price': 2.0}
+
+
+def test_delete_cascades_to_favorites(client, recorder):
+    client.post('/favorites', json={'user_id': 1, 'product_id': 2}, headers=TOKEN)
+    client.post('/favorites', json={'user_id': 2, 'product_id': 2}, headers=TOKEN)
+    client.post('/favorites', json={'user_id': 1, 'product_id': 3}, headers=TOKEN)
+
+    assert client.delete('/products/2', headers=TOKEN).status_code == 200
+    assert client.get('/products/2', headers=TOKEN).status_code == 404
+    assert client.get('/favorites', headers=TOKEN).get_json() == [{'user_id': 1, 'product_id': 3}]
+    assert [e.data['product_id'] for e in recorder.events] == [2]
+    assert client.delete('/products/2', headers=TOKEN).status_code == 404
+
+
+def test_ids_are_not_reused_after_deleting_the_highest(client):
+    created = client.post('/products', json={'name': 'Hat', 'category': 'men', 'price': 9.5}, headers=TOKEN)
+    product_id = created.get_json()['product']['id']
+    client.delete(f'/products/{product_id}', headers=TOKEN)
+
+    again = client.post('/products', json={'name': 'Cap', 'category': 'men', 'price': 5.0}, headers=TOKEN)
+    assert again.get_json()['product']['id'] == product_id + 1
+
+    # El contador se persiste: tras reiniciar tampoco se reutiliza
+    from utils.database_connection import DatabaseConnection
+    client.delete(f'/products/{product_id + 1}', headers=TOKEN)
+    DatabaseConnection._instances.clear()
+    from repositories.product_repository import ProductRepository
+    repository = ProductRepository(DatabaseConnection('db.json'))
+    assert repository.create(name='Bag', category='men', price=1.0)['id'] == product_id + 2
@@ -0,0 +1,91 @@
+import threading
+import time
+from flask import Flask
+from flask_restful import Api, Resource
+from endpoints.profiling import ProfileResource
+from utils.profiler import SamplingProfiler, init_profiling
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sample_collects_collapsed_stack_of_active_thread():
+    profiler = SamplingProfiler(sample_rate=1.0)
+    started = threading.Event()
+
+    def worker():
+        profiler.start('GET /slow')
+        started.set()
+        busy_wait(0.05)
+        profiler.stop()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    started.wait()
+    profiler.sample()
+    thread.join()
+
+    output = profiler.collapsed()
+    assert output.startswith('GET /slow;')
+    assert 'busy_wait (test_profiler.py:' in output
+    assert int(output.split()[-1]) >= 1
+
+
+def test_inactive_threads_are_not_sampled():
+    profiler = SamplingProfiler(sample_rate=1.0)
+    profiler.sample()
+    assert profiler.collapsed() == ''
+    assert profiler.endpoints() == {}
+
+
+def test_admin_endpoint_exposes_samples_per_endpoint():
+    class SlowResource(Resource):
+        def get(self):
+            busy_wait(0.05)
+            return {'ok': True}
+
+    app = Flask(__name__)
+    api = Api(app)
+    api.add_resource(SlowResource, '/slow')
+    api.add_resource(ProfileResource, '/admin/profile')
+    profiler = init_profiling(app, SamplingProfiler(sample_rate=1.0, interval=0.001))
+
+    client = app.test_client()
+    assert client.get('/slow').status_code == 200
+
+    summary = client.get('/admin/profile?summary=1', headers=TOKEN).get_json()
+    assert summary['GET /slow'] > 0
+
+    response = client.get('/admin/profile?reset=1', headers=TOKEN)
+    assert response.mimetype == 'text/plain'
+    assert 'GET /slow;' in response.get_data(as_text=True)
+    assert profiler.endpoints() == {}
+    assert client.get('/admin/profile?summary=1', headers=TOKEN).get_json() == {}
+
+
+def test_sampler_thread_stops_when_no_request_is_sampled():
+    profiler = SamplingProfiler(sample_rate=1.0, interval=0.001)
+    profiler.start('GET /slow')
+    assert profiler.running
+    profiler.stop()
+    deadline = time.monotonic() + 5
+    while profiler.running and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert not profiler.running
+
+    profiler.start('GET /slow')  # Una nueva petición lo vuelve a arrancar
+    assert profiler.running
+    profiler.stop()
+
+
+def test_admin_endpoint_requires_auth():
+    app = Flask(__name__)
+    api = Api(app)
+    api.add_resource(ProfileResource, '/admin/profile')
+    init_profiling(app, SamplingProfiler())
+    assert app.test_client().get('/admin/profile').status_code == 401
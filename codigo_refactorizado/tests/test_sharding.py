@@ -0,0 +1,92 @@
+import json
+import pytest
+from utils.database_connection import DatabaseConnection
+from utils.hash_ring import HashRing
+from repositories import sharded_favorite_repository
+from repositories.base_repository import IntegrityError
+from repositories.sharded_favorite_repository import ShardedFavoriteRepository, rebalance
+
+TOKEN = {'Authorization': 'abcd1234'}
+SHARDS = ['favorites-0.json', 'favorites-1.json', 'favorites-2.json']
+
+
+def stored_favorites(path):
+    with open(path) as f:
+        return json.load(f)['favorites']
+
+
+def test_hash_ring_moves_few_keys_when_a_node_is_added():
+    before = HashRing(['a', 'b', 'c'])
+    after = HashRing(['a', 'b', 'c', 'd'])
+    owners = {key: before.node_for(key) for key in range(2000)}
+
+    assert owners == {key: HashRing(['a', 'b', 'c']).node_for(key) for key in range(2000)}
+    moved = [key for key in owners if after.node_for(key) != owners[key]]
+    assert all(after.node_for(key) == 'd' for key in moved)
+    assert len(moved) < 2000 * 0.4
+
+
+def test_favorites_are_routed_by_user_and_gathered_across_shards(workdir):
+    db = DatabaseConnection('db.json')
+    repository = ShardedFavoriteRepository(db, SHARDS)
+    for user_id in range(1, 31):
+        repository.create(user_id, 1 + user_id % 3)
+
+    for path in SHARDS:
+        users = {f['user_id'] for f in stored_favorites(path)}
+        assert all(repository.ring.node_for(user) == path for user in users)
+    assert repository.get_by_user(7) == [{'user_id': 7, 'product_id': 2}]
+    assert len(repository.get_all()) == 30
+    assert sorted(f['user_id'] for f in repository.get_by_product(1)) == list(range(3, 31, 3))
+    assert repository.add_if_absent(7, 2)[1] is False
+    with pytest.raises(IntegrityError):
+        repository.create(1, 999)
+
+    before = repository.get_all()
+    repository.remove_by_product(1)
+    assert len(repository.get_all()) == 20 and repository.get_all().version != before.version
+
+
+def test_listing_version_tells_apart_shard_states_with_the_same_total(workdir):
+    db = DatabaseConnection('db.json')
+    repository = ShardedFavoriteRepository(db, SHARDS)
+    users = {}
+    for user_id in range(1, 100):
+        users.setdefault(repository.ring.node_for(user_id), user_id)
+
+    repository.create(users[SHARDS[0]], 1)
+    before = repository.get_all()
+    for path in SHARDS:  # Los shards se cierran (p. ej. DATABASE_MAX_OPEN) y se reabren
+        DatabaseConnection._instances.pop(path)
+    repository = ShardedFavoriteRepository(db, SHARDS)
+    repository.create(users[SHARDS[1]], 1)
+
+    assert len(repository.get_all()) == 2
+    assert repository.get_all().version != before.version
+
+
+def test_deleting_a_product_cascades_to_every_shard(client, monkeypatch):
+    monkeypatch.setattr(sharded_favorite_repository, 'FAVORITES_SHARDS', SHARDS)
+    for user_id in range(1, 11):
+        assert client.post('/favorites', json={'user_id': user_id, 'product_id': 1}, headers=TOKEN).status_code == 201
+
+    assert len(client.get('/favorites', headers=TOKEN).get_json()) == 10
+    assert client.delete('/products/1', headers=TOKEN).status_code == 200
+    assert client.get('/favorites', headers=TOKEN).get_json() == []
+    assert stored_favorites('db.json') == []
+
+
+def test_rebalance_moves_only_reassigned_users(workdir):
+    db = DatabaseConnection('db.json')
+    favorites = [{'user_id': user_id, 'product_id': 1 + user_id % 5} for user_id in range(200)]
+    db.save_collection('favorites', favorites)
+
+    result = rebalance(['db.json'], SHARDS[:2])
+    assert result['moved'] == 200 and stored_favorites('db.json') == []
+    assert sum(result['shards'].values()) == 200
+
+    result = rebalance(SHARDS[:2], SHARDS)
+    assert 0 < result['moved'] < 200 * 0.6
+    repository = ShardedFavoriteRepository(db, SHARDS)
+    assert sorted(repository.get_all().to_list(), key=lambda f: f['user_id']) == favorites
+    assert all(repository.get_by_user(f['user_id']) == [f] for f in favorites)
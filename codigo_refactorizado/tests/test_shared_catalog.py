@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import uuid
+import pytest
+from utils.database_connection import DatabaseConnection
+from utils.shared_catalog import (
+    CatalogLoader, SharedCatalog, CatalogUnavailable, file_stamp, publish_catalog, publish_saved, unlink_catalog,
+)
+from repositories.product_repository import ProductStore
+
+TOKEN = {'Authorization': 'abcd1234'}
+
+
+@pytest.fixture
+def catalog_name():
+    name = f'test-catalog-{uuid.uuid4().hex[:8]}'
+    yield name
+    unlink_catalog(name)
+
+
+def load(path='db.json'):
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_in_worker(name, product_id, results):
+    results.put(SharedCatalog(name).current().collection('products').get_by_id(product_id))
+
+
+def test_catalog_reads_like_the_database(workdir, catalog_name):
+    data = load()
+    data['products'].append({'id': 500, 'name': 'Cap', 'price': 10, 'category': 'Men', 'tags': ['new']})
+    publish_catalog(catalog_name, data)
+    products = SharedCatalog(catalog_name).current().collection('products')
+    store = ProductStore(data['products'])
+
+    assert list(products) == data['products'] and len(products) == len(data['products'])
+    for product_id in range(600):  # db.json tiene IDs repetidos: gana el primero, como en el store
+        assert products.get_by_id(product_id) == store.snapshot().get_by_id(product_id)
+    assert products.get_by_id(500) == {'id': 500, 'name': 'Cap', 'price': 10, 'category': 'Men', 'tags': ['new']}
+    assert products.lookup('men') == store.lookup('MEN')
+    assert products.lookup('nothing') == [] and not products.has('nothing')
+
+
+def test_new_generation_is_picked_up_and_the_old_one_stays_readable(workdir, catalog_name):
+    catalog = SharedCatalog(catalog_name)
+    with pytest.raises(CatalogUnavailable):
+        catalog.current()
+
+    data = load()
+    publish_catalog(catalog_name, data)
+    first = catalog.current()
+    data['products'] = data['products'][:3]
+    assert publish_catalog(catalog_name, data) == 2
+
+    assert catalog.current().generation == 2 and len(catalog.current().collection('products')) == 3
+    assert first.generation == 1 and len(first.collection('products')) == len(load()['products'])
+
+
+def test_other_processes_read_the_published_catalog(workdir, catalog_name):
+    publish_catalog(catalog_name, load())
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    worker = context.Process(target=read_in_worker, args=(catalog_name, 2, results))
+    worker.start()
+    assert results.get(timeout=30)['name'] == 'Dress'
+    worker.join()
+
+
+@pytest.fixture
+def shared(catalog_name, monkeypatch):
+    import repositories.catalog_repository as catalog_repository
+    import utils.database_connection as database_connection
+    monkeypatch.setattr(catalog_repository, 'SHARED_CATALOG', catalog_name)
+    monkeypatch.setattr(database_connection, 'SHARED_CATALOG', catalog_name)
+    return catalog_name
+
+
+def test_api_reads_products_and_categories_from_the_catalog(client, shared):
+    catalog_name = shared
+    loader = CatalogLoader('db.json', catalog_name)
+    assert loader.refresh() and not loader.refresh()
+
+    response = client.get('/products', headers=TOKEN)
+    assert response.get_json() == load()['products']
+    assert client.get('/products/2', headers=TOKEN).get_json()['name'] == 'Dress'
+    assert client.get('/products?category=WOMEN', headers=TOKEN).get_json() == [
+        p for p in load()['products'] if p['category'].lower() == 'women'
+    ]
+    assert client.get('/categories/1', headers=TOKEN).status_code == 200
+    assert 'db.json' not in DatabaseConnection._instances  # Las lecturas no abrieron la base
+
+    created = client.post('/products', json={'name': 'Cap', 'category': 'men', 'price': 10.0}, headers=TOKEN)
+    product_id = created.get_json()['product']['id']
+    # El worker que escribió ya publicó: el cargador no repite la publicación
+    assert not loader.refresh()
+    assert client.get(f'/products/{product_id}', headers=TOKEN).get_json()['name'] == 'Cap'
+    etag = client.get('/products', headers=TOKEN).headers['ETag']
+    assert etag != response.headers['ETag'] and etag.endswith('-2"')
+    assert client.get('/products', headers={**TOKEN, 'If-None-Match': etag}).status_code == 304
+
+
+def test_writes_are_visible_in_the_catalog_when_they_return(client, shared):
+    publish_catalog(shared, load())
+    catalog = SharedCatalog(shared)  # Como otro worker, que no escribió
+
+    created = client.post('/products', json={'name': 'Cap', 'category': 'men', 'price': 10.0}, headers=TOKEN)
+    product_id = created.get_json()['product']['id']
+    assert catalog.current().collection('products').get_by_id(product_id)['name'] == 'Cap'
+    assert catalog.current().source == file_stamp('db.json')
+
+    client.patch(f'/products/{product_id}', json={'price': 12.0}, headers=TOKEN)
+    assert catalog.current().collection('products').get_by_id(product_id)['price'] == 12.0
+    client.delete(f'/products/{product_id}', headers=TOKEN)
+    assert catalog.current().collection('products').get_by_id(product_id) is None
+
+    generation = catalog.current().generation
+    client.post('/favorites', json={'user_id': 1, 'product_id': 2}, headers=TOKEN)
+    assert catalog.current().generation == generation  # Los favoritos no están en el catálogo
+
+
+def test_stale_writer_does_not_overwrite_a_newer_generation(workdir, catalog_name):
+    data = load()
+    stamp = file_stamp('db.json')
+    assert publish_saved(catalog_name, 'db.json', data, stamp) == 1
+    assert publish_saved(catalog_name, 'db.json', data, stamp) is None  # Ya publicado
+
+    newer = dict(data, products=data['products'][:3])
+    with open('db.json', 'w') as f:
+        json.dump(newer, f)
+    assert CatalogLoader('db.json', catalog_name).refresh()
+    assert publish_saved(catalog_name, 'db.json', data, stamp) is None  # El archivo ya cambió
+    assert len(SharedCatalog(catalog_name).current().collection('products')) == 3
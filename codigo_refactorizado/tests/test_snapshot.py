@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+import pytest
+from utils.database_connection import DatabaseConnection
+from utils.snapshot import VersionedCollection
+from repositories.product_repository import ProductRepository
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text(json.dumps({'products': [], 'categories': [{'id': 1, 'name': 'men'}], 'favorites': []}))
+    DatabaseConnection._instances.clear()
+    yield DatabaseConnection(str(path))
+    DatabaseConnection._instances.clear()
+
+
+def test_snapshot_is_not_affected_by_later_writes():
+    collection = VersionedCollection([{'id': 1}])
+    before = collection.snapshot()
+
+    collection.append({'id': 2})
+    after_append = collection.snapshot()
+    collection.replace([{'id': 3}])
+
+    assert before == [{'id': 1}]
+    assert after_append == [{'id': 1}, {'id': 2}]
+    assert collection.snapshot() == [{'id': 3}]
+    assert before.version < after_append.version < collection.snapshot().version
+
+
+def test_snapshot_indexing_respects_its_length():
+    collection = VersionedCollection([{'id': 1}])
+    snapshot = collection.snapshot()
+    collection.append({'id': 2})
+
+    assert snapshot[-1] == {'id': 1}
+    assert snapshot[:] == [{'id': 1}]
+    with pytest.raises(IndexError):
+        snapshot[1]
+
+
+def test_get_all_returns_same_snapshot_until_a_write(db):
+    repository = ProductRepository(db)
+    first = repository.get_all()
+    assert repository.get_all() is first
+
+    repository.create('Hat', 'men', 9.99)
+    assert repository.get_all() is not first
+    assert len(first) == 0
+
+
+def test_concurrent_readers_see_consistent_versions(db):
+    repository = ProductRepository(db)
+    writers, products_per_writer = 4, 25
+    errors = []
+    stop = threading.Event()
+
+    def writer(n):
+        for i in range(products_per_writer):
+            repository.create(f'product-{n}-{i}', 'men', float(i))
+
+    def reader():
+        last_version = -1
+        while not stop.is_set():
+            snapshot = repository.get_all()
+            items = snapshot.to_list()
+            # Versiones monótonas, snapshot estable y registros completos
+            if snapshot.version < last_version:
+                errors.append('version went backwards')
+            if items != snapshot.to_list() or len(items) != len(snapshot):
+                errors.append('snapshot changed while reading')
+            if any(set(p) != {'id', 'name', 'category', 'price'} for p in items):
+                errors.append('half-applied record')
+            last_version = snapshot.version
+            time.sleep(0)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writer_threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in readers + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    products = repository.get_all()
+    assert len(products) == writers * products_per_writer
+    # Los IDs no se repiten aunque los escritores sean concurrentes
+    assert len({p['id'] for p in products}) == len(products)
+    with open(db.json_file_path) as f:
+        assert len(json.load(f)['products']) == len(products)
+
+
+def test_id_index_is_consistent_across_snapshots():
+    collection = VersionedCollection([{'id': 1}, {'id': 2}])
+    old = collection.snapshot()
+    collection.append({'id': 3})
+    middle = collection.snapshot()
+    collection.replace([{'id': 3, 'name': 'new'}])
+
+    assert old.get_by_id(3) is None
+    assert middle.get_by_id(3) == {'id': 3}
+    assert collection.snapshot().get_by_id(3) == {'id': 3, 'name': 'new'}
+    assert collection.snapshot().get_by_id(1) is None
+    assert middle.get_many([3, 99, 1]) == [{'id': 3}, {'id': 1}]
+
+
+def test_deletes_keep_falsy_items():
+    collection = VersionedCollection([{}] + [{'id': n} for n in range(1, 1101)] + [{}])
+    collection.delete(1)
+    assert list(collection.snapshot()) == [{}] + [{'id': n} for n in range(2, 1101)] + [{}]
+
+    for item_id in range(2, 1101):  # Pasa el umbral: compacta las lápidas
+        collection.delete(item_id)
+    assert list(collection.snapshot()) == [{}, {}]
+    assert len(collection.snapshot()) == 2
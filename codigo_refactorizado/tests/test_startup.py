@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+from utils.binary_snapshot import load_snapshot, write_snapshot
+from notifications.subscribers.lazy_subscriber import LazySubscriber
+from notifications.events.base_event import BaseEvent
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_binary_snapshot_is_ignored_once_the_json_changes(tmp_path):
+    path = str(tmp_path / 'db.json')
+    with open(path, 'w') as f:
+        json.dump({'products': [{'id': 1}]}, f)
+    assert load_snapshot(path) is None
+
+    write_snapshot(path, {'products': [{'id': 1}]})
+    assert load_snapshot(path) == {'products': [{'id': 1}]}
+
+    with open(path, 'w') as f:
+        json.dump({'products': [{'id': 1}, {'id': 2}]}, f)
+    assert load_snapshot(path) is None
+
+
+def test_lazy_subscriber_is_built_on_first_event(tmp_path):
+    subscriber = LazySubscriber(
+        'notifications.subscribers.log_subscriber:LogSubscriber', str(tmp_path / 'audit.log')
+    )
+    assert subscriber._subscriber is None
+    subscriber.handle(BaseEvent({'x': 1}))
+    assert subscriber._subscriber is not None
+    assert (tmp_path / 'audit.log').read_text().count('\n') == 1
+
+
+def test_importing_app_module_does_not_build_the_app():
+    code = 'import sys, app; print("flask" in sys.modules, "app" in vars(app))'
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=PROJECT_DIR,
+        capture_output=True, text=True, check=True, timeout=30
+    )
+    assert result.stdout.split() == ['False', 'False']
@@ -1,2 +1,30 @@
-from .database_connection import DatabaseConnection
-from .auth_decorator import require_auth, is_valid_token
+"""
+Utilidades compartidas.
+
+Los nombres se importan al usarlos por primera vez (ver lazy_exports.py).
+"""
+
+from .lazy_exports import lazy_exports
+
+_EXPORTS = {
+    'DatabaseConnection': '.database_connection',
+    'ConnectionClosedError': '.database_connection',
+    'ConnectionRegistry': '.connection_registry',
+    'require_auth': '.auth_decorator',
+    'is_valid_token': '.auth_decorator',
+    'SamplingProfiler': '.profiler',
+    'init_profiling': '.profiler',
+    'ResponseCompressor': '.compression',
+    'init_compression': '.compression',
+    'CollectionSnapshot': '.snapshot',
+    'VersionedCollection': '.snapshot',
+    'IndexedCollection': '.indexed_collection',
+    'ChangeLog': '.change_log',
+    'GroupCommitWriter': '.group_commit',
+    'AdjacencyStore': '.adjacency_store',
+    'HashRing': '.hash_ring',
+    'FileWatcher': '.file_watcher',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_exports(globals(), _EXPORTS)
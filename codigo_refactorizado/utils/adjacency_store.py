@@ -0,0 +1,164 @@
+"""
+Store de pares (izquierda, derecha) como lista de adyacencia.
+
+Pensado para relaciones muchos-a-muchos como los favoritos
+(user_id -> product_id): cada par existe una sola vez y se mantiene un
+índice en cada sentido, por lo que agregar, consultar y borrar un par son
+O(1) y listar los pares de un lado es O(k).
+
+Implementa la misma interfaz que VersionedCollection (snapshot, version,
+append, replace) para que DatabaseConnection lo trate igual; el listado
+completo se materializa una vez por versión.
+"""
+
+import threading
+from .snapshot import CollectionSnapshot
+
+
+class AdjacencyStore:
+    """
+    Relación sin duplicados indexada en ambos sentidos.
+
+    Las subclases definen LEFT_KEY y RIGHT_KEY (los campos del par). Los
+    métodos de escritura se llaman con el lock de escritura de la base.
+    """
+
+    LEFT_KEY = None
+    RIGHT_KEY = None
+
+    def __init__(self, items=(), version=0):
+        self._records = {}  # (izquierda, derecha) -> registro, en orden de inserción
+        self._by_left = {}  # izquierda -> {derecha: registro}
+        self._by_right = {}  # derecha -> {izquierda: registro}
+        self._version = version
+        self._snapshot = None
+        self._lock = threading.Lock()
+        items = list(items)
+        for item in items:
+            self._add(item)
+        # Lista de origen (puede tener pares repetidos) y su versión, para
+        # que sync() reconozca en O(n) sin índices que el archivo no cambió
+        self._source = (version, items)
+
+    # ============ Lectura (sin lock de la base) ============
+
+    @property
+    def version(self):
+        return self._version
+
+    def snapshot(self):
+        """Listado completo como snapshot; se materializa una vez por versión."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        with self._lock:
+            items = list(self._records.values())
+            snapshot = CollectionSnapshot(items, len(items), self._version)
+        self._snapshot = snapshot
+        return snapshot
+
+    def contains(self, left, right):
+        return (left, right) in self._records
+
+    def get(self, left, right):
+        return self._records.get((left, right))
+
+    def by_left(self, left):
+        """Registros de un valor izquierdo (p. ej. favoritos de un usuario)."""
+        return list(self._by_left.get(left, {}).values())
+
+    def by_right(self, right):
+        """Registros de un valor derecho (p. ej. usuarios con un producto)."""
+        return list(self._by_right.get(right, {}).values())
+
+    def __len__(self):
+        return len(self._records)
+
+    # ============ Escritura (con el lock de escritura de la base) ============
+
+    def add(self, left, right, version=None):
+        """Agrega el par si no existe; retorna [registro] o [] si ya estaba."""
+        return self.append({self.LEFT_KEY: left, self.RIGHT_KEY: right}, version)
+
+    def append(self, item, version=None):
+        with self._lock:
+            added = self._add(item)
+            if added:
+                self._bump(version)
+        return [item] if added else []
+
+    def discard(self, left, right, version=None):
+        """Elimina el par; retorna [registro] o [] si no existía."""
+        with self._lock:
+            record = self._records.pop((left, right), None)
+            if record is None:
+                return []
+            self._unlink(self._by_left, left, right)
+            self._unlink(self._by_right, right, left)
+            self._bump(version)
+        return [record]
+
+    def discard_right(self, right, version=None):
+        """Elimina todos los pares de un valor derecho; retorna los registros."""
+        removed = []
+        for record in self.by_right(right):
+            removed += self.discard(record[self.LEFT_KEY], right, version)
+        return removed
+
+    def replace(self, items, version=None):
+        with self._lock:
+            self._records, self._by_left, self._by_right = {}, {}, {}
+            for item in items:
+                self._add(item)
+            self._bump(version)
+
+    def sync(self, items, version=None):
+        """
+        Lleva la relación a `items` agregando y quitando solo los pares que
+        difieren (p. ej. al recargar el archivo), con una sola versión nueva.
+
+        Returns:
+            Lista de (op, registros) aplicados; vacía si no hubo cambios.
+        """
+        items = list(items)
+        source_version, source = self._source
+        if (source_version == self._version and source == items) or self.snapshot() == items:
+            return []
+        new = {}
+        for item in items:
+            new.setdefault((item[self.LEFT_KEY], item[self.RIGHT_KEY]), item)
+        with self._lock:
+            removed = [record for key, record in self._records.items() if new.get(key) != record]
+            added = [item for key, item in new.items() if self._records.get(key) != item]
+            if not removed and not added:
+                return []
+            for record in removed:
+                left, right = record[self.LEFT_KEY], record[self.RIGHT_KEY]
+                del self._records[(left, right)]
+                self._unlink(self._by_left, left, right)
+                self._unlink(self._by_right, right, left)
+            for item in added:
+                self._add(item)
+            self._bump(version)
+            self._source = (self._version, items)
+        return [(op, records) for op, records in (('delete', removed), ('insert', added)) if records]
+
+    def _add(self, item):
+        left, right = item[self.LEFT_KEY], item[self.RIGHT_KEY]
+        if (left, right) in self._records:
+            return False
+        self._records[(left, right)] = item
+        self._by_left.setdefault(left, {})[right] = item
+        self._by_right.setdefault(right, {})[left] = item
+        return True
+
+    @staticmethod
+    def _unlink(index, key, other):
+        entries = index.get(key)
+        if entries is not None:
+            entries.pop(other, None)
+            if not entries:
+                del index[key]
+
+    def _bump(self, version):
+        self._version = self._version + 1 if version is None else version
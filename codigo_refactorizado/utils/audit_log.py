@@ -0,0 +1,323 @@
+"""
+Registro de auditoría con rotación, segmentos comprimidos e índice.
+
+Las entradas (una línea JSON con 'logged_at' y 'event_type') se agregan al
+archivo activo (`audit.log`). Cuando supera `max_bytes` o su primera
+entrada tiene más de `max_age` segundos, se rota a un segmento:
+
+- `audit.log.000001.gz`: las mismas líneas en bloques de ~`block_size`
+  bytes, cada bloque un miembro gzip independiente (el archivo completo
+  sigue siendo un .gz válido para zcat/zgrep).
+- `audit.log.000001.idx`: índice disperso en JSON con el rango de tiempo y
+  los tipos de evento del segmento y de cada bloque, y la posición del
+  bloque en el .gz.
+
+`query()` usa los índices para descartar segmentos y bloques y solo
+descomprime los bloques que pueden tener entradas que coincidan.
+
+Los tiempos son strings ISO 8601 (como `datetime.isoformat()`) y se
+comparan como texto: `since` es inclusivo y `until` exclusivo.
+"""
+
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from config.settings import AUDIT_MAX_BYTES, AUDIT_MAX_AGE, AUDIT_BLOCK_SIZE, AUDIT_COMPRESSION_LEVEL
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se sincronizan los hilos del proceso
+    fcntl = None
+
+INDEX_FORMAT = 1
+SEGMENT_PATTERN = re.compile(r'\.(\d{6})\.gz$')
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def audit_log(path, **options):
+    """
+    AuditLog compartido por ruta (los suscriptores y el endpoint usan el mismo).
+
+    Las opciones que no se pasan salen de la configuración (AUDIT_*), así
+    no importa quién lo pida primero. Pedir la misma ruta con opciones
+    distintas a las de la instancia ya creada es un error (ValueError).
+    """
+    options = {
+        'max_bytes': AUDIT_MAX_BYTES, 'max_age': AUDIT_MAX_AGE,
+        'block_size': AUDIT_BLOCK_SIZE, 'compression_level': AUDIT_COMPRESSION_LEVEL,
+        **options,
+    }
+    key = os.path.abspath(path)
+    with _instances_lock:
+        log = _instances.get(key)
+        if log is None:
+            log = _instances[key] = AuditLog(key, **options)
+        elif log.options != options:
+            raise ValueError(f'{key} is already open with {log.options}, not {options}')
+        return log
+
+
+class AuditLog:
+    """
+    Args:
+        path: Archivo activo.
+        max_bytes: Tamaño que dispara la rotación (None: sin límite).
+        max_age: Segundos desde la primera entrada que disparan la rotación (None: sin límite).
+        block_size: Bytes sin comprimir por bloque de un segmento.
+        compression_level: Nivel de gzip (1 a 9).
+    """
+
+    def __init__(self, path, max_bytes=64 * 2 ** 20, max_age=None, block_size=256 * 1024, compression_level=6):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.block_size = block_size
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._first_logged = None  # (inodo, logged_at de la primera entrada) del archivo activo
+        self._indexes = {}         # ruta del .idx -> (mtime_ns, índice)
+
+    @property
+    def options(self):
+        return {'max_bytes': self.max_bytes, 'max_age': self.max_age,
+                'block_size': self.block_size, 'compression_level': self.compression_level}
+
+    @property
+    def rotating_path(self):
+        return self.path + '.rotating'
+
+    # ============ Escritura ============
+
+    def append(self, entry):
+        """Agrega una entrada (dict con 'logged_at' y 'event_type') y rota si corresponde."""
+        line = json.dumps(entry) + '\n'
+        with self._locked():
+            with open(self.path, 'a') as f:
+                f.write(line)
+                size = f.tell()
+            if self._should_rotate(size, entry.get('logged_at')):
+                self._rotate()
+
+    def rotate(self):
+        """Rota el archivo activo a un segmento (si tiene entradas)."""
+        with self._locked():
+            self._rotate()
+
+    def _should_rotate(self, size, logged_at):
+        if self.max_bytes is not None and size >= self.max_bytes:
+            return True
+        if self.max_age is None:
+            return False
+        first = self._first_entry_time()
+        if first is None or logged_at is None:
+            return False
+        try:
+            elapsed = datetime.fromisoformat(logged_at) - datetime.fromisoformat(first)
+        except ValueError:
+            return False
+        return elapsed.total_seconds() >= self.max_age
+
+    def _first_entry_time(self):
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+        if self._first_logged is None or self._first_logged[0] != inode:
+            with open(self.path) as f:
+                first = json.loads(f.readline() or '{}').get('logged_at')
+            self._first_logged = (inode, first)
+        return self._first_logged[1]
+
+    def _rotate(self):
+        # Primero se renombra: si el proceso muere al comprimir, la próxima
+        # rotación termina el trabajo con el .rotating que quedó
+        if not os.path.exists(self.rotating_path):
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return
+            os.replace(self.path, self.rotating_path)
+        self._first_logged = None
+        self._write_segment(self.rotating_path, self._next_segment())
+        os.remove(self.rotating_path)
+
+    def _next_segment(self):
+        numbers = [int(SEGMENT_PATTERN.search(path).group(1)) for path in self.segments()]
+        return f'{self.path}.{max(numbers, default=0) + 1:06d}'
+
+    def _write_segment(self, source, base):
+        """Comprime `source` en `base`.gz por bloques y escribe `base`.idx."""
+        segment = {'format': INDEX_FORMAT, 'first': None, 'last': None, 'entries': 0,
+                   'event_types': set(), 'blocks': []}
+        with open(source, 'rb') as src, open(base + '.gz.tmp', 'wb') as out:
+            lines = []
+            size = 0
+            for line in src:
+                if not line.strip():
+                    continue
+                lines.append(line)
+                size += len(line)
+                if size >= self.block_size:
+                    self._write_block(out, lines, segment)
+                    lines, size = [], 0
+            if lines:
+                self._write_block(out, lines, segment)
+            out.flush()
+            os.fsync(out.fileno())
+        segment['event_types'] = sorted(segment['event_types'])
+        with open(base + '.idx.tmp', 'w') as f:
+            json.dump(segment, f, separators=(',', ':'))
+        # El .gz sin .idx no se consulta: se publica primero el .gz
+        os.replace(base + '.gz.tmp', base + '.gz')
+        os.replace(base + '.idx.tmp', base + '.idx')
+
+    def _write_block(self, out, lines, segment):
+        first = last = None
+        types = set()
+        for line in lines:
+            entry = json.loads(line)
+            logged_at = entry.get('logged_at')
+            if logged_at is not None:
+                first = logged_at if first is None else min(first, logged_at)
+                last = logged_at if last is None else max(last, logged_at)
+            types.add(entry.get('event_type'))
+        data = gzip.compress(b''.join(lines), self.compression_level)
+        segment['blocks'].append([out.tell(), len(data), first, last, sorted(types, key=str)])
+        out.write(data)
+        segment['entries'] += len(lines)
+        segment['event_types'] |= types
+        if first is not None:
+            segment['first'] = first if segment['first'] is None else min(segment['first'], first)
+            segment['last'] = last if segment['last'] is None else max(segment['last'], last)
+
+    def _locked(self):
+        return _FileLock(self._lock, self.path + '.lock')
+
+    # ============ Consulta ============
+
+    def segments(self):
+        """Rutas de los segmentos (.gz), del más antiguo al más nuevo."""
+        paths = [p for p in glob.glob(glob.escape(self.path) + '.*.gz') if SEGMENT_PATTERN.search(p)]
+        return sorted(paths)
+
+    def query(self, event_type=None, since=None, until=None):
+        """
+        Itera las líneas JSON (str, sin salto de línea) que coinciden, de la
+        más antigua a la más nueva.
+        """
+        seen = set()
+        for path in self.segments():
+            seen.add(path)
+            yield from self._query_segment(path, event_type, since, until)
+        # Con el lock: los segmentos que rotaron mientras tanto y el archivo
+        # activo quedan fijados (un archivo abierto se sigue leyendo aunque
+        # después se rote)
+        with self._locked():
+            late = [path for path in self.segments() if path not in seen]
+            files = []
+            for path in (self.rotating_path, self.path):
+                try:
+                    files.append(open(path))
+                except FileNotFoundError:
+                    continue
+        try:
+            for path in late:
+                yield from self._query_segment(path, event_type, since, until)
+            # Lo que aún no se rotó se recorre completo
+            for f in files:
+                yield from _matching(f, event_type, since, until)
+        finally:
+            for f in files:
+                f.close()
+
+    def _query_segment(self, path, event_type, since, until):
+        index = self._index(path[:-len('.gz')] + '.idx')
+        if index is None or not _overlaps(index['first'], index['last'], since, until):
+            return
+        if event_type is not None and event_type not in index['event_types']:
+            return
+        with open(path, 'rb') as f:
+            for offset, length, first, last, types in index['blocks']:
+                if not _overlaps(first, last, since, until):
+                    continue
+                if event_type is not None and event_type not in types:
+                    continue
+                f.seek(offset)
+                block = gzip.decompress(f.read(length))
+                yield from _matching(block.decode().splitlines(), event_type, since, until)
+
+    def _index(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._indexes.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path) as f:
+                index = json.load(f)
+            if index.get('format') != INDEX_FORMAT:
+                return None
+            cached = self._indexes[path] = (mtime, index)
+        return cached[1]
+
+
+class _FileLock:
+    """Lock del proceso más flock(2) sobre `path` para los demás procesos."""
+
+    def __init__(self, lock, path):
+        self.lock = lock
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        if fcntl is not None:
+            try:
+                self.file = open(self.path, 'a')
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+            except BaseException:
+                self.__exit__(None, None, None)
+                raise
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            self.file.close()  # Libera el flock
+            self.file = None
+        self.lock.release()
+
+
+def _overlaps(first, last, since, until):
+    if first is None:
+        return True  # Sin tiempos: no se puede descartar
+    if since is not None and last < since:
+        return False
+    if until is not None and first >= until:
+        return False
+    return True
+
+
+def _matching(lines, event_type, since, until):
+    # Una entrada del tipo buscado contiene su nombre tal como lo serializa
+    # json.dumps: se descartan las demás sin parsearlas
+    needle = json.dumps(event_type) if event_type is not None else None
+    for line in lines:
+        if needle is not None and needle not in line:
+            continue
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        entry = json.loads(line)
+        if event_type is not None and entry.get('event_type') != event_type:
+            continue
+        logged_at = entry.get('logged_at')
+        if logged_at is not None:
+            if since is not None and logged_at < since:
+                continue
+            if until is not None and logged_at >= until:
+                continue
+        yield line
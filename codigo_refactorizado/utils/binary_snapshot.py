@@ -0,0 +1,68 @@
+"""
+Snapshot binario opcional de db.json para arrancar más rápido.
+
+Guarda los mismos datos que db.json en formato marshal (mucho más rápido
+de leer que JSON) en `<db.json>.snapshot`, junto con el tamaño y la fecha
+de modificación del JSON del que sale. Al cargar, si el JSON cambió, la
+versión de Python no coincide o el archivo está dañado, se ignora y se
+vuelve a leer el JSON; db.json sigue siendo la fuente de verdad.
+
+Construirlo antes de levantar workers:
+
+    python -m utils.binary_snapshot db.json
+"""
+
+import marshal
+import os
+import sys
+
+FORMAT = 'db-snapshot-1'
+SUFFIX = '.snapshot'
+
+
+def snapshot_path(json_path):
+    return json_path + SUFFIX
+
+
+def _stamp(json_path):
+    stat = os.stat(json_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_snapshot(json_path):
+    """Retorna los datos del snapshot si corresponde al JSON actual, o None."""
+    try:
+        with open(snapshot_path(json_path), 'rb') as f:
+            # loads sobre los bytes: marshal.load sobre el archivo lee de a poco
+            header, data = marshal.loads(f.read())
+        stamp = _stamp(json_path)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if header != (FORMAT, tuple(sys.version_info[:2]), stamp):
+        return None
+    return data
+
+
+def write_snapshot(json_path, data):
+    """Escribe (atómicamente) el snapshot de `data` para el JSON actual."""
+    path = snapshot_path(json_path)
+    header = (FORMAT, tuple(sys.version_info[:2]), _stamp(json_path))
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(marshal.dumps((header, data)))
+    os.replace(tmp_path, path)
+
+
+def main():
+    import json
+
+    if len(sys.argv) != 2:
+        sys.exit('usage: python -m utils.binary_snapshot <db.json>')
+    json_path = sys.argv[1]
+    with open(json_path) as f:
+        write_snapshot(json_path, json.load(f))
+    print(f'{snapshot_path(json_path)} written')
+
+
+if __name__ == '__main__':
+    main()
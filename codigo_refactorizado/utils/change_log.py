@@ -0,0 +1,65 @@
+"""
+Registro de cambios (change-data-capture) de la base de datos.
+
+Cada mutación recibe una versión monótona a nivel de base; la versión de
+una colección es la de su último cambio, por lo que también es monótona.
+El registro guarda las últimas `max_entries` entradas para que los
+clientes pidan solo los deltas (`GET /changes?since=<version>`).
+
+Las versiones viven en memoria: empiezan de cero en cada carga de la base
+y cada proceso (worker) tiene las suyas. Por eso el registro tiene una
+`epoch` aleatoria; una versión solo tiene sentido junto a su época.
+"""
+
+import threading
+import uuid
+from collections import deque
+
+
+class ChangeLog:
+    """Entradas recientes con espera (long-poll) de cambios nuevos."""
+
+    def __init__(self, max_entries=10000):
+        self._entries = deque(maxlen=max_entries)
+        self._condition = threading.Condition()
+        self.version = 0
+        self.epoch = uuid.uuid4().hex[:12]
+
+    def record(self, version, collection, op, items=(None,)):
+        """
+        Registra una mutación ya publicada y despierta a quienes esperan.
+
+        Una misma mutación puede afectar varios elementos (p. ej. un borrado
+        por filtro): todos comparten la versión.
+        """
+        with self._condition:
+            for item in items:
+                self._entries.append({'version': version, 'collection': collection, 'op': op, 'item': item})
+            self.version = version
+            self._condition.notify_all()
+
+    def since(self, version, collections=None, epoch=None):
+        """
+        Retorna (entradas posteriores a `version`, truncated).
+
+        truncated=True significa que el cliente debe recargar las colecciones
+        completas: las entradas que necesita ya salieron del registro, o su
+        versión es de otra ejecución del servidor (`epoch` distinta).
+        """
+        if epoch is not None and epoch != self.epoch:
+            return [], True
+        with self._condition:
+            entries = list(self._entries)
+            current = self.version
+        oldest = entries[0]['version'] if entries else current + 1
+        truncated = version > current or (version < oldest - 1 and version < current)
+        changes = [
+            e for e in entries
+            if e['version'] > version and (collections is None or e['collection'] in collections)
+        ]
+        return changes, truncated
+
+    def wait(self, version, timeout):
+        """Bloquea hasta que haya cambios posteriores a `version` o venza el timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.version != version, timeout)
@@ -0,0 +1,119 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding (gzip o deflate).
+
+Dos caminos:
+
+- Listados completos de una colección (ver utils/conditional.py): el
+  cuerpo JSON y sus versiones comprimidas se calculan una sola vez por
+  ETag (época y versión de la colección) y se reutilizan hasta la próxima
+  escritura.
+- Cualquier otra respuesta JSON o de texto: se comprime al vuelo en
+  after_request si supera `min_size`.
+
+Si la compresión está deshabilitada no se registra ningún hook en la app.
+"""
+
+import gzip
+import json
+import threading
+import weakref
+import zlib
+from flask import Response, request
+
+ENCODINGS = ('gzip', 'deflate')
+COMPRESSIBLE_TYPES = ('application/json', 'text/plain', 'text/html')
+
+_compressors = weakref.WeakSet()  # Para invalidar sus cachés (ver invalidate_listings)
+
+
+class ResponseCompressor:
+    """Negocia, comprime y cachea cuerpos comprimidos por versión."""
+
+    def __init__(self, level=6, min_size=1024, cache=True):
+        self.level = level
+        self.min_size = min_size
+        self.cache = cache
+        self._bodies = {}  # colección -> (ETag, {codificación: bytes})
+        self._lock = threading.Lock()
+        _compressors.add(self)
+
+    # ============ Negociación ============
+
+    def encoding_for(self, accept_encodings):
+        """Mejor codificación aceptada por el cliente (o None)."""
+        return accept_encodings.best_match(ENCODINGS)
+
+    def compress(self, data, encoding):
+        if encoding == 'gzip':
+            # mtime fijo: el mismo contenido produce siempre los mismos bytes
+            return gzip.compress(data, self.level, mtime=0)
+        return zlib.compress(data, self.level)
+
+    # ============ Listados cacheados por versión ============
+
+    def collection_response(self, collection_name, etag, snapshot, headers):
+        """Respuesta del listado completo, con el cuerpo cacheado por ETag."""
+        encoding = self.encoding_for(request.accept_encodings)
+        bodies = self._bodies_for(collection_name, etag) if self.cache else {}
+        data = self._body(bodies, snapshot, None)
+        headers = {**headers, 'Vary': 'Accept-Encoding'}
+        if encoding is not None and len(data) >= self.min_size:
+            data = self._body(bodies, snapshot, encoding)
+            headers['Content-Encoding'] = encoding
+        return Response(data, status=200, headers=headers, mimetype='application/json')
+
+    def _body(self, bodies, snapshot, encoding):
+        body = bodies.get(encoding)
+        if body is None:
+            if encoding is None:
+                body = (json.dumps(list(snapshot)) + '\n').encode()
+            else:
+                body = self.compress(self._body(bodies, snapshot, None), encoding)
+            bodies[encoding] = body
+        return body
+
+    def _bodies_for(self, collection_name, etag):
+        """Cuerpos de esa ETag; al cambiar la ETag se descartan los viejos."""
+        with self._lock:
+            cached = self._bodies.get(collection_name)
+            if cached is None or cached[0] != etag:
+                cached = (etag, {})
+                self._bodies[collection_name] = cached
+            return cached[1]
+
+    def invalidate(self, collection_names):
+        """Descarta los cuerpos cacheados de esas colecciones."""
+        with self._lock:
+            for name in collection_names:
+                self._bodies.pop(name, None)
+
+    # ============ Compresión al vuelo ============
+
+    def after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.encoding_for(request.accept_encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.set_data(self.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def invalidate_listings(collection_names):
+    """Descarta los listados cacheados de esas colecciones en todas las apps."""
+    for compressor in list(_compressors):
+        compressor.invalidate(collection_names)
+
+
+def init_compression(app, compressor):
+    """Registra el compresor en la app (lo usa conditional_get) y su hook."""
+    app.extensions['compression'] = compressor
+    app.after_request(compressor.after_request)
+    return compressor
@@ -0,0 +1,46 @@
+"""
+GET condicional basado en la versión de la colección.
+
+La ETag de una respuesta es `<colección>-<época>-<versión>`: mientras la
+colección no cambie, un cliente que envía `If-None-Match` recibe un 304
+sin cuerpo. La época identifica la carga de la base (ver ChangeLog): las
+versiones vuelven a empezar en cada arranque y cada worker tiene las
+suyas, así que una ETag de otra ejecución nunca coincide. Con el catálogo
+compartido, la época es la del catálogo y la versión su generación.
+
+La ETag es débil (`W/"..."`): la misma versión se envía sin comprimir o
+comprimida según Accept-Encoding, y esas representaciones son equivalentes
+pero no idénticas byte a byte. Por eso el 304 también lleva
+`Vary: Accept-Encoding` cuando la compresión está habilitada.
+Los listados completos salen ya serializados (y comprimidos) del caché por
+versión de utils/compression.py cuando la compresión está habilitada.
+"""
+
+from flask import Response, current_app, request
+from werkzeug.http import quote_etag
+
+
+def collection_etag(repository, snapshot):
+    return f'{repository.COLLECTION_NAME}-{repository.epoch}-{snapshot.version}'
+
+
+def conditional_get(repository, snapshot, body=None):
+    """
+    Retorna la respuesta del recurso o un 304 si el cliente ya tiene la versión.
+
+    Args:
+        repository: Repositorio de la colección de la que sale la respuesta.
+        snapshot: Snapshot leído para armar la respuesta.
+        body: Función que arma el cuerpo; solo se llama si no hay 304 (por
+            defecto, todos los elementos del snapshot).
+    """
+    etag = collection_etag(repository, snapshot)
+    headers = {'ETag': quote_etag(etag, weak=True)}
+    compressor = current_app.extensions.get('compression')
+    if request.if_none_match.contains_weak(etag):
+        if compressor is not None:
+            headers['Vary'] = 'Accept-Encoding'
+        return Response(status=304, headers=headers)
+    if body is None and compressor is not None:
+        return compressor.collection_response(repository.COLLECTION_NAME, etag, snapshot, headers)
+    return (list(snapshot) if body is None else body()), 200, headers
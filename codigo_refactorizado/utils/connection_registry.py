@@ -0,0 +1,146 @@
+"""
+Registro acotado de conexiones abiertas (una por archivo de base).
+
+DatabaseConnection guarda aquí su instancia por ruta. Sin límites
+(DATABASE_MAX_OPEN y DATABASE_MAX_MEMORY en None) se comporta como el
+diccionario de siempre: cada archivo se carga una vez y queda en memoria.
+
+Con límites, p. ej. un archivo por tenant, las conexiones se ordenan por
+uso (LRU) y al pasarse de la cantidad o de la memoria estimada se cierran
+las menos usadas:
+
+- Nunca se cierra una conexión con referencias activas (peticiones en
+  curso que la abrieron con `DatabaseConnection.session()`).
+- Antes de cerrarla se persiste lo que haya quedado sin guardar.
+- La próxima vez que se pida esa ruta se vuelve a cargar del archivo (o
+  de su snapshot binario).
+
+La memoria de cada conexión se estima con el tamaño de su JSON en disco;
+en Python los objetos ocupan varias veces eso, pero la proporción es
+estable y alcanza para acotar.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class ConnectionRegistry:
+    """Conexiones por ruta con desalojo LRU y conteo de referencias."""
+
+    def __init__(self, max_open=None, max_bytes=None):
+        self.max_open = max_open
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries = OrderedDict()  # ruta -> conexión, la menos usada primero
+        self._refs = {}  # ruta -> referencias activas
+        self._closing = {}  # ruta -> Event, mientras se persiste para desalojarla
+        self._lock = threading.Lock()
+
+    # ============ Acceso ============
+
+    def get_or_create(self, path, create):
+        """Conexión registrada para `path` (o la que crea `create()`)."""
+        while True:
+            with self._lock:
+                closing = self._closing.get(path)
+                if closing is None:
+                    instance = self._entries.get(path)
+                    if instance is None:
+                        instance = self._entries[path] = create()
+                    else:
+                        self._entries.move_to_end(path)
+                    return instance
+            # Se está cerrando: esperar a que persista antes de recargarla
+            closing.wait()
+
+    def acquire(self, path, instance):
+        """Suma una referencia; False si `instance` ya no es la registrada."""
+        with self._lock:
+            if self._entries.get(path) is not instance:
+                return False
+            self._refs[path] = self._refs.get(path, 0) + 1
+            return True
+
+    def release(self, path):
+        with self._lock:
+            refs = self._refs.get(path, 0) - 1
+            if refs > 0:
+                self._refs[path] = refs
+            else:
+                self._refs.pop(path, None)
+        self.trim()
+
+    # ============ Desalojo ============
+
+    def total_bytes(self):
+        return sum(instance.memory_bytes for instance in list(self._entries.values()))
+
+    def stats(self):
+        """Memoria estimada y referencias de cada conexión abierta."""
+        with self._lock:
+            return {
+                path: {'bytes': instance.memory_bytes, 'refs': self._refs.get(path, 0)}
+                for path, instance in self._entries.items()
+            }
+
+    def trim(self, keep=None):
+        """
+        Cierra conexiones sin referencias, de la menos usada en adelante,
+        hasta volver dentro de los límites. `keep` (la ruta recién abierta)
+        no se desaloja.
+        """
+        if self.max_open is None and self.max_bytes is None:
+            return
+        with self._lock:
+            victims = []
+            count = len(self._entries)
+            size = self.total_bytes() if self.max_bytes is not None else 0
+            for path, instance in self._entries.items():
+                if not self._over(count, size):
+                    break
+                if path == keep or self._refs.get(path):
+                    continue
+                victims.append((path, instance))
+                count, size = count - 1, size - instance.memory_bytes
+            for path, _ in victims:
+                del self._entries[path]
+                self._closing[path] = threading.Event()
+
+        # Persistir fuera del lock: close() espera el lock de escritura de la
+        # conexión y un escritor puede estar abriendo otra conexión.
+        for path, instance in victims:
+            try:
+                instance.close()
+            except Exception:
+                # No se pudo persistir: la conexión sigue abierta y registrada
+                instance.reopen()
+                with self._lock:
+                    self._entries[path] = instance
+            else:
+                self.evictions += 1
+            finally:
+                with self._lock:
+                    self._closing.pop(path).set()
+
+    def _over(self, count, size):
+        return ((self.max_open is not None and count > self.max_open)
+                or (self.max_bytes is not None and size > self.max_bytes))
+
+    # ============ Compatibilidad con el diccionario anterior ============
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def pop(self, path, default=None):
+        """Olvida la conexión sin persistir (tests y benchmarks)."""
+        with self._lock:
+            self._refs.pop(path, None)
+            return self._entries.pop(path, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._refs.clear()
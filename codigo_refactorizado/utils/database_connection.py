@@ -1,70 +1,493 @@
-import json
-
-
-class DatabaseConnection:
-    """
-    Clase Singleton para manejar la conexión a la base de datos JSON.
-    
-    Solo proporciona operaciones genéricas de lectura/escritura.
-    """
-    
-    _instances = {}
-
-    def __new__(cls, json_file_path):
-        """
-        Controla la creación de instancias.
-        Retorna la instancia existente o crea una nueva.
-        """
-        if json_file_path not in cls._instances:
-            instance = super().__new__(cls)
-            instance._initialized = False
-            cls._instances[json_file_path] = instance
-        return cls._instances[json_file_path]
-
-    def __init__(self, json_file_path):
-        if self._initialized:
-            return
-            
-        self.json_file_path = json_file_path
-        self.data = None
-        self._initialized = True
-        self._connect()
-
-    def _connect(self):
-        """Carga los datos del archivo JSON."""
-        try:
-            with open(self.json_file_path, 'r') as json_file:
-                self.data = json.load(json_file)
-        except FileNotFoundError:
-            self.data = {}
-            self._save()
-
-    def _save(self):
-        """Guarda los datos en el archivo JSON."""
-        with open(self.json_file_path, 'w') as json_file:
-            json.dump(self.data, json_file, indent=4)
-
-    # ============ Operaciones Genéricas ============
-    
-    def get_collection(self, collection_name):
-        """
-        Obtiene una colección por nombre.
-        
-        Args:
-            collection_name: Nombre de la colección ('products', 'categories', etc.)
-        
-        Returns:
-            Lista de elementos de la colección.
-        """
-        return self.data.get(collection_name, [])
-
-    def save_collection(self, collection_name, items):
-        """
-        Guarda una colección completa.
-        
-        Args:
-            collection_name: Nombre de la colección.
-            items: Lista de elementos a guardar.
-        """
-        self.data[collection_name] = items
-        self._save()
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from .snapshot import VersionedCollection
+from .change_log import ChangeLog
+from .group_commit import GroupCommitWriter
+from .binary_snapshot import load_snapshot, snapshot_path, write_snapshot
+from .connection_registry import ConnectionRegistry
+from .file_watcher import FileWatcher
+from .shared_catalog import publish_saved
+from config.settings import (
+    DATABASE_FILE, SHARED_CATALOG, CHANGE_LOG_SIZE, DATABASE_FSYNC, DATABASE_BINARY_SNAPSHOT,
+    DATABASE_MAX_OPEN, DATABASE_MAX_MEMORY, DATABASE_WATCH, DATABASE_WATCH_INTERVAL,
+    GROUP_COMMIT_ENABLED, GROUP_COMMIT_WINDOW, GROUP_COMMIT_MAX_BATCH,
+)
+
+SEQUENCES_KEY = '_sequences'
+CATALOG_COLLECTIONS = ('products', 'categories')  # Las del catálogo compartido
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionClosedError(RuntimeError):
+    """Escritura sobre una conexión que el registro ya desalojó."""
+
+
+class DatabaseConnection:
+    """
+    Clase Singleton para manejar la conexión a la base de datos JSON.
+    
+    Solo proporciona operaciones genéricas de lectura/escritura.
+
+    Las lecturas retornan snapshots inmutables sin tomar locks; las
+    escrituras se serializan con `write_lock` y publican versiones nuevas
+    (ver utils/snapshot.py). Cada mutación incrementa la versión de su
+    colección y queda en `changes` (ver utils/change_log.py).
+
+    Junto a las colecciones se guarda `_sequences`, el próximo ID de cada
+    una, para que los IDs de registros borrados no se reutilicen tras
+    reiniciar.
+
+    Las instancias viven en un registro acotado (ver
+    utils/connection_registry.py): con límites configurados, las menos
+    usadas se cierran y se recargan al volver a pedirlas.
+
+    Si el archivo se modifica desde afuera (DATABASE_WATCH), reload()
+    aplica solo las colecciones que cambiaron.
+
+    La persistencia ocurre al cerrar la transacción, fuera del lock, y con
+    group commit las escrituras concurrentes comparten una sola
+    reescritura del archivo (ver utils/group_commit.py).
+    """
+    
+    _instances = ConnectionRegistry(DATABASE_MAX_OPEN, DATABASE_MAX_MEMORY)
+
+    def __new__(cls, json_file_path):
+        """
+        Controla la creación de instancias.
+        Retorna la instancia existente o crea una nueva.
+        """
+        def create():
+            instance = super(DatabaseConnection, cls).__new__(cls)
+            instance._initialized = False
+            instance._init_lock = threading.Lock()
+            instance.memory_bytes = 0
+            return instance
+        return cls._instances.get_or_create(json_file_path, create)
+
+    def __init__(self, json_file_path):
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.json_file_path = json_file_path
+            self.write_lock = threading.RLock()
+            self._collections = {}
+            self.changes = ChangeLog(CHANGE_LOG_SIZE)
+            self.group_commit = (
+                GroupCommitWriter(self._save, GROUP_COMMIT_WINDOW, GROUP_COMMIT_MAX_BATCH)
+                if GROUP_COMMIT_ENABLED else None
+            )
+            self._file_lock = threading.Lock()
+            self._local = threading.local()
+            self._pending = False  # Cambios aplicados que aún no están en disco
+            self._closed = False
+            self._disk_stamp = None  # Estado del archivo tras la última lectura o escritura propia
+            self._watcher = None
+            self._watch_interval = None  # Se vigila el archivo (y cada cuánto)
+            # La base principal publica el catálogo compartido al guardar
+            self.catalog = SHARED_CATALOG if SHARED_CATALOG and json_file_path == DATABASE_FILE else None
+            self._connect()
+            self._initialized = True
+            if DATABASE_WATCH:
+                self.watch(DATABASE_WATCH_INTERVAL)
+        self._instances.trim(keep=json_file_path)
+
+    # ============ Ciclo de vida en el registro ============
+
+    @classmethod
+    def acquire(cls, json_file_path):
+        """Conexión con una referencia activa: no se desaloja hasta release()."""
+        while True:
+            instance = cls(json_file_path)
+            if cls._instances.acquire(json_file_path, instance):
+                return instance
+
+    def release(self):
+        self._instances.release(self.json_file_path)
+
+    @classmethod
+    @contextmanager
+    def session(cls, json_file_path):
+        """Bloque durante el cual la conexión no puede desalojarse."""
+        instance = cls.acquire(json_file_path)
+        try:
+            yield instance
+        finally:
+            instance.release()
+
+    def close(self):
+        """
+        Persiste lo pendiente y rechaza escrituras nuevas (la llama el
+        registro al desalojarla; espera a las transacciones en curso).
+        """
+        with self.write_lock:
+            self._closed = True
+            pending = self._pending
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if pending:
+            self._save()
+
+    def reopen(self):
+        """Vuelve a aceptar escrituras (y a vigilar el archivo) si close() falló."""
+        self._closed = False
+        if self._watch_interval is not None:
+            self.watch(self._watch_interval)
+
+    # ============ Cambios externos al archivo ============
+
+    def watch(self, interval=1.0):
+        """
+        Empieza a vigilar el archivo y a recargarlo cuando cambie (idempotente).
+        Si el hilo murió, lo reemplaza; si no puede arrancarlo lo registra
+        en el log y lo reintenta la próxima vez que se llame.
+        """
+        self._watch_interval = interval
+        if self._watcher is None or not self._watcher.alive:
+            try:
+                self._watcher = FileWatcher(self.json_file_path, self.reload, interval).start()
+            except Exception:
+                logger.exception('could not watch %s', self.json_file_path)
+                self._watcher = None
+        return self._watcher
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.json_file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def reload(self):
+        """
+        Aplica los cambios hechos al archivo fuera de la app.
+
+        Si el archivo no cambió desde la última lectura o escritura propia
+        solo cuesta un stat. Si cambió, se parsea sin tomar locks y cada
+        colección se sincroniza con sync(): las que no cambiaron quedan
+        intactas (mismo snapshot, misma versión y ETag) y las que sí
+        publican una versión nueva con los cambios mínimos, registrados en
+        `changes`. Las ETags y los cuerpos cacheados dependen de la
+        versión, así que se invalidan solos. Los lectores nunca esperan;
+        los escritores solo mientras se aplican los cambios.
+
+        Si hay escrituras propias aplicadas que todavía no están en disco
+        (group commit en curso) no se recarga: esas escrituras ya se
+        confirmaron al cliente y reescriben el archivo, así que ganan.
+
+        Si algo cambió se emite DatabaseReloadedEvent, con el que se
+        invalidan los cachés derivados de la base que no dependen de la
+        versión (ranking de popularidad, respuestas de idempotencia).
+
+        Returns:
+            Nombres de las colecciones que cambiaron.
+        """
+        with self._file_lock:
+            stamp = self._stat()
+            if stamp is None or stamp == self._disk_stamp:
+                return []
+            with open(self.json_file_path, 'r') as json_file:
+                data = json.load(json_file)
+            collections = dict(data)
+            sequences = collections.pop(SEQUENCES_KEY, {})
+            changed = []
+            with self.write_lock:
+                if self._pending:
+                    return []
+                for name in [*collections, *(n for n in self._collections if n not in collections)]:
+                    version = self.changes.version + 1
+                    applied = self._collection(name).sync(collections.get(name, []), version)
+                    for op, items in applied:
+                        self.changes.record(version, name, op, items)
+                    if applied:
+                        changed.append(name)
+                for name, next_id in sequences.items():
+                    store = self._collections.get(name)
+                    if isinstance(store, VersionedCollection):
+                        store.reserve_ids(next_id)
+                catalog_versions = self._catalog_versions()
+            self._disk_stamp = stamp
+            self.memory_bytes = stamp[1]
+            if DATABASE_BINARY_SNAPSHOT and os.path.exists(snapshot_path(self.json_file_path)):
+                write_snapshot(self.json_file_path, data)
+            self._publish_catalog(data, catalog_versions)
+        if changed:
+            # Import local: los eventos son de la capa de notificaciones
+            from notifications.event_manager import EventManager
+            from notifications.events.database_events import DatabaseReloadedEvent
+            EventManager().emit(DatabaseReloadedEvent(self.json_file_path, changed))
+        return changed
+
+    def _connect(self):
+        """
+        Carga los datos del archivo JSON (o de su snapshot binario, si está
+        habilitado y corresponde al JSON actual; ver utils/binary_snapshot.py).
+        """
+        data = load_snapshot(self.json_file_path) if DATABASE_BINARY_SNAPSHOT else None
+        if data is None:
+            try:
+                with open(self.json_file_path, 'r') as json_file:
+                    data = json.load(json_file)
+            except FileNotFoundError:
+                data = None
+        collections = dict(data or {})
+        sequences = collections.pop(SEQUENCES_KEY, {})
+        self._collections = {name: VersionedCollection(items) for name, items in collections.items()}
+        self._published_versions = None  # Versiones del catálogo en la última publicación
+        for name, next_id in sequences.items():
+            if name in self._collections:
+                self._collections[name].reserve_ids(next_id)
+        if data is None:
+            self._save()
+        else:
+            self._disk_stamp = self._stat()
+            self.memory_bytes = self._disk_stamp[1]
+
+    @property
+    def data(self):
+        """Copia de todas las colecciones como diccionario de listas."""
+        return {name: c.snapshot().to_list() for name, c in self._collections.items()}
+
+    def _save(self):
+        """
+        Guarda los datos en el archivo JSON.
+
+        Escribe a un archivo temporal y lo renombra, así el archivo nunca
+        queda a medio escribir. La copia de los datos se toma dentro del
+        lock de archivo para que las escrituras no se reordenen. Si ya
+        existe un snapshot binario, se actualiza para que siga vigente; lo
+        mismo con el catálogo compartido (ver _publish_catalog).
+        """
+        with self._file_lock:
+            with self.write_lock:
+                data = self.data
+                pending, self._pending = self._pending, False
+                sequences = {
+                    name: c.next_id() for name, c in self._collections.items()
+                    if isinstance(c, VersionedCollection)
+                }
+                catalog_versions = self._catalog_versions()
+            if sequences:
+                data[SEQUENCES_KEY] = sequences
+            tmp_path = self.json_file_path + '.tmp'
+            try:
+                with open(tmp_path, 'w') as json_file:
+                    json.dump(data, json_file, indent=4)
+                    if DATABASE_FSYNC:
+                        json_file.flush()
+                        os.fsync(json_file.fileno())
+                    self.memory_bytes = json_file.tell()
+                os.replace(tmp_path, self.json_file_path)
+                self._disk_stamp = self._stat()
+            except BaseException:
+                self._pending = self._pending or pending
+                raise
+            if DATABASE_BINARY_SNAPSHOT and os.path.exists(snapshot_path(self.json_file_path)):
+                write_snapshot(self.json_file_path, data)
+            self._publish_catalog(data, catalog_versions)
+
+    def _catalog_versions(self):
+        """Versiones de las colecciones del catálogo; requiere write_lock."""
+        if self.catalog is None:
+            return None
+        return tuple(
+            self._collections[name].version if name in self._collections else None
+            for name in CATALOG_COLLECTIONS
+        )
+
+    def _publish_catalog(self, data, versions):
+        """
+        Publica en el catálogo compartido los productos y categorías que se
+        acaban de guardar (o recargar), si cambiaron desde la última
+        publicación. Corre con el lock de archivo tomado y antes de que la
+        escritura se confirme, así un GET posterior en cualquier worker ya
+        la ve. Si falla, la escritura igual queda en disco: se registra y se
+        reintenta en el próximo guardado (o la publica el cargador).
+        """
+        if self.catalog is None or versions == self._published_versions:
+            return
+        try:
+            publish_saved(self.catalog, self.json_file_path, data, self._disk_stamp)
+        except Exception:
+            logger.exception('could not publish catalog %s', self.catalog)
+            return
+        self._published_versions = versions
+
+    def _commit(self):
+        """Persiste los cambios aplicados (agrupados si hay group commit)."""
+        if self.group_commit is not None:
+            self.group_commit.commit()
+        else:
+            self._save()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa operaciones de escritura.
+
+        Todo el bloque se ejecuta con `write_lock` tomado y, si hubo
+        cambios, se persiste una sola vez al salir de la transacción más
+        externa (ya sin el lock, para no frenar a otros escritores).
+        """
+        with self.write_lock:
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            if depth == 0:
+                if self._closed:
+                    raise ConnectionClosedError(f'{self.json_file_path} was closed by the registry')
+                self._local.dirty = False
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+        if depth == 0 and self._local.dirty:
+            self._commit()
+
+    def _next_version(self):
+        """Versión para la próxima mutación; requiere write_lock."""
+        self._local.dirty = self._pending = True
+        return self.changes.version + 1
+
+    def next_id(self, collection_name):
+        """
+        Próximo ID de una colección (O(1), nunca reutiliza uno borrado).
+
+        Llamar dentro de una transacción y agregar el registro en ella.
+        """
+        return self._collection(collection_name).next_id()
+
+    def _collection(self, collection_name):
+        """Obtiene (o crea) la colección versionada; requiere write_lock."""
+        if collection_name not in self._collections:
+            self._collections[collection_name] = VersionedCollection()
+        return self._collections[collection_name]
+
+    def use_store(self, collection_name, store_class):
+        """
+        Retorna el store en memoria de una colección, convirtiéndolo a
+        `store_class` la primera vez (p. ej. AdjacencyStore para favoritos).
+        
+        Args:
+            collection_name: Nombre de la colección.
+            store_class: Clase con la interfaz de VersionedCollection.
+        """
+        store = self._collections.get(collection_name)
+        if type(store) is store_class:
+            return store
+        with self.write_lock:
+            store = self._collections.get(collection_name)
+            if type(store) is not store_class:
+                snapshot = self.get_collection(collection_name)
+                previous = store
+                store = store_class(snapshot, snapshot.version)
+                if isinstance(previous, VersionedCollection) and hasattr(store, 'reserve_ids'):
+                    store.reserve_ids(previous.next_id())
+                self._collections[collection_name] = store
+            return store
+
+    # ============ Operaciones Genéricas ============
+    
+    def get_collection(self, collection_name):
+        """
+        Obtiene una colección por nombre.
+        
+        Args:
+            collection_name: Nombre de la colección ('products', 'categories', etc.)
+        
+        Returns:
+            CollectionSnapshot inmutable con los elementos de la colección.
+        """
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            return VersionedCollection().snapshot()
+        return collection.snapshot()
+
+    def save_collection(self, collection_name, items):
+        """
+        Guarda una colección completa.
+        
+        Args:
+            collection_name: Nombre de la colección.
+            items: Lista de elementos a guardar.
+        """
+        with self.transaction():
+            version = self._next_version()
+            self._collection(collection_name).replace(items, version)
+            self.changes.record(version, collection_name, 'reset')
+
+    def append(self, collection_name, item):
+        """
+        Agrega un elemento al final de una colección en O(1).
+        
+        Args:
+            collection_name: Nombre de la colección.
+            item: Elemento a agregar.
+        """
+        with self.transaction():
+            version = self._next_version()
+            self._collection(collection_name).append(item, version)
+            self.changes.record(version, collection_name, 'insert', [item])
+
+    def apply(self, collection_name, op, mutation):
+        """
+        Aplica una mutación propia del store de la colección.
+        
+        Args:
+            collection_name: Nombre de la colección.
+            op: Tipo de cambio para el registro de cambios ('insert', 'delete', ...).
+            mutation: Función (store, version) que modifica el store y
+                retorna los elementos afectados (vacío si no hubo cambios).
+        
+        Returns:
+            Lista de elementos afectados.
+        """
+        with self.transaction():
+            version = self.changes.version + 1
+            affected = mutation(self._collection(collection_name), version)
+            if affected:
+                self._local.dirty = self._pending = True
+                self.changes.record(version, collection_name, op, affected)
+        return affected
+
+    def remove(self, collection_name, predicate):
+        """
+        Elimina los elementos que cumplen `predicate`.
+        
+        Args:
+            collection_name: Nombre de la colección.
+            predicate: Función que recibe un elemento y retorna True si se elimina.
+        
+        Returns:
+            Lista de elementos eliminados.
+        """
+        with self.transaction():
+            kept, removed = [], []
+            for item in self.get_collection(collection_name):
+                (removed if predicate(item) else kept).append(item)
+            if removed:
+                version = self._next_version()
+                self._collection(collection_name).replace(kept, version)
+                self.changes.record(version, collection_name, 'delete', removed)
+        return removed
+
+
+def init_request_sessions(app, json_file_path):
+    """
+    Mantiene una referencia a la base durante cada petición de la app
+    Flask, así el registro no la desaloja mientras se usa.
+    """
+    from flask import g
+
+    @app.before_request
+    def acquire_database():
+        g.database = DatabaseConnection.acquire(json_file_path)
+
+    @app.teardown_request
+    def release_database(error=None):
+        database = g.pop('database', None)
+        if database is not None:
+            database.release()
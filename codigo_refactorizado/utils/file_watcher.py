@@ -0,0 +1,120 @@
+"""
+Vigilancia de un archivo para detectar cambios hechos fuera de la app.
+
+Un hilo daemon llama a `callback()` cuando el archivo puede haber
+cambiado. En Linux se espera con inotify sobre el directorio (el archivo
+se reemplaza con os.replace, así que cambia de inodo); si inotify no está
+disponible se revisa cada `interval` segundos. Incluso con inotify se
+llama al callback cada `interval` segundos por si se perdió un aviso, así
+que el callback debe ser barato cuando no hubo cambios (p. ej. comparar
+tamaño y fecha de modificación). Si inotify falla mientras corre, el hilo
+lo registra en el log y sigue por sondeo.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import threading
+
+# Flags de inotify (ver inotify(7))
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+logger = logging.getLogger(__name__)
+
+
+class _Inotify:
+    """Espera eventos de inotify sobre un directorio (vía libc)."""
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, 'inotify_add_watch failed')
+
+    def wait(self, timeout):
+        """Bloquea hasta un evento o hasta `timeout`; descarta los eventos leídos."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 64 * 1024):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Llama a `callback` en un hilo propio cuando `path` puede haber cambiado."""
+
+    def __init__(self, path, callback, interval=1.0):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self.errors = 0
+        self._waiter = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def mode(self):
+        return 'inotify' if isinstance(self._waiter, _Inotify) else 'polling'
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self):
+        try:
+            self._waiter = _Inotify(os.path.dirname(os.path.abspath(self.path)))
+        except (OSError, AttributeError, TypeError):
+            self._waiter = None
+        self._thread = threading.Thread(target=self._run, name=f'watch:{self.path}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                if self._waiter is not None:
+                    try:
+                        self._waiter.wait(self.interval)
+                    except (OSError, ValueError):
+                        logger.warning('inotify failed for %s; polling instead', self.path, exc_info=True)
+                        self._close_waiter()
+                else:
+                    self._stop.wait(self.interval)
+                if self._stop.is_set():
+                    break
+                try:
+                    self.callback()
+                except Exception:
+                    # Un archivo a medio escribir o inválido: se reintenta en la próxima vuelta
+                    self.errors += 1
+        finally:
+            self._close_waiter()
+
+    def _close_waiter(self):
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            try:
+                waiter.close()
+            except OSError:
+                pass
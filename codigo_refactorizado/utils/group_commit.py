@@ -0,0 +1,76 @@
+"""
+Group commit: varias escrituras concurrentes, una sola persistencia.
+
+Cada escritor aplica su cambio en memoria y llama a commit(). El primero
+de un lote queda como líder: espera hasta `window` segundos (o hasta
+juntar `max_batch` escritores), toma el turno de escritura y persiste una
+vez por todo el lote. Mientras una persistencia está en curso, los nuevos
+escritores se acumulan en el lote siguiente, así que con carga la
+agrupación ocurre sola aunque `window` sea 0.
+
+commit() retorna recién cuando la persistencia que incluye el cambio
+terminó; si falla, todos los escritores del lote reciben la excepción.
+"""
+
+import threading
+
+
+class _Batch:
+    __slots__ = ('size', 'done', 'error')
+
+    def __init__(self):
+        self.size = 0
+        self.done = threading.Event()
+        self.error = None
+
+
+class GroupCommitWriter:
+    """Coalesce las llamadas concurrentes a `flush`."""
+
+    def __init__(self, flush, window=0.0, max_batch=128):
+        self._flush = flush
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._batch_full = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._current = _Batch()
+        self.flushes = 0
+
+    def commit(self):
+        """Bloquea hasta que una persistencia incluya los cambios ya aplicados."""
+        with self._lock:
+            batch = self._current
+            batch.size += 1
+            leader = batch.size == 1
+            if batch.size >= self.max_batch:
+                # Lote lleno: los siguientes escritores inician otro
+                self._current = _Batch()
+                self._batch_full.notify()
+
+        if leader:
+            self._lead(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+
+    def _lead(self, batch):
+        if self.window > 0:
+            with self._lock:
+                self._batch_full.wait_for(lambda: batch.size >= self.max_batch, self.window)
+
+        with self._flush_lock:
+            # Cerrar el lote recién ahora: quienes llegaron mientras esperábamos
+            # la persistencia anterior también entran en esta.
+            with self._lock:
+                if self._current is batch:
+                    self._current = _Batch()
+            try:
+                self._flush()
+                self.flushes += 1
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
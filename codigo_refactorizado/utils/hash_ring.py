@@ -0,0 +1,38 @@
+"""
+Anillo de hashing consistente para repartir claves entre shards.
+
+Cada shard ocupa `replicas` puntos del anillo (nodos virtuales) y una
+clave pertenece al primer punto igual o posterior a su hash. Al agregar o
+quitar un shard solo cambian de dueño las claves de los tramos que ese
+shard gana o pierde (~1/N), no todas como con `hash(clave) % N`.
+
+El hash es MD5 y no `hash()` de Python, que cambia entre procesos: todos
+los workers (y la herramienta de rebalanceo) deben ver el mismo anillo.
+"""
+
+import bisect
+import hashlib
+
+
+class HashRing:
+    """Asigna claves a nodos (p. ej. rutas de archivos) de forma estable."""
+
+    def __init__(self, nodes, replicas=64):
+        self.nodes = list(dict.fromkeys(nodes))
+        if not self.nodes:
+            raise ValueError('HashRing needs at least one node')
+        points = sorted(
+            (self._hash(f'{node}#{replica}'), node)
+            for node in self.nodes for replica in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(str(value).encode()).digest()[:8], 'big')
+
+    def node_for(self, key):
+        """Nodo dueño de `key` (las claves se comparan por su str)."""
+        position = bisect.bisect_left(self._points, self._hash(key)) % len(self._points)
+        return self._owners[position]
@@ -0,0 +1,411 @@
+"""
+Claves de idempotencia (cabecera `Idempotency-Key`) para las escrituras.
+
+El primer pedido con una clave la reserva, se ejecuta y guarda su
+respuesta; los reintentos con la misma clave reciben esa respuesta sin
+volver a ejecutar el endpoint (ni el repositorio ni los eventos):
+
+- Un duplicado que llega mientras el original se ejecuta espera su
+  respuesta (hasta `wait` segundos; después, 409).
+- La misma clave con otro cuerpo es un error del cliente (422).
+- Las claves vencen a los `ttl` segundos y se guardan a lo sumo
+  `max_keys` (se descartan las completadas más antiguas; una clave en
+  curso nunca se descarta, así su duplicado no se ejecuta).
+
+La caché vive en memoria del proceso. Con varios workers, `FileBackend`
+comparte las claves en un directorio: la reserva es la creación exclusiva
+de un archivo (O_EXCL), así que un solo worker ejecuta cada clave. Tomar
+una clave vencida o abandonada (revisar, borrar y reservar) se hace con
+un lock del directorio tomado, así dos workers no la toman a la vez.
+
+`idempotent` aplica todo esto a un método de un Resource de Flask; asgi.py
+tiene su versión asíncrona sobre la misma caché.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from flask import request
+try:
+    import fcntl
+except ImportError:  # Windows: solo se sincronizan los hilos del proceso
+    fcntl = None
+
+from config.settings import (
+    IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_WAIT, IDEMPOTENCY_DIRECTORY, IDEMPOTENCY_LEASE
+)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+MISMATCH = 'mismatch'
+IN_PROGRESS = 'in_progress'
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def idempotency_cache():
+    """IdempotencyCache del proceso, según la configuración."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            backend = None
+            if IDEMPOTENCY_DIRECTORY:
+                backend = FileBackend(os.path.abspath(IDEMPOTENCY_DIRECTORY), IDEMPOTENCY_LEASE)
+            _cache = IdempotencyCache(IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_WAIT, backend)
+        return _cache
+
+
+def reset_idempotency_cache():
+    """Descarta la caché del proceso (tests)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def invalid_key(key):
+    """Respuesta 400 si la clave no es válida, o None."""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return {'message': f'{HEADER} must have between 1 and {MAX_KEY_LENGTH} characters'}, 400
+    return None
+
+
+def claim_response(claim):
+    """(body, status, headers) para una clave que no se reservó."""
+    if claim.replay is not None:
+        body, status = claim.replay
+        return body, status, {REPLAYED_HEADER: 'true'}
+    if claim.conflict == MISMATCH:
+        return {'message': f'{HEADER} was already used with a different request'}, 422, {}
+    return {'message': f'A request with this {HEADER} is still in progress'}, 409, {}
+
+
+def idempotent(func):
+    """
+    Decorador para métodos POST de un Resource: con la cabecera
+    Idempotency-Key, los reintentos reciben la respuesta guardada.
+
+    Uso (después de require_auth, así un pedido sin token no gasta la clave):
+        @require_auth
+        @idempotent
+        def post(self):
+            ...
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return func(*args, **kwargs)
+        error = invalid_key(key)
+        if error:
+            return error
+
+        cache = idempotency_cache()
+        claim = cache.begin(f'{request.method} {request.path}', key,
+                            fingerprint(request.method, request.path, request.query_string, request.get_data()))
+        if not claim.owned:
+            return claim_response(claim)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            # p. ej. 400 de reqparse: la clave se libera y el reintento se ejecuta
+            cache.release(claim)
+            raise
+        body, status = result[:2] if isinstance(result, tuple) else (result, 200)
+        cache.complete(claim, body, status)
+        return result
+
+    return wrapper
+
+
+def fingerprint(*parts):
+    """Huella del pedido (método, ruta, cuerpo) para detectar claves reutilizadas."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Claim:
+    """
+    Resultado de `IdempotencyCache.begin`: una respuesta guardada para
+    repetir (`replay`), un conflicto (`conflict`), o la reserva de la clave
+    (ninguno de los dos), que se cierra con `complete` o `release`.
+    """
+
+    def __init__(self, ident=None, entry=None, replay=None, conflict=None):
+        self.ident = ident
+        self.entry = entry
+        self.replay = replay
+        self.conflict = conflict
+
+    @property
+    def owned(self):
+        return self.replay is None and self.conflict is None
+
+
+class _Entry:
+    __slots__ = ('fingerprint', 'expires', 'done', 'response')
+
+    def __init__(self, fingerprint, expires):
+        self.fingerprint = fingerprint
+        self.expires = expires
+        self.done = threading.Event()
+        self.response = None  # (body, status) una vez completado
+
+
+class IdempotencyCache:
+    """
+    Args:
+        ttl: Segundos que se recuerda cada clave.
+        max_keys: Claves máximas en memoria.
+        wait: Segundos que un duplicado espera al pedido original.
+        backend: FileBackend para compartir las claves entre procesos (opcional).
+        clock: Reloj (segundos, epoch); se compara entre procesos.
+    """
+
+    def __init__(self, ttl=24 * 3600, max_keys=10000, wait=10.0, backend=None, clock=time.time):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.wait = wait
+        self.backend = backend
+        self.clock = clock
+        self._entries = OrderedDict()  # (scope, clave) -> _Entry, en orden de creación
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin(self, scope, key, request_fingerprint):
+        """Reserva la clave o retorna la respuesta/conflicto que corresponde."""
+        ident = (scope, key)
+        while True:
+            with self._lock:
+                self._expire()
+                entry = self._entries.get(ident)
+                owner = entry is None
+                if owner:
+                    entry = self._entries[ident] = _Entry(request_fingerprint, self.clock() + self.ttl)
+                    self._evict()
+            if owner:
+                return self._claim_shared(ident, entry)
+            if entry.fingerprint != request_fingerprint:
+                return Claim(conflict=MISMATCH)
+            if not entry.done.wait(self.wait):
+                return Claim(conflict=IN_PROGRESS)
+            if entry.response is not None:
+                return Claim(replay=entry.response)
+            # El original falló y liberó la clave: se intenta reservarla de nuevo
+
+    def complete(self, claim, body, status):
+        """Guarda la respuesta del pedido que tenía la clave."""
+        claim.entry.response = (body, status)
+        try:
+            if self.backend is not None:
+                self.backend.complete(claim.ident, claim.entry.fingerprint, body, status, claim.entry.expires)
+        finally:
+            claim.entry.done.set()
+
+    def release(self, claim):
+        """Libera la clave sin respuesta (el pedido falló): un reintento se ejecuta."""
+        with self._lock:
+            if self._entries.get(claim.ident) is claim.entry:
+                del self._entries[claim.ident]
+        try:
+            if self.backend is not None:
+                self.backend.release(claim.ident)
+        finally:
+            claim.entry.done.set()
+
+    def forget_completed(self):
+        """
+        Olvida las respuestas guardadas en memoria (las claves en curso se
+        conservan). Las de FileBackend se mantienen: son las compartidas
+        entre workers.
+        """
+        with self._lock:
+            for ident in [ident for ident, entry in self._entries.items() if entry.done.is_set()]:
+                del self._entries[ident]
+
+    def _claim_shared(self, ident, entry):
+        if self.backend is None:
+            return Claim(ident, entry)
+        deadline = time.monotonic() + self.wait
+        while True:
+            state, record = self.backend.claim(ident, entry.fingerprint, entry.expires, self.clock())
+            if state != 'pending' or time.monotonic() >= deadline:
+                break
+            time.sleep(0.02)  # Otro worker lo está ejecutando
+        if state == 'claimed':
+            return Claim(ident, entry)
+        # La clave es de otro worker: se descarta la reserva local
+        with self._lock:
+            if self._entries.get(ident) is entry:
+                del self._entries[ident]
+        entry.done.set()
+        if state == 'pending':
+            return Claim(conflict=IN_PROGRESS)
+        if record['fingerprint'] != entry.fingerprint:
+            return Claim(conflict=MISMATCH)
+        return Claim(replay=(record['body'], record['status']))
+
+    def _expire(self):
+        """Descarta las claves completadas vencidas (requiere el lock)."""
+        now = self.clock()
+        expired = []
+        for ident, entry in self._entries.items():
+            if entry.expires > now:
+                break
+            if entry.done.is_set():
+                expired.append(ident)
+        for ident in expired:
+            del self._entries[ident]
+
+    def _evict(self):
+        """
+        Vuelve a `max_keys` descartando las completadas más antiguas (requiere
+        el lock). Las claves en curso no se descartan: si todas lo están, la
+        caché se pasa del límite hasta que terminen.
+        """
+        excess = len(self._entries) - self.max_keys
+        if excess <= 0:
+            return
+        victims = []
+        for ident, entry in self._entries.items():
+            if entry.done.is_set():
+                victims.append(ident)
+                if len(victims) == excess:
+                    break
+        for ident in victims:
+            del self._entries[ident]
+
+
+class FileBackend:
+    """
+    Claves compartidas en un directorio (un archivo JSON por clave).
+
+    Args:
+        directory: Directorio común a los workers.
+        lease: Segundos tras los que una reserva sin respuesta (p. ej. el
+            worker murió) se considera abandonada y se puede tomar.
+        max_keys: Archivos máximos; al limpiar se borran los más antiguos.
+        sweep_interval: Segundos entre limpiezas de claves vencidas.
+    """
+
+    def __init__(self, directory, lease=30.0, max_keys=100000, sweep_interval=60.0):
+        self.directory = directory
+        self.lease = lease
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Lock del directorio: del proceso más flock(2) para los demás workers."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield  # Al cerrar el archivo se libera el flock
+
+    def _path(self, ident):
+        return os.path.join(self.directory, fingerprint(*ident) + '.json')
+
+    def claim(self, ident, request_fingerprint, expires, now):
+        """
+        Intenta reservar la clave. Retorna ('claimed', None), ('pending', None)
+        si otro la tiene reservada, o ('done', registro) con la respuesta.
+        """
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.sweep(now)
+        path = self._path(ident)
+        if self._create(path, request_fingerprint, expires, now):
+            return 'claimed', None
+        # Ya existe: revisar, y si venció o se abandonó, borrar y reservar,
+        # todo con el lock tomado (otro worker podría estar haciendo lo mismo)
+        with self._locked():
+            record = self._read(path)
+            if record is None and not self._abandoned(path, now):
+                return 'pending', None  # Recién creado, a medio escribir
+            if record is not None and record['state'] == 'done' and record['expires'] > now:
+                return 'done', record
+            if record is not None and record['state'] == 'pending' and record['leased_until'] > now:
+                return 'pending', None
+            self._remove(path)
+            if self._create(path, request_fingerprint, expires, now):
+                return 'claimed', None
+        return 'pending', None  # Otro la reservó justo después de borrarla
+
+    def _create(self, path, request_fingerprint, expires, now):
+        """Crea la reserva si el archivo no existe (O_EXCL); False si ya existía."""
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'state': 'pending', 'fingerprint': request_fingerprint,
+                       'leased_until': now + self.lease, 'expires': expires}, f)
+        return True
+
+    def _abandoned(self, path, now):
+        """Un archivo ilegible es una reserva a medio escribir, salvo que pase el lease."""
+        try:
+            return os.path.getmtime(path) + self.lease <= now
+        except FileNotFoundError:
+            return True
+
+    def complete(self, ident, request_fingerprint, body, status, expires):
+        record = {'state': 'done', 'fingerprint': request_fingerprint, 'status': status,
+                  'body': body, 'expires': expires}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self._path(ident))
+
+    def release(self, ident):
+        self._remove(self._path(ident))
+
+    def sweep(self, now):
+        """Borra las claves vencidas y, si sobran, las más antiguas."""
+        with self._locked():
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.directory, name)
+                record = self._read(path)
+                if record is not None and record['state'] == 'done' and record['expires'] <= now:
+                    self._remove(path)
+                elif record is not None and record['state'] == 'done':
+                    entries.append((record['expires'], path))
+            entries.sort()
+            for _, path in entries[:max(len(entries) - self.max_keys, 0)]:
+                self._remove(path)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,86 @@
+"""
+VersionedCollection con un índice secundario por un campo.
+
+Además del índice id -> posición, mantiene `valor del campo -> {id:
+registro}` en cada escritura (agregar, actualizar, borrar, reemplazar),
+así las búsquedas por ese campo son O(1) (O(k) para listar los k
+registros) en lugar de recorrer la colección. Lo usan las validaciones de
+integridad referencial (¿existe la categoría?, ¿qué productos la usan?).
+
+El índice refleja siempre la última versión publicada, no un snapshot
+anterior, igual que los índices de AdjacencyStore.
+"""
+
+from .snapshot import VersionedCollection
+
+
+class IndexedCollection(VersionedCollection):
+    """
+    Colección versionada indexada además por `INDEX_FIELD`.
+
+    Las subclases definen INDEX_FIELD y, si hace falta, normalizan el valor
+    en `_field_key` (p. ej. para ignorar mayúsculas).
+    """
+
+    INDEX_FIELD = None
+
+    def __init__(self, items=(), version=0):
+        self._by_field = {}
+        super().__init__(items, version)
+
+    # ============ Lectura ============
+
+    def lookup(self, value):
+        """Registros cuyo campo indexado vale `value`."""
+        return list(self._by_field.get(self._field_key(value), {}).values())
+
+    def has(self, value):
+        """Verifica en O(1) si algún registro tiene ese valor."""
+        return self._field_key(value) in self._by_field
+
+    def _field_key(self, value):
+        return value
+
+    # ============ Escritura (con el lock de escritura de la base) ============
+
+    def append(self, item, version=None):
+        super().append(item, version)
+        item_id = item.get(self.INDEX_KEY)
+        if item_id is not None and self._index.get(item_id) == self._length - 1:
+            self._link(item)
+
+    def update(self, item_id, changes, version=None):
+        position = self._index.get(item_id)
+        old = None if position is None else self._at(position)
+        if old is None:
+            return None
+        new = super().update(item_id, changes, version)
+        if self._field_key(old.get(self.INDEX_FIELD)) != self._field_key(new.get(self.INDEX_FIELD)):
+            self._unlink(old)
+        self._link(new)
+        return new
+
+    def delete(self, item_id, version=None):
+        old = super().delete(item_id, version)
+        if old is not None:
+            self._unlink(old)
+        return old
+
+    def _build_index(self, items):
+        index = super()._build_index(items)
+        self._by_field = {}
+        for position in index.values():
+            self._link(items[position])
+        return index
+
+    def _link(self, item):
+        key = self._field_key(item.get(self.INDEX_FIELD))
+        self._by_field.setdefault(key, {})[item[self.INDEX_KEY]] = item
+
+    def _unlink(self, item):
+        key = self._field_key(item.get(self.INDEX_FIELD))
+        entries = self._by_field.get(key)
+        if entries is not None:
+            entries.pop(item[self.INDEX_KEY], None)
+            if not entries:
+                del self._by_field[key]
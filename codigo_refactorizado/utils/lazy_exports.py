@@ -0,0 +1,31 @@
+"""
+Exports perezosos para los `__init__.py` de los paquetes (PEP 562).
+
+Un paquete declara qué nombre sale de qué submódulo y el submódulo se
+importa recién cuando alguien pide ese nombre. Así, importar
+`utils.database_connection` no arrastra Flask (profiler, compresión) y la
+app Flask no paga el import de asyncio de AsyncRepository.
+"""
+
+from importlib import import_module
+
+
+def lazy_exports(package_globals, exports):
+    """
+    Retorna el `__getattr__` de módulo para un paquete.
+
+    Args:
+        package_globals: `globals()` del `__init__.py` del paquete.
+        exports: Diccionario nombre -> submódulo relativo ('.modulo').
+    """
+    package = package_globals['__name__']
+
+    def __getattr__(name):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        value = getattr(import_module(module, package), name)
+        package_globals[name] = value
+        return value
+
+    return __getattr__
@@ -0,0 +1,268 @@
+"""
+Ranking de productos por cantidad de favoritos, mantenido en memoria.
+
+`Ranking` guarda un conteo por clave y, para cada conteo, las claves que lo
+tienen (buckets). Como los eventos suman o restan de a uno, actualizar es
+O(1) salvo cuando aparece o se vacía un nivel de conteo (búsqueda binaria
+en la lista ordenada de niveles). El top-K recorre los niveles de mayor a
+menor y se detiene con K claves: no depende de la cantidad de productos.
+
+`PopularityBoard` combina un ranking global y uno por categoría, y se
+guarda periódicamente en un checkpoint JSON para no recontar al reiniciar.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import tempfile
+import threading
+
+CHECKPOINT_FORMAT = 1
+
+
+class Ranking:
+    """Conteos por clave con acceso ordenado (mayor conteo primero)."""
+
+    def __init__(self):
+        self._counts = {}
+        self._buckets = {}  # conteo -> {clave: None}, en orden de llegada al nivel
+        self._levels = []   # conteos con al menos una clave, ascendente
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def count(self, key):
+        return self._counts.get(key, 0)
+
+    def add(self, key, delta=1):
+        """Suma `delta` al conteo de `key` (nunca baja de 0). Retorna el nuevo conteo."""
+        old = self._counts.get(key, 0)
+        new = max(old + delta, 0)
+        if new == old:
+            return new
+        if old:
+            self._leave(key, old)
+        if new:
+            self._counts[key] = new
+            self._enter(key, new)
+        else:
+            del self._counts[key]
+        return new
+
+    def discard(self, key):
+        """Quita `key` del ranking. Retorna el conteo que tenía."""
+        count = self._counts.pop(key, 0)
+        if count:
+            self._leave(key, count)
+        return count
+
+    def top(self, limit):
+        """Lista de (clave, conteo) con los `limit` mayores conteos."""
+        result = []
+        for level in reversed(self._levels):
+            for key in self._buckets[level]:
+                if len(result) == limit:
+                    return result
+                result.append((key, level))
+        return result
+
+    def ranked(self):
+        """Itera (clave, conteo) de mayor a menor conteo."""
+        for level in reversed(self._levels):
+            for key in self._buckets[level]:
+                yield key, level
+
+    def load(self, ranked):
+        """Reemplaza el contenido con pares (clave, conteo) en el orden de `ranked()`."""
+        self._counts = {}
+        self._buckets = {}
+        for key, count in ranked:
+            if count > 0:
+                self._counts[key] = count
+                self._buckets.setdefault(count, {})[key] = None
+        self._levels = sorted(self._buckets)
+
+    def _enter(self, key, count):
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = {}
+            bisect.insort(self._levels, count)
+        bucket[key] = None
+
+    def _leave(self, key, count):
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            del self._levels[bisect.bisect_left(self._levels, count)]
+
+
+class PopularityBoard:
+    """
+    Ranking global y por categoría de productos favoritos.
+
+    Cada producto queda en la categoría que tenía al recibir su primer
+    favorito; si después cambia de categoría se corrige con `move()`.
+
+    Args:
+        checkpoint_file: JSON donde se guardan los conteos (None: sin checkpoint).
+    """
+
+    def __init__(self, checkpoint_file=None):
+        # Ruta absoluta: el checkpoint al salir no depende del directorio actual
+        self.checkpoint_file = os.path.abspath(checkpoint_file) if checkpoint_file else None
+        self.overall = Ranking()
+        self._categories = {}   # categoría -> Ranking
+        self._category_of = {}  # product_id -> categoría
+        self.total = 0          # Favoritos contados
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = None
+
+    def favorite_added(self, product_id, category, count=1):
+        with self._lock:
+            self.overall.add(product_id, count)
+            category = self._category_of.setdefault(product_id, category)
+            self._category(category).add(product_id, count)
+            self.total += count
+            self._dirty = True
+
+    def favorite_removed(self, product_id):
+        with self._lock:
+            if product_id not in self.overall:
+                return
+            if not self.overall.add(product_id, -1):
+                category = self._category_of.pop(product_id)
+            else:
+                category = self._category_of[product_id]
+            self._categories[category].add(product_id, -1)
+            self.total -= 1
+            self._dirty = True
+
+    def product_deleted(self, product_id):
+        """Quita el producto (sus favoritos se eliminan en cascada)."""
+        with self._lock:
+            count = self.overall.discard(product_id)
+            if count:
+                self._categories[self._category_of.pop(product_id)].discard(product_id)
+                self.total -= count
+                self._dirty = True
+
+    def move(self, product_id, category):
+        """Pasa el producto a otra categoría conservando su conteo."""
+        with self._lock:
+            current = self._category_of.get(product_id)
+            if current is None or current == category:
+                return
+            count = self._categories[current].discard(product_id)
+            self._category(category).add(product_id, count)
+            self._category_of[product_id] = category
+            self._dirty = True
+
+    def top(self, limit, category=None):
+        """Lista de (product_id, favoritos), de mayor a menor."""
+        with self._lock:
+            if category is None:
+                return self.overall.top(limit)
+            ranking = self._categories.get(category)
+            return ranking.top(limit) if ranking is not None else []
+
+    def count(self, product_id):
+        return self.overall.count(product_id)
+
+    def _category(self, category):
+        ranking = self._categories.get(category)
+        if ranking is None:
+            ranking = self._categories[category] = Ranking()
+        return ranking
+
+    # ============ Checkpoint ============
+
+    def checkpoint(self):
+        """Guarda los conteos si cambiaron desde el último checkpoint (escritura atómica)."""
+        if self.checkpoint_file is None:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            state = {
+                'format': CHECKPOINT_FORMAT,
+                'total': self.total,
+                'products': [[product_id, count, self._category_of[product_id]]
+                             for product_id, count in self.overall.ranked()],
+            }
+            self._dirty = False
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.checkpoint_file), prefix='.popularity-')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(tmp_path, self.checkpoint_file)
+        except BaseException:
+            self._dirty = True
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return True
+
+    def restore(self, expected_total=None):
+        """
+        Carga el checkpoint. Retorna False si no existe, tiene otro formato
+        o no cuenta `expected_total` favoritos (se perdieron eventos desde
+        que se guardó, p. ej. el proceso terminó sin llegar a guardarlo).
+        """
+        if self.checkpoint_file is None:
+            return False
+        try:
+            with open(self.checkpoint_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get('format') != CHECKPOINT_FORMAT:
+            return False
+        if expected_total is not None and state['total'] != expected_total:
+            return False
+        # Los productos vienen ordenados por conteo: se cargan sin reordenar
+        by_category = {}
+        for product_id, count, category in state['products']:
+            by_category.setdefault(category, []).append((product_id, count))
+        with self._lock:
+            self.overall.load((product_id, count) for product_id, count, _ in state['products'])
+            self._categories = {category: Ranking() for category in by_category}
+            for category, ranked in by_category.items():
+                self._categories[category].load(ranked)
+            self._category_of = {product_id: category for product_id, _, category in state['products']}
+            self.total = state['total']
+            self._dirty = False
+        return True
+
+    def start_checkpoints(self, interval):
+        """Guarda cada `interval` segundos en un hilo daemon, y al salir del proceso."""
+        if self._stop is not None or self.checkpoint_file is None:
+            return self
+        self._stop = threading.Event()
+        thread = threading.Thread(target=self._run, args=(interval,), name='popularity-checkpoint', daemon=True)
+        thread.start()
+        atexit.register(self.stop_checkpoints)
+        return self
+
+    def stop_checkpoints(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        self._try_checkpoint()
+
+    def _run(self, interval):
+        stop = self._stop
+        while not stop.wait(interval):
+            self._try_checkpoint()
+
+    def _try_checkpoint(self):
+        try:
+            self.checkpoint()
+        except OSError:
+            pass  # Se reintenta en la próxima vuelta (o se recuenta al reiniciar)
@@ -0,0 +1,231 @@
+"""
+Historial de precios por producto (serie de tiempo en memoria).
+
+Cada producto tiene dos arrays paralelos, tiempos (segundos desde epoch,
+'I') y precios ('d'), ordenados por tiempo: un rango se resuelve con dos
+búsquedas binarias. Las series largas (ROLLUP_MIN_POINTS puntos o más)
+mantienen además agregados OHLC por hora y por día, actualizados al
+agregar cada punto; las cortas los calculan al consultar desde los puntos.
+
+Los puntos se guardan en un archivo binario de solo agregado (registros de
+16 bytes: product_id, tiempo, precio). Todo punto entra leyendo ese archivo
+(`refresh()`), así cada proceso ve también lo que agregaron los demás
+workers, y al arrancar se reconstruye el historial completo.
+
+Todo es UTC: los intervalos OHLC se alinean a horas y días UTC, y los
+instantes se informan en ISO 8601 con su offset (`+00:00`). Las fechas
+sin zona que llegan en una consulta se toman como UTC.
+"""
+
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+RECORD = struct.Struct('<IId')  # product_id, tiempo (s), precio
+RESOLUTIONS = {'hour': 3600, 'day': 86400}
+ROLLUP_MIN_POINTS = 256
+READ_CHUNK = 4 * 2 ** 20
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def price_history_store(path):
+    """PriceHistoryStore compartido por ruta (el suscriptor y los endpoints usan el mismo)."""
+    key = os.path.abspath(path)
+    with _instances_lock:
+        store = _instances.get(key)
+        if store is None:
+            store = _instances[key] = PriceHistoryStore(key)
+        return store
+
+
+def _iso(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat()
+
+
+def _seconds(moment):
+    """Segundos desde epoch de un datetime (sin zona: UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+class Rollup:
+    """Agregados OHLC de una serie en intervalos de `width` segundos."""
+
+    __slots__ = ('width', 'starts', 'ohlc')
+
+    def __init__(self, width):
+        self.width = width
+        self.starts = array('I')
+        self.ohlc = array('d')  # open, high, low, close por intervalo
+
+    def add(self, time, price):
+        start = time - time % self.width
+        if self.starts and self.starts[-1] == start:
+            base = len(self.ohlc) - 4
+            self.ohlc[base + 1] = max(self.ohlc[base + 1], price)
+            self.ohlc[base + 2] = min(self.ohlc[base + 2], price)
+            self.ohlc[base + 3] = price
+        else:
+            self.starts.append(start)
+            self.ohlc.extend((price, price, price, price))
+
+    def range(self, start, end):
+        lo = bisect_left(self.starts, start)
+        hi = bisect_left(self.starts, end)
+        return [(self.starts[i], *self.ohlc[4 * i:4 * i + 4]) for i in range(lo, hi)]
+
+
+class PriceSeries:
+    """Puntos (tiempo, precio) de un producto, ordenados por tiempo."""
+
+    __slots__ = ('times', 'prices', 'rollups')
+
+    def __init__(self):
+        self.times = array('I')
+        self.prices = array('d')
+        self.rollups = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def add(self, time, price):
+        if not self.times or time >= self.times[-1]:
+            self.times.append(time)
+            self.prices.append(price)
+            if self.rollups is not None:
+                for rollup in self.rollups.values():
+                    rollup.add(time, price)
+        else:
+            # Fuera de orden (otro worker lo escribió antes): se inserta en su lugar
+            position = bisect_right(self.times, time)
+            self.times.insert(position, time)
+            self.prices.insert(position, price)
+            self.rollups = None
+        if self.rollups is None and len(self.times) >= ROLLUP_MIN_POINTS:
+            self._build_rollups()
+
+    def _build_rollups(self):
+        self.rollups = {name: Rollup(width) for name, width in RESOLUTIONS.items()}
+        for time, price in zip(self.times, self.prices):
+            for rollup in self.rollups.values():
+                rollup.add(time, price)
+
+    def points(self, start, end):
+        """Puntos con start <= tiempo < end."""
+        lo = bisect_left(self.times, start)
+        hi = bisect_left(self.times, end)
+        return list(zip(self.times[lo:hi], self.prices[lo:hi]))
+
+    def buckets(self, resolution, start, end):
+        """
+        Intervalos (inicio, open, high, low, close) de `resolution` que se
+        solapan con [start, end). Los intervalos se alinean a la resolución
+        (p. ej. días UTC) y se informan completos.
+        """
+        width = RESOLUTIONS[resolution]
+        start -= start % width
+        if self.rollups is not None:
+            return self.rollups[resolution].range(start, end)
+        rollup = Rollup(width)
+        lo = bisect_left(self.times, start)
+        hi = bisect_left(self.times, end - end % width + width if end % width else end)
+        for i in range(lo, hi):
+            rollup.add(self.times[i], self.prices[i])
+        return rollup.range(start, end)
+
+
+class PriceHistoryStore:
+    """
+    Historial de precios de todos los productos.
+
+    Args:
+        path: Archivo binario de solo agregado (None: solo en memoria).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.series = {}
+        self.points = 0
+        self._offset = 0  # Bytes del archivo ya aplicados
+        self._lock = threading.Lock()
+        self._fd = None
+
+    def record(self, product_id, price, when=None):
+        """
+        Agrega un punto (`when`: datetime, por defecto ahora). Un `when` sin
+        zona es hora local, como el `datetime.now()` de los eventos.
+        """
+        time = int((when or datetime.now(timezone.utc)).timestamp())
+        if self.path is None:
+            with self._lock:
+                self._add(product_id, time, price)
+            return
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # Un registro de 16 bytes con O_APPEND no se intercala con otros procesos
+        os.write(self._fd, RECORD.pack(product_id, time, price))
+        self.refresh()
+
+    def refresh(self):
+        """Aplica los registros que se agregaron al archivo desde la última lectura."""
+        if self.path is None:
+            return 0
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                return 0
+            applied = 0
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                while size - self._offset >= RECORD.size:
+                    # Solo registros completos: uno a medio escribir se lee la próxima vez
+                    length = min(READ_CHUNK, size - self._offset)
+                    data = f.read(length - length % RECORD.size)
+                    if not data:
+                        break
+                    for product_id, time, price in RECORD.iter_unpack(data):
+                        self._add(product_id, time, price)
+                    self._offset += len(data)
+                    applied += len(data) // RECORD.size
+            return applied
+
+    def _add(self, product_id, time, price):
+        series = self.series.get(product_id)
+        if series is None:
+            series = self.series[product_id] = PriceSeries()
+        series.add(time, price)
+        self.points += 1
+
+    def history(self, product_id, start=None, end=None, resolution=None):
+        """
+        Puntos del producto entre `start` (inclusivo) y `end` (exclusivo),
+        datetimes (sin zona: UTC). Con `resolution` ('hour' o 'day') retorna intervalos OHLC.
+        Retorna None si el producto no tiene historial.
+        """
+        self.refresh()
+        start = _seconds(start) if start else 0
+        end = _seconds(end) if end else 2 ** 32
+        with self._lock:
+            series = self.series.get(product_id)
+            if series is None:
+                return None
+            if resolution is None:
+                return [{'timestamp': _iso(time), 'price': price} for time, price in series.points(start, end)]
+            return [
+                {'timestamp': _iso(bucket), 'open': open_, 'high': high, 'low': low, 'close': close}
+                for bucket, open_, high, low, close in series.buckets(resolution, start, end)
+            ]
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
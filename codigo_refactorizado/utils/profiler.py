@@ -0,0 +1,138 @@
+"""
+Profiler por muestreo para las peticiones de la API.
+
+Un único hilo muestreador toma, cada `interval` segundos, la pila de los
+hilos que están atendiendo una petición muestreada y acumula las pilas
+en formato "collapsed" (una línea por pila: `f1;f2;f3 N`), que es el que
+consumen flamegraph.pl y speedscope.
+
+Si el profiling está deshabilitado no se registra ningún hook en la app,
+así que su costo es nulo.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request
+
+
+class SamplingProfiler:
+    """Acumula muestras de pila por endpoint (thread-safe)."""
+
+    def __init__(self, sample_rate=0.01, interval=0.005, max_depth=64):
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_depth = max_depth
+        self._active = {}  # thread id -> endpoint
+        self._stacks = {}  # endpoint -> Counter(collapsed stack -> muestras)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ============ Ciclo de vida de una petición ============
+
+    def should_sample(self):
+        return random.random() < self.sample_rate
+
+    def start(self, endpoint, thread_id=None):
+        """Empieza a muestrear el hilo actual (o `thread_id`)."""
+        with self._lock:
+            self._active[thread_id or threading.get_ident()] = endpoint
+            self._ensure_sampler()
+
+    def stop(self, thread_id=None):
+        with self._lock:
+            self._active.pop(thread_id or threading.get_ident(), None)
+
+    # ============ Muestreo ============
+
+    def _ensure_sampler(self):
+        """Arranca el muestreador si no está corriendo (con el lock tomado)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Muestrea mientras haya peticiones activas; luego termina."""
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+
+    @property
+    def running(self):
+        with self._lock:
+            return self._thread is not None
+
+    def sample(self):
+        """Toma una muestra de todos los hilos activos."""
+        with self._lock:
+            active = dict(self._active)
+        if not active:
+            return
+        frames = sys._current_frames()
+        for thread_id, endpoint in active.items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack = self._collapse(frame)
+            with self._lock:
+                self._stacks.setdefault(endpoint, Counter())[stack] += 1
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            code = frame.f_code
+            labels.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    # ============ Consulta ============
+
+    def collapsed(self, endpoint=None):
+        """Retorna las pilas acumuladas en formato collapsed."""
+        with self._lock:
+            selected = {
+                name: Counter(stacks) for name, stacks in self._stacks.items()
+                if endpoint is None or name == endpoint
+            }
+        lines = []
+        for name, stacks in sorted(selected.items()):
+            for stack, count in stacks.most_common():
+                lines.append(f'{name};{stack} {count}')
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def endpoints(self):
+        with self._lock:
+            return {name: sum(stacks.values()) for name, stacks in self._stacks.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+
+
+def init_profiling(app, profiler, excluded=('/admin/profile',)):
+    """
+    Registra los hooks de Flask que activan el profiler por petición.
+    Las rutas de `excluded` (el propio endpoint de administración) no se
+    muestrean.
+    """
+    app.extensions['profiler'] = profiler
+
+    @app.before_request
+    def _start_profiling():
+        if request.path not in excluded and profiler.should_sample():
+            request.environ['profiler.sampled'] = True
+            profiler.start(f'{request.method} {request.url_rule or request.path}')
+
+    @app.teardown_request
+    def _stop_profiling(exc=None):
+        if request.environ.get('profiler.sampled'):
+            profiler.stop()
+
+    return profiler
@@ -0,0 +1,634 @@
+"""
+Catálogo (productos y categorías) compartido entre procesos en memoria
+compartida (`multiprocessing.shared_memory`).
+
+Con varios workers cada uno carga y decodifica su propia copia de db.json.
+Para las lecturas del catálogo, un proceso cargador publica las colecciones
+una sola vez en un segmento de memoria compartida y los workers las leen
+desde ahí: cada registro se decodifica al pedirlo, no hay una copia por
+proceso.
+
+Formato de un segmento (una "generación"), todo en little-endian:
+
+- Cabecera: MAGIC, versión del formato y posición y largo del
+  directorio (JSON al final del segmento, con los campos y las posiciones
+  de cada colección).
+- Por colección:
+  - rows: registros de tamaño fijo en el orden de la colección: id (I),
+    máscara de campos presentes (I), cada campo (float: d; str: posición
+    y largo en el heap, II) y los campos extra como JSON (II).
+  - ids / by_id: los IDs ordenados (uint32) y la fila de cada uno; un
+    get_by_id es una búsqueda binaria sobre `ids`.
+  - groups / positions: índice del campo indexado (p. ej. la categoría
+    normalizada): por cada clave, ordenadas, sus filas en `positions`.
+- heap: los strings en UTF-8, sin repetir.
+
+Un valor que no es del tipo de su campo (p. ej. un precio entero) viaja
+en los extra, así el registro se lee igual que en db.json.
+
+Generaciones: cada publicación escribe un segmento nuevo
+(`<nombre>-g<generación>`) completo y recién entonces lo anuncia en el
+segmento de control (`<nombre>`, con un seqlock), así los lectores pasan
+de una generación a la otra de una vez y nunca ven una a medio escribir.
+El segmento anterior se desvincula: quien todavía lo tiene mapeado lo
+sigue leyendo hasta soltarlo.
+
+Publicadores:
+
+- El worker que escribe: las escrituras siguen yendo a db.json y, antes de
+  confirmarse, el mismo worker publica lo que acaba de guardar (ver
+  publish_saved y DatabaseConnection._save). Así un GET posterior, en
+  cualquier worker, ve la escritura (read-your-writes).
+- El cargador (`python -m utils.shared_catalog db.json`): publica la base
+  al arrancar y de nuevo cuando el archivo cambia por fuera de la app
+  (ver utils/file_watcher.py).
+
+Cada generación recuerda de qué estado del archivo (inode, tamaño, mtime)
+salió, así ningún publicador repite una publicación ni pisa una más nueva
+con datos atrasados.
+
+Solo productos y categorías están en el catálogo. Los favoritos, el
+ranking de GET /products/popular y el historial de precios no: siguen
+leyéndose de la base (o de sus propios archivos) en cada worker.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import threading
+import uuid
+from bisect import bisect_left
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import fcntl
+except ImportError:  # Windows: los publicadores no se sincronizan entre procesos
+    fcntl = None
+
+MAGIC = b'CATALOG1'
+FORMAT = 1
+HEADER = struct.Struct('<8sIIQ')       # magic, formato, largo y posición del directorio
+CONTROL = struct.Struct('<QQ16s')      # seqlock, generación, id del catálogo
+GROUP = struct.Struct('<IIII')         # clave (posición, largo en el heap), inicio, cantidad
+ID_MAX = 2 ** 32 - 1
+ALIGN = 8
+
+
+class CatalogUnavailable(LookupError):
+    """Todavía no se publicó ningún catálogo con ese nombre."""
+
+
+class Layout:
+    """
+    Campos fijos de una colección.
+
+    Args:
+        fields: Pares (nombre, tipo) con tipo float o str.
+        indexed: Campo str con índice de búsqueda (opcional).
+        key: Normalización de las claves del índice.
+    """
+
+    def __init__(self, *fields, indexed=None, key=None):
+        self.fields = fields
+        self.indexed = indexed
+        self.key = key or (lambda value: value)
+
+
+def default_layouts():
+    """Productos y categorías, con el índice por categoría y por nombre."""
+    # Import local: las claves deben normalizarse igual que en los índices de los repositorios
+    from repositories.category_repository import category_key
+    return {
+        'products': Layout(('name', str), ('price', float), ('category', str), indexed='category', key=category_key),
+        'categories': Layout(('name', str), indexed='name', key=category_key),
+    }
+
+
+def _record_struct(fields):
+    return struct.Struct('<II' + ''.join('d' if kind is float else 'II' for _, kind in fields) + 'II')
+
+
+def _align(size):
+    return -size % ALIGN
+
+
+# ============ Codificación ============
+
+class _Heap:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text):
+        """(posición, largo) de `text`; los strings repetidos se guardan una vez."""
+        found = self.offsets.get(text)
+        if found is None:
+            encoded = text.encode()
+            found = self.offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return found
+
+
+def encode_catalog(data, generation=0, layouts=None, source=None):
+    """
+    Codifica las colecciones de `data` (como en db.json) en un segmento.
+    `source` es el estado del archivo del que salen los datos, si se conoce.
+
+    Raises:
+        ValueError: Si un registro no tiene un ID entero de 32 bits.
+    """
+    layouts = layouts or default_layouts()
+    heap = _Heap()
+    sections = []  # (nombre, [(parte, bytes)])
+    directory = {'format': FORMAT, 'generation': generation, 'source': source, 'collections': {}}
+    for name, layout in layouts.items():
+        items = [item for item in data.get(name, ()) if item is not None]
+        record = _record_struct(layout.fields)
+        field_names = {field for field, _ in layout.fields}
+        rows = bytearray()
+        ids = []
+        groups = {}
+        for row, item in enumerate(items):
+            item_id = item.get('id')
+            if type(item_id) is not int or not 0 <= item_id <= ID_MAX:
+                raise ValueError(f'{name}: id {item_id!r} does not fit the catalog layout')
+            values, present, extra = [item_id, 0], 0, {}
+            for bit, (field, kind) in enumerate(layout.fields):
+                value = item.get(field)
+                if field in item and type(value) is kind:
+                    present |= 1 << bit
+                    values.extend((value,) if kind is float else heap.add(value))
+                else:
+                    values.extend((0.0,) if kind is float else (0, 0))
+                    if field in item:
+                        extra[field] = value
+            extra.update((key, value) for key, value in item.items() if key != 'id' and key not in field_names)
+            values[1] = present
+            values.extend(heap.add(json.dumps(extra)) if extra else (0, 0))
+            rows += record.pack(*values)
+            ids.append((item_id, row))
+            if layout.indexed is not None and isinstance(item.get(layout.indexed), str):
+                groups.setdefault(layout.key(item[layout.indexed]), []).append(row)
+        # Con IDs repetidos el índice apunta al primero, como en VersionedCollection
+        ids = sorted(dict(reversed(ids)).items())
+        positions = []
+        group_table = bytearray()
+        for key in sorted(groups):
+            key_offset, key_length = heap.add(key)
+            group_table += GROUP.pack(key_offset, key_length, len(positions), len(groups[key]))
+            positions.extend(groups[key])
+        sections.append((name, [
+            ('rows', bytes(rows)),
+            ('ids', struct.pack(f'<{len(ids)}I', *(item_id for item_id, _ in ids))),
+            ('by_id', struct.pack(f'<{len(ids)}I', *(row for _, row in ids))),
+            ('groups', bytes(group_table)),
+            ('positions', struct.pack(f'<{len(positions)}I', *positions)),
+        ]))
+        directory['collections'][name] = {
+            'count': len(items),
+            'fields': [[field, kind.__name__] for field, kind in layout.fields],
+            'record': record.format,
+            'ids_count': len(ids),
+            'groups_count': len(groups),
+            'positions_count': len(positions),
+        }
+
+    image = bytearray(HEADER.size + _align(HEADER.size))
+    for name, parts in sections:
+        entry = directory['collections'][name]
+        for part, payload in parts:
+            entry[part] = len(image)
+            image += payload + bytes(_align(len(payload)))
+    directory['heap'] = len(image)
+    image += heap.data
+    encoded = json.dumps(directory).encode()
+    HEADER.pack_into(image, 0, MAGIC, FORMAT, len(encoded), len(image))
+    image += encoded
+    return bytes(image)
+
+
+# ============ Segmentos ============
+
+def _untrack(shm):
+    """
+    Saca el segmento del resource_tracker: sin esto, el primer proceso que
+    termina de los que lo abrieron lo desvincula para todos.
+    """
+    resource_tracker.unregister(getattr(shm, '_name', '/' + shm.name), 'shared_memory')
+    return shm
+
+
+def _open(name, create=False, size=0):
+    return _untrack(shared_memory.SharedMemory(name, create=create, size=size))
+
+
+def _segment_name(name, generation):
+    return f'{name}-g{generation}'
+
+
+def _read_control(buf):
+    """(generación, id del catálogo) leídos con el seqlock."""
+    while True:
+        before, generation, catalog_id = CONTROL.unpack_from(buf)
+        after = CONTROL.unpack_from(buf)[0]
+        if before == after and not before % 2:
+            return generation, catalog_id.hex()
+
+
+class _PublishLock:
+    """Serializa a los publicadores de un mismo catálogo (también entre procesos)."""
+
+    _threads = {}
+    _threads_lock = threading.Lock()
+
+    def __init__(self, name):
+        self.path = os.path.join(tempfile.gettempdir(), f'{name}.catalog.lock')
+        with self._threads_lock:
+            self.lock = self._threads.setdefault(name, threading.Lock())
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()  # Libera el flock
+        self.lock.release()
+
+
+def file_stamp(path):
+    """(inode, tamaño, mtime) del archivo, o None si no existe."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def publish_catalog(name, data, layouts=None, source=None):
+    """
+    Publica `data` como la nueva generación del catálogo `name`.
+
+    Returns:
+        El número de la generación publicada.
+    """
+    with _PublishLock(name):
+        return _publish(name, data, layouts, source)
+
+
+def publish_saved(name, json_file_path, data, stamp, layouts=None):
+    """
+    Publica `data`, que un worker acaba de guardar en `json_file_path`
+    dejándolo en el estado `stamp` (ver file_stamp).
+
+    No publica si el catálogo ya salió de ese estado del archivo, ni si el
+    archivo cambió después: el que lo cambió publica lo suyo (o el
+    cargador, si fue por fuera de la app), así un worker atrasado no pisa
+    una generación más nueva.
+
+    Returns:
+        El número de la generación publicada, o None si no publicó.
+    """
+    with _PublishLock(name):
+        if file_stamp(json_file_path) != stamp or _published_source(name) == stamp:
+            return None
+        return _publish(name, data, layouts, stamp)
+
+
+def _publish(name, data, layouts, source):
+    """Publica una generación; requiere el _PublishLock del catálogo."""
+    try:
+        control = _open(name)
+    except FileNotFoundError:
+        control = _open(name, create=True, size=CONTROL.size)
+        CONTROL.pack_into(control.buf, 0, 0, 0, uuid.uuid4().bytes)
+    try:
+        sequence, previous, catalog_id = CONTROL.unpack_from(control.buf)
+        generation = previous + 1
+        image = encode_catalog(data, generation, layouts, source and list(source))
+        segment = _open(_segment_name(name, generation), create=True, size=max(len(image), 1))
+        segment.buf[:len(image)] = image
+        segment.close()
+        # Seqlock: impar mientras se escribe el control
+        CONTROL.pack_into(control.buf, 0, sequence + 1, previous, catalog_id)
+        CONTROL.pack_into(control.buf, 0, sequence + 2, generation, catalog_id)
+    finally:
+        control.close()
+    if previous:
+        _unlink(_segment_name(name, previous))
+    return generation
+
+
+def _published_source(name):
+    """Estado del archivo del que salió la generación actual (o None)."""
+    try:
+        control = _open(name)
+    except FileNotFoundError:
+        return None
+    generation, catalog_id = _read_control(control.buf)
+    control.close()
+    if not generation:
+        return None
+    current = CatalogGeneration(name, generation, catalog_id)
+    try:
+        return current.source
+    finally:
+        current.close()
+
+
+def unlink_catalog(name):
+    """Borra el catálogo (la generación actual y el control)."""
+    with _PublishLock(name):
+        try:
+            control = _open(name)
+        except FileNotFoundError:
+            return
+        generation, _ = _read_control(control.buf)
+        control.close()
+        if generation:
+            _unlink(_segment_name(name, generation))
+        _unlink(name)
+
+
+def _unlink(segment_name):
+    try:
+        # Sin _untrack: unlink() le avisa al resource_tracker que lo suelte
+        shm = shared_memory.SharedMemory(segment_name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+# ============ Lectura ============
+
+class CatalogGeneration:
+    """Una generación publicada, mapeada en este proceso (solo lectura)."""
+
+    def __init__(self, name, generation, catalog_id):
+        self._shm = _open(_segment_name(name, generation))
+        self._views = []
+        self.generation = generation
+        self.catalog_id = catalog_id
+        buf = self._shm.buf
+        magic, version, length, offset = HEADER.unpack_from(buf)
+        if magic != MAGIC or version != FORMAT:
+            self.close()
+            raise ValueError(f'{name}: unknown catalog format')
+        directory = json.loads(bytes(buf[offset:offset + length]))
+        self.source = tuple(directory['source']) if directory.get('source') else None
+        self._heap = directory['heap']
+        self.collections = {
+            name: SharedCollection(self, name, spec) for name, spec in directory['collections'].items()
+        }
+
+    def collection(self, name):
+        return self.collections[name]
+
+    def _u32(self, start, count):
+        view = self._shm.buf[start:start + 4 * count].cast('I')
+        self._views.append(view)
+        return view
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                pass  # Alguien todavía lee de un slice; se cierra al soltarlo
+            self._shm = None
+
+    def __del__(self):
+        self.close()
+
+
+class SharedCollection:
+    """
+    Colección de una generación con la interfaz de lectura de un
+    CollectionSnapshot (iterar, len, get_by_id, get_many, version).
+    """
+
+    def __init__(self, generation, name, spec):
+        self._generation = generation
+        self.name = name
+        self.version = generation.generation
+        self._count = spec['count']
+        self._buf = generation._shm.buf
+        self._heap = generation._heap
+        self._record = struct.Struct(spec['record'])
+        # (campo, bit de presencia, posición en el registro, es float)
+        self._plan = []
+        index = 2
+        for bit, (field, kind) in enumerate(spec['fields']):
+            self._plan.append((field, 1 << bit, index, kind == 'float'))
+            index += 1 if kind == 'float' else 2
+        self._rows = spec['rows']
+        self._ids_count = spec['ids_count']
+        self._ids = generation._u32(spec['ids'], self._ids_count)
+        self._by_id = generation._u32(spec['by_id'], self._ids_count)
+        self._groups = spec['groups']
+        self._groups_count = spec['groups_count']
+        self._positions = generation._u32(spec['positions'], spec['positions_count'])
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return map(self._item, range(self._count))
+
+    def _item(self, row):
+        buf, heap = self._buf, self._heap
+        values = self._record.unpack_from(buf, self._rows + row * self._record.size)
+        item = {'id': values[0]}
+        present = values[1]
+        for field, bit, index, is_float in self._plan:
+            if present & bit:
+                if is_float:
+                    item[field] = values[index]
+                else:
+                    start = heap + values[index]
+                    item[field] = str(buf[start:start + values[index + 1]], 'utf-8')
+        if values[-1]:
+            start = heap + values[-2]
+            item.update(json.loads(str(buf[start:start + values[-1]], 'utf-8')))
+        return item
+
+    def get_by_id(self, item_id):
+        """Busca un elemento por ID (búsqueda binaria en el índice de IDs)."""
+        if not isinstance(item_id, int) or not 0 <= item_id <= ID_MAX:
+            return None
+        position = bisect_left(self._ids, item_id)
+        if position == self._ids_count or self._ids[position] != item_id:
+            return None
+        return self._item(self._by_id[position])
+
+    def get_many(self, item_ids):
+        """Busca varios IDs; retorna los encontrados en el orden pedido."""
+        found = (self.get_by_id(item_id) for item_id in item_ids)
+        return [item for item in found if item is not None]
+
+    def lookup(self, key):
+        """Registros cuyo campo indexado tiene la clave (ya normalizada) `key`."""
+        group = self._group(key)
+        if group is None:
+            return []
+        start, count = group
+        return [self._item(self._positions[i]) for i in range(start, start + count)]
+
+    def has(self, key):
+        return self._group(key) is not None
+
+    def _group(self, key):
+        low, high = 0, self._groups_count
+        while low < high:
+            middle = (low + high) // 2
+            offset, length, start, count = GROUP.unpack_from(self._buf, self._groups + middle * GROUP.size)
+            offset += self._heap
+            current = str(self._buf[offset:offset + length], 'utf-8')
+            if current == key:
+                return start, count
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+class SharedCatalog:
+    """
+    Lector de un catálogo publicado. `current()` retorna la última
+    generación (revisar el control cuesta una lectura de 32 bytes); las
+    generaciones ya retornadas siguen siendo válidas mientras se usen.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._control = None
+        self._current = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        try:
+            self.current()
+        except CatalogUnavailable:
+            return False
+        return True
+
+    def current(self):
+        if self._control is None:
+            with self._lock:
+                if self._control is None:
+                    try:
+                        self._control = _open(self.name)
+                    except FileNotFoundError:
+                        raise CatalogUnavailable(self.name) from None
+        generation, catalog_id = _read_control(self._control.buf)
+        current = self._current
+        if current is not None and current.generation == generation and current.catalog_id == catalog_id:
+            return current
+        with self._lock:
+            while True:
+                if not generation:
+                    raise CatalogUnavailable(self.name)
+                current = self._current
+                if current is not None and current.generation == generation and current.catalog_id == catalog_id:
+                    return current
+                try:
+                    self._current = CatalogGeneration(self.name, generation, catalog_id)
+                    return self._current
+                except FileNotFoundError:
+                    # Se publicó otra generación mientras tanto
+                    generation, catalog_id = _read_control(self._control.buf)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def shared_catalog(name):
+    """SharedCatalog del proceso para ese nombre."""
+    with _catalogs_lock:
+        catalog = _catalogs.get(name)
+        if catalog is None:
+            catalog = _catalogs[name] = SharedCatalog(name)
+        return catalog
+
+
+# ============ Proceso cargador ============
+
+class CatalogLoader:
+    """
+    Publica db.json como catálogo y lo vuelve a publicar cuando el archivo
+    cambia (solo cuesta un stat si no cambió). Lo que ya publicó el worker
+    que escribió el archivo no se vuelve a publicar.
+    """
+
+    def __init__(self, json_file_path, name, layouts=None):
+        self.json_file_path = json_file_path
+        self.name = name
+        self.layouts = layouts
+        self.generation = 0
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def refresh(self):
+        """Publica una generación nueva si el archivo cambió. Retorna True si publicó."""
+        with self._lock, _PublishLock(self.name):
+            stamp = file_stamp(self.json_file_path)
+            if stamp is None or stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            if _published_source(self.name) == stamp:
+                return False
+            with open(self.json_file_path) as f:
+                data = json.load(f)
+            self.generation = _publish(self.name, data, self.layouts, stamp)
+            return True
+
+    def watch(self, interval=1.0):
+        from .file_watcher import FileWatcher
+        if self._watcher is None:
+            self._watcher = FileWatcher(self.json_file_path, self.refresh, interval).start()
+        return self._watcher
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+def main():
+    import argparse
+    import signal
+    from config.settings import SHARED_CATALOG, DATABASE_WATCH_INTERVAL
+
+    parser = argparse.ArgumentParser(description='Publica db.json en memoria compartida y la mantiene al día.')
+    parser.add_argument('json_file_path')
+    parser.add_argument('--name', default=SHARED_CATALOG or 'catalog')
+    parser.add_argument('--interval', type=float, default=DATABASE_WATCH_INTERVAL)
+    args = parser.parse_args()
+
+    loader = CatalogLoader(args.json_file_path, args.name)
+    loader.refresh()
+    print(f'catalog {args.name} generation {loader.generation} published')
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    loader.watch(args.interval)
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loader.stop()
+        unlink_catalog(args.name)
+
+
+if __name__ == '__main__':
+    main()
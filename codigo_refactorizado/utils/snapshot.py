@@ -0,0 +1,294 @@
+"""
+Snapshots versionados (estilo MVCC) para las colecciones de la base.
+
+Los lectores obtienen en O(1) una vista inmutable de la colección; los
+escritores (uno a la vez, bajo el lock de DatabaseConnection) publican una
+versión nueva reemplazando una única referencia, operación atómica en
+CPython. Así los lectores nunca bloquean ni ven estados a medio aplicar.
+
+Los elementos se guardan en bloques de `CHUNK_SIZE`:
+
+- Agregar es O(1): el último bloque solo se extiende. Cada snapshot
+  recuerda su longitud, por lo que los elementos agregados después no son
+  visibles para snapshots anteriores.
+- Actualizar o borrar por ID copia solo el bloque afectado y la lista de
+  bloques (copy-on-write); los snapshots anteriores siguen viendo sus
+  bloques originales, sin cambios. Un borrado deja una lápida `None` en la
+  copia, que los snapshots nuevos saltan.
+- Cuando las lápidas superan un cuarto de la colección se compacta
+  publicando bloques nuevos.
+
+El índice id -> posición se comparte entre snapshots: las posiciones no
+cambian hasta compactar, un snapshot descarta las que superan su longitud
+y un borrado no quita la entrada (la lápida está solo en los bloques
+nuevos, así que los snapshots anteriores siguen encontrando el registro).
+
+La colección lleva además el próximo ID libre: solo avanza (al agregar o
+reservar), así un ID borrado no se vuelve a generar.
+"""
+
+from itertools import chain, islice
+
+CHUNK_SIZE = 1024
+
+
+class CollectionSnapshot:
+    """Vista inmutable y versionada de una colección."""
+
+    __slots__ = ('_chunks', '_chunk_size', '_length', '_live', '_index', 'version')
+
+    def __init__(self, items, length, version, index=None, live=None, chunk_size=None):
+        """
+        Args:
+            items: Lista de elementos, o lista de bloques si se indica
+                `chunk_size`.
+            length: Cantidad de posiciones visibles (incluye lápidas).
+            live: Cantidad de elementos sin contar lápidas.
+        """
+        if chunk_size is None:
+            items, chunk_size = [items], max(length, 1)
+        self._chunks = items
+        self._chunk_size = chunk_size
+        self._length = length
+        self._live = length if live is None else live
+        self._index = index
+        self.version = version
+
+    def __len__(self):
+        return self._live
+
+    def __iter__(self):
+        items = islice(chain.from_iterable(self._chunks), self._length)
+        if self._live == self._length:
+            return items
+        # Salta las lápidas de los elementos borrados
+        return (item for item in items if item is not None)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) or self._live != self._length:
+            return self.to_list()[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('snapshot index out of range')
+        return self._at(index)
+
+    def __eq__(self, other):
+        if isinstance(other, CollectionSnapshot):
+            return self.to_list() == other.to_list()
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f'CollectionSnapshot(version={self.version}, items={self.to_list()!r})'
+
+    def _at(self, position):
+        chunk, offset = divmod(position, self._chunk_size)
+        return self._chunks[chunk][offset]
+
+    def to_list(self):
+        """Copia los elementos a una lista nueva (p. ej. para serializar)."""
+        return list(self)
+
+    def get_by_id(self, item_id):
+        """Busca un elemento por ID en O(1) (o por recorrido si no hay índice)."""
+        if self._index is None:
+            return next((item for item in self if item.get('id') == item_id), None)
+        position = self._index.get(item_id)
+        if position is None or position >= self._length:
+            return None
+        return self._at(position)
+
+    def get_many(self, item_ids):
+        """Busca varios IDs; retorna los encontrados en el orden pedido."""
+        found = (self.get_by_id(item_id) for item_id in item_ids)
+        return [item for item in found if item is not None]
+
+
+class VersionedCollection:
+    """
+    Colección con copy-on-write por bloques.
+
+    Los métodos de escritura deben llamarse con el lock de escritura de la
+    base tomado; snapshot() puede llamarse desde cualquier hilo sin lock.
+    """
+
+    INDEX_KEY = 'id'
+
+    def __init__(self, items=(), version=0):
+        self._next_id = 1
+        self._deferred = False
+        self._load(items)
+        self._snapshot = None
+        self._publish(version)
+
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def next_id(self):
+        """Próximo ID libre, en O(1); el append que lo usa lo hace avanzar."""
+        return self._next_id
+
+    def reserve_ids(self, next_id):
+        """Asegura que no se generen IDs menores a `next_id`."""
+        self._next_id = max(self._next_id, next_id)
+
+    def append(self, item, version=None):
+        """Agrega un elemento en O(1) (el último bloque solo se extiende)."""
+        if not self._chunks or len(self._chunks[-1]) == CHUNK_SIZE:
+            self._chunks.append([])
+        self._chunks[-1].append(item)
+        position = self._length
+        self._length += 1
+        key = item.get(self.INDEX_KEY)
+        if key is not None:
+            current = self._index.get(key)
+            if current is None or self._at(current) is None:
+                self._index[key] = position
+            if isinstance(key, int):
+                self.reserve_ids(key + 1)
+        self._publish(version)
+
+    def replace(self, items, version=None):
+        """Publica una colección completamente nueva."""
+        self._load(items)
+        self._publish(version)
+
+    def update(self, item_id, changes, version=None):
+        """
+        Publica una copia del registro con ese ID con `changes` aplicados.
+
+        Returns:
+            El registro nuevo o None si no existe.
+        """
+        position = self._index.get(item_id)
+        if position is None or self._at(position) is None:
+            return None
+        new = {**self._at(position), **changes, self.INDEX_KEY: item_id}
+        self._set(position, new)
+        self._publish(version)
+        return new
+
+    def delete(self, item_id, version=None):
+        """
+        Borra el registro con ese ID (deja una lápida en una copia del bloque).
+
+        Returns:
+            El registro borrado o None si no existe.
+        """
+        position = self._index.get(item_id)
+        old = None if position is None else self._at(position)
+        if old is None:
+            return None
+        self._set(position, None)
+        self._tombstones += 1
+        if self._tombstones > max(1024, self._length // 4):
+            live = (item for item in chain.from_iterable(self._chunks) if item is not None)
+            self.replace(live, version)
+        else:
+            self._publish(version)
+        return old
+
+    def sync(self, items, version=None):
+        """
+        Lleva la colección a `items` (p. ej. al recargar el archivo) con
+        los cambios mínimos: borra, actualiza y agrega por ID, manteniendo
+        los índices en lugar de reconstruirlos. Si el orden cambió, faltan
+        IDs o cambia más de la mitad, reemplaza todo. Publica una sola
+        versión al final.
+
+        Returns:
+            Lista de (op, registros) aplicados; vacía si no hubo cambios.
+        """
+        items = list(items)
+        current = self._snapshot.to_list()
+        if current == items:
+            return []
+        diff = self._diff(current, items)
+        if diff is None:
+            self.replace(items, version)
+            return [('reset', [None])]
+        self._deferred = True
+        try:
+            for item in diff['delete']:
+                self.delete(item[self.INDEX_KEY])
+            for item in diff['update']:
+                self.update(item[self.INDEX_KEY], item)
+            for item in diff['insert']:
+                self.append(item)
+        finally:
+            self._deferred = False
+        self._publish(version)
+        return [(op, records) for op, records in diff.items() if records]
+
+    def _diff(self, current, items):
+        """Borrados, actualizados y agregados de `current` a `items`, o None."""
+        key = self.INDEX_KEY
+        old = {item.get(key): item for item in current}
+        new_ids = [item.get(key) for item in items]
+        new_set = set(new_ids)
+        if None in old or None in new_set or len(old) != len(current) or len(new_set) != len(items):
+            return None
+        # Los que siguen deben conservar su orden y estar antes de los nuevos
+        kept = [item_id for item_id in old if item_id in new_set]
+        if new_ids[:len(kept)] != kept:
+            return None
+        updated = []
+        for item in items[:len(kept)]:
+            previous = old[item[key]]
+            if previous != item:
+                if previous.keys() - item.keys():
+                    return None
+                updated.append(item)
+        diff = {
+            'delete': [item for item_id, item in old.items() if item_id not in new_set],
+            'update': updated,
+            'insert': items[len(kept):],
+        }
+        if sum(map(len, diff.values())) > len(items) // 2 + 1:
+            return None
+        return diff
+
+    def _load(self, items):
+        items = [item for item in items if item is not None]
+        self._chunks = [items[start:start + CHUNK_SIZE] for start in range(0, len(items), CHUNK_SIZE)]
+        self._length = len(items)
+        self._tombstones = 0
+        self._index = self._build_index(items)
+        self.reserve_ids(max((key for key in self._index if isinstance(key, int)), default=0) + 1)
+
+    def _at(self, position):
+        chunk, offset = divmod(position, CHUNK_SIZE)
+        return self._chunks[chunk][offset]
+
+    def _set(self, position, item):
+        """Escribe sobre copias del bloque y de la lista de bloques."""
+        chunk, offset = divmod(position, CHUNK_SIZE)
+        block = list(self._chunks[chunk])
+        block[offset] = item
+        self._chunks = list(self._chunks)
+        self._chunks[chunk] = block
+
+    def _publish(self, version=None):
+        """Publica la versión indicada (o la siguiente a la actual)."""
+        if self._deferred:
+            return
+        if version is None:
+            version = self._snapshot.version + 1
+        self._snapshot = CollectionSnapshot(
+            self._chunks, self._length, version, self._index,
+            self._length - self._tombstones, CHUNK_SIZE
+        )
+
+    def _build_index(self, items):
+        index = {}
+        for position, item in enumerate(items):
+            key = item.get(self.INDEX_KEY)
+            if key is not None:
+                index.setdefault(key, position)
+        return index